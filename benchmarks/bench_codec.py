@@ -0,0 +1,117 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+送信音声の符号化のベンチマーク
+
+発話区間を従来の経路（WAV の組み立て、speech_recognition の get_flac_data）と
+符号化ステージ（EncodedAudio による FLAC）で符号化し、送信バイト数、
+符号化のCPU時間（flac コマンドの子プロセス分を含む）、低速回線での送信時間の目安を
+比較する。再試行で同じ区間を複数回送る場合の符号化回数の違いもあわせて表示する。
+
+使い方:
+    python benchmarks/bench_codec.py [区間数] [回線速度（kbps）]
+"""
+
+import os
+import sys
+
+import speech_recognition as sr
+
+from fixtures import synthesize_speech_like
+from src.audio.codec import EncodedAudio, encode_flac
+
+SAMPLE_RATE = 16000
+SEGMENT_SECONDS = (1.0, 2.5, 5.0)
+ATTEMPTS = 3   # 1回目 + 再試行2回
+
+
+def cpu_time():
+    """自プロセスと終了済み子プロセスのCPU時間の合計（秒）"""
+    times = os.times()
+    return times.user + times.system + times.children_user + times.children_system
+
+
+def legacy_wav(pcm):
+    """従来の 'http' バックエンドの経路（送信ごとに WAV を組み立てる）"""
+    return sr.AudioData(pcm, SAMPLE_RATE, 2).get_wav_data()
+
+
+def legacy_flac(pcm):
+    """従来の 'google' バックエンドの経路（送信ごとに WAV を組み立てて --best で変換）"""
+    return sr.AudioData(pcm, SAMPLE_RATE, 2).get_flac_data(convert_width=2)
+
+
+def stage_flac(level):
+    def encode(pcm):
+        return encode_flac(pcm, SAMPLE_RATE, 2, level=level)
+    return encode
+
+
+def run(segments, encode, attempts, cached):
+    """
+    全区間を attempts 回ずつ送る想定で符号化
+
+    Returns:
+        tuple: (1回分の送信バイト数, 符号化のCPU時間（秒）, 符号化回数)
+    """
+    total_bytes = encode_count = 0
+    start = cpu_time()
+    for pcm in segments:
+        if cached:
+            audio = EncodedAudio(memoryview(pcm), SAMPLE_RATE, 2)
+            for _ in range(attempts):
+                data = audio.encoded('flac')
+            encode_count += 1
+        else:
+            for _ in range(attempts):
+                data = encode(pcm)
+                encode_count += 1
+        total_bytes += len(data)
+    return total_bytes, cpu_time() - start, encode_count
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 30
+    uplink_kbps = float(sys.argv[2]) if len(sys.argv) > 2 else 256
+
+    segments = [
+        synthesize_speech_like(SAMPLE_RATE, SEGMENT_SECONDS[i % len(SEGMENT_SECONDS)], seed=i).tobytes()
+        for i in range(count)
+    ]
+    pcm_bytes = sum(len(pcm) for pcm in segments)
+    audio_sec = pcm_bytes / 2 / SAMPLE_RATE
+
+    cases = (
+        ('WAV（従来の http）', legacy_wav, False),
+        ('FLAC --best（従来の google）', legacy_flac, False),
+        ('FLAC -0（符号化ステージ）', stage_flac(0), False),
+        ('FLAC -5（符号化ステージ）', stage_flac(5), False),
+        ('FLAC -8（符号化ステージ）', stage_flac(8), False),
+    )
+
+    print("=" * 84)
+    print(f"送信音声の符号化ベンチマーク: {count} 区間, 音声 {audio_sec:.0f} 秒, 回線 {uplink_kbps:.0f}kbps")
+    print("=" * 84)
+    print(f"{'形式':<30} {'送信KB':>8} {'WAV比':>7} {'CPU ms/区間':>11} {'送信秒/区間':>11}")
+    print("-" * 84)
+
+    wav_bytes = None
+    for name, encode, cached in cases:
+        total_bytes, cpu, _ = run(segments, encode, 1, cached)
+        wav_bytes = wav_bytes or total_bytes
+        upload_sec = total_bytes * 8 / (uplink_kbps * 1000) / count
+        print(f"{name:<30} {total_bytes / 1024:>8.0f} {total_bytes / wav_bytes:>7.1%} "
+              f"{cpu / count * 1000:>11.2f} {upload_sec:>11.2f}")
+
+    print("-" * 84)
+    print(f"{ATTEMPTS} 回送信（再試行 {ATTEMPTS - 1} 回）した場合の符号化:")
+    for name, encode, cached in (
+        ('FLAC --best（従来の google）', legacy_flac, False),
+        ('FLAC -5（EncodedAudio で使い回し）', None, True),
+    ):
+        _, cpu, encode_count = run(segments, encode, ATTEMPTS, cached)
+        print(f"  {name:<36} 符号化 {encode_count:>4} 回, CPU {cpu / count * 1000:>7.2f} ms/区間")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+認識サービスへの接続の使い回し（キープアライブ）のベンチマーク
+
+代替サーバー（stand_in_server.py）に新しい接続ごとの遅延（TCP・TLS の接続確立の模擬）を
+設定し、'http' バックエンドから発話区間を認識させる。接続を使い回す場合と
+リクエストごとに接続する場合について、認識ワーカー数ごとに1リクエストの所要時間の
+百分位数、開いた接続数、使い回しの割合を表示する。
+
+使い方:
+    python benchmarks/bench_http_pool.py [リクエスト数] [接続確立の遅延（秒）] [応答の遅延（秒）]
+"""
+
+import sys
+import threading
+import time
+
+from fixtures import synthesize_speech_like
+from stand_in_server import StandInServer
+from src.audio.backends import HttpBackend
+from src.audio.codec import EncodedAudio
+from src.audio.http_pool import HttpConnectionPool
+from src.utils.tracing import LatencyHistogram
+
+SAMPLE_RATE = 16000
+
+
+def run(server, segments, keep_alive, workers):
+    """ワーカー数だけのスレッドで区間を認識し、(所要時間の百分位数, 接続の統計) を返す"""
+    backend = HttpBackend(url=server.url, codec='wav', pool=HttpConnectionPool(keep_alive=keep_alive))
+    histogram = LatencyHistogram(max_samples=len(segments))
+    lock = threading.Lock()
+    next_index = [0]
+
+    def worker():
+        while True:
+            with lock:
+                index = next_index[0]
+                next_index[0] += 1
+            if index >= len(segments):
+                return
+            started = time.perf_counter()
+            backend.recognize(segments[index], 'ja-JP')
+            elapsed = time.perf_counter() - started
+            with lock:
+                histogram.add(elapsed)
+
+    threads = [threading.Thread(target=worker) for _ in range(workers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    stats = backend.connection_stats()
+    backend.close()
+    return histogram.percentiles(), stats
+
+
+def main():
+    requests = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    handshake = float(sys.argv[2]) if len(sys.argv) > 2 else 0.03
+    latency = float(sys.argv[3]) if len(sys.argv) > 3 else 0.02
+
+    server = StandInServer(latency=latency, jitter=0.0, handshake=handshake).start()
+    segments = [
+        EncodedAudio(synthesize_speech_like(SAMPLE_RATE, 1.5, seed=index).tobytes(), SAMPLE_RATE, 2)
+        for index in range(20)
+    ]
+    segments = [segments[index % len(segments)] for index in range(requests)]
+
+    print("=" * 76)
+    print(f"接続の使い回し: {requests} リクエスト, 接続確立 {handshake * 1000:.0f} ms, 応答 {latency * 1000:.0f} ms")
+    print("=" * 76)
+    print(f"{'接続':<10} {'ワーカー':>6} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'接続数':>6} {'使い回し':>8}")
+    for workers in (1, 4):
+        for label, keep_alive in (("毎回接続", False), ("使い回す", True)):
+            values, stats = run(server, segments, keep_alive, workers)
+            print(f"{label:<10} {workers:>6} {values['p50'] * 1000:>8.1f} {values['p95'] * 1000:>8.1f} "
+                  f"{values['p99'] * 1000:>8.1f} {stats['connections_opened']:>6} {stats['reuse_ratio'] * 100:>7.0f}%")
+    server.stop()
+
+
+if __name__ == "__main__":
+    main()
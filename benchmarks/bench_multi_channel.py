@@ -0,0 +1,128 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+複数チャンネル録音のベンチマーク
+
+合成音声の入力元（SyntheticSource）の N チャンネルのデバイスを1台録音し、チャンネルごとの
+VAD・認識レーンで処理する。認識には区間の長さに比例して時間のかかる 'fake'
+バックエンドを使い、結果を合流させない場合とさせる場合（ResultMerger）で、
+届いた結果の順序の乱れ（発話の開始位置が前の結果より前に戻った回数）と
+チャンネル名ごとの件数、コールバックでのチャンネル分離の所要時間を表示する。
+
+使い方:
+    python benchmarks/bench_multi_channel.py [チャンネル数] [音声の秒数] [再生速度]
+"""
+
+import sys
+import threading
+import time
+from collections import Counter
+
+import numpy as np
+
+from fixtures import project_root  # noqa: F401  （プロジェクトルートをパスに追加）
+from src.audio.backends import FakeBackend
+from src.audio.recognizer import ResultKind, SpeechRecognizer
+from src.audio.recorder import AudioRecorder
+from src.audio.sources import SyntheticSource
+
+SECONDS_PER_AUDIO_SECOND = 0.15  # 音声1秒あたりの認識時間（長い区間ほど結果が遅れる）
+
+
+class LengthProportionalBackend(FakeBackend):
+    """区間の長さに比例して待機する 'fake' バックエンド"""
+
+    def recognize(self, audio, language):
+        seconds = len(audio.get_raw_data()) / (audio.sample_rate * audio.sample_width)
+        time.sleep(seconds * SECONDS_PER_AUDIO_SECOND)
+        return super().recognize(audio, language)
+
+
+def measure_deinterleave(channels, frames=1024, repeat=2000):
+    """コールバック1回分のチャンネル分離（転置して連続した配列にする）の所要時間（マイクロ秒）"""
+    in_data = np.random.default_rng(0).integers(-3000, 3000, frames * channels, dtype=np.int16).tobytes()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        np.ascontiguousarray(np.frombuffer(in_data, dtype=np.int16).reshape(-1, channels).T)
+    return (time.perf_counter() - start) / repeat * 1e6
+
+
+def run(channels, seconds, speed, merged):
+    """
+    1回録音して認識結果を集計
+
+    Returns:
+        tuple: (届いた順の (発話ID, 入力元) のリスト, レコーダー)
+    """
+    audio_source = SyntheticSource(1, seconds, channels=channels, speed=speed, seed=100)
+    recorder = AudioRecorder(audio_source=audio_source, channels=channels)
+
+    recognizer = SpeechRecognizer(use_microphone=False)
+    recognizer.backend = LengthProportionalBackend()
+    recognizer.cache = None
+    if recognizer.spool is not None:
+        # ベンチマークの音声を次回起動時に再認識させない
+        recognizer.spool.close()
+        recognizer.spool = None
+    if merged:
+        recognizer.set_merged_sources(recorder.merged_sources)
+
+    arrivals = []
+    lock = threading.Lock()
+
+    def on_result(text, trace=None, kind=ResultKind.FINAL, utterance_id=None, source=None):
+        if kind != ResultKind.FINAL or not text:
+            return
+        with lock:
+            arrivals.append((utterance_id, source))
+
+    def on_audio_data(audio_data, trace=None, utterance_id=None, source=None, **segment):
+        recognizer.recognize_from_audio_data(audio_data, recorder.rate, trace, utterance_id, source, **segment)
+
+    recognizer.set_callbacks(on_recognition_result=on_result, on_error=print)
+    recorder.set_callbacks(on_audio_data=on_audio_data, on_error=print)
+
+    recorder.start_recording()
+    while not recorder.input_finished:
+        time.sleep(0.1)
+    recorder.stop_recording()
+
+    # 認識待ちが捌けるまで待つ
+    deadline = time.perf_counter() + 30
+    while time.perf_counter() < deadline:
+        with lock:
+            done = len(arrivals) >= recorder.segment_count
+        if done:
+            break
+        time.sleep(0.1)
+
+    recognizer.cleanup()
+    recorder.cleanup()
+    audio_source.terminate()
+    return arrivals, recorder
+
+
+def main():
+    channels = int(sys.argv[1]) if len(sys.argv) > 1 else 4
+    seconds = float(sys.argv[2]) if len(sys.argv) > 2 else 20.0
+    speed = float(sys.argv[3]) if len(sys.argv) > 3 else 2.0
+
+    print("=" * 72)
+    print(f"複数チャンネル録音: {channels} チャンネル × {seconds:.0f} 秒, {speed:.1f} 倍速")
+    print("=" * 72)
+    print(f"チャンネル分離: {measure_deinterleave(channels):.1f} µs / コールバック（1024 フレーム）")
+    print("-" * 72)
+
+    for merged in (False, True):
+        arrivals, recorder = run(channels, seconds, speed, merged)
+        starts = [utterance_id for utterance_id, _ in arrivals]
+        inversions = sum(1 for before, after in zip(starts, starts[1:]) if after < before)
+        per_source = Counter(source for _, source in arrivals)
+        title = "合流あり（開始順）" if merged else "合流なし（届いた順）"
+        print(f"{title}: 結果 {len(arrivals)} 件 / 区間 {recorder.segment_count}, "
+              f"順序の乱れ {inversions} 回, 上書き {recorder.overrun_count} 回")
+        print("  " + ", ".join(f"{source}: {per_source[source]}" for source in recorder.channel_sources))
+
+
+if __name__ == "__main__":
+    main()
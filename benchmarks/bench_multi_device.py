@@ -0,0 +1,91 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+複数デバイス同時録音のベンチマーク
+
+合成音声の入力元（SyntheticSource）の N 台のデバイスを同時に録音し、入力元ごとのレーンで
+'fake' バックエンドに認識させて、デバイスごとの処理量（実時間比）・区間数・
+リングの上書き・認識待ちの破棄と、入力元の名前付きで届いた結果の件数を表示する。
+
+使い方:
+    python benchmarks/bench_multi_device.py [デバイス数] [音声の秒数] [再生速度] [認識遅延（秒）]
+"""
+
+import sys
+import threading
+import time
+from collections import Counter
+
+from fixtures import project_root  # noqa: F401  （プロジェクトルートをパスに追加）
+from src.audio.multi_device import MultiDeviceRecorder
+from src.audio.recognizer import ResultKind, SpeechRecognizer
+from src.audio.sources import SyntheticSource
+
+
+def main():
+    device_count = int(sys.argv[1]) if len(sys.argv) > 1 else 4
+    seconds = float(sys.argv[2]) if len(sys.argv) > 2 else 20.0
+    speed = float(sys.argv[3]) if len(sys.argv) > 3 else 4.0
+    latency = float(sys.argv[4]) if len(sys.argv) > 4 else 0.2
+
+    audio_source = SyntheticSource(device_count, seconds, speed=speed, seed=100)
+    recorder = MultiDeviceRecorder(range(device_count), audio_source=audio_source)
+
+    recognizer = SpeechRecognizer(use_microphone=False)
+    recognizer.set_backend('fake', latency=latency)
+    recognizer.cache = None
+    if recognizer.spool is not None:
+        # ベンチマークの音声を次回起動時に再認識させない
+        recognizer.spool.close()
+        recognizer.spool = None
+
+    results = Counter()
+    untagged = [0]
+    lock = threading.Lock()
+
+    def on_result(text, trace=None, kind=ResultKind.FINAL, utterance_id=None, source=None):
+        if kind != ResultKind.FINAL or not text:
+            return
+        with lock:
+            if source is None:
+                untagged[0] += 1
+            results[source] += 1
+
+    def on_audio_data(audio_data, trace=None, utterance_id=None, source=None, **segment):
+        recognizer.recognize_from_audio_data(audio_data, recorder.rate, trace, utterance_id, source, **segment)
+
+    recognizer.set_callbacks(on_recognition_result=on_result, on_error=print)
+    recorder.set_callbacks(on_audio_data=on_audio_data, on_error=print)
+
+    print("=" * 76)
+    print(f"複数デバイス同時録音: {device_count} 台 × {seconds:.0f} 秒, {speed:.1f} 倍速, 認識遅延 {latency:.2f} 秒")
+    print("=" * 76)
+
+    start = time.perf_counter()
+    recorder.start_recording()
+    while not recorder.input_finished:
+        time.sleep(0.1)
+    recorder.stop_recording()
+
+    # 認識待ちが捌けるまで待つ
+    deadline = time.perf_counter() + 30
+    while any(stats['pending'] for stats in recognizer.lane_stats().values()) and time.perf_counter() < deadline:
+        time.sleep(0.1)
+    time.sleep(latency * 2 + 0.2)
+    elapsed = time.perf_counter() - start
+
+    print(recorder.format_report(recognizer))
+    print("-" * 76)
+    for row in recorder.report(recognizer):
+        print(f"{row['source']:<28} 結果 {results[row['source']]:>4} 件 / 区間 {row['segments']:>4}")
+    print(f"入力元のない結果: {untagged[0]} 件")
+    total_audio = sum(row['captured_seconds'] for row in recorder.report())
+    print(f"合計: 音声 {total_audio:.0f} 秒を {elapsed:.1f} 秒で処理（{total_audio / elapsed:.1f} 倍速）")
+
+    recognizer.cleanup()
+    recorder.cleanup()
+    audio_source.terminate()
+
+
+if __name__ == "__main__":
+    main()
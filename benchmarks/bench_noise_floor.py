@@ -0,0 +1,126 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+環境ノイズへの閾値の追従（固定 / 適応）のベンチマーク
+
+静かな部屋 → 空調などの低い騒音が続く → 静かな部屋 と環境音が変わる中で
+発話が続く音声を合成し、録音時と同じ1024フレーム単位で VoiceActivityDetector に流す。
+閾値を固定した場合と NoiseFloorTracker で追従させた場合について、認識に送る区間数、
+発話を含まない区間（無駄な認識呼び出し）の数、区間に入らなかった発話の数、
+認識に送った音声の秒数とそのうち発話以外の秒数、場面ごとの閾値と、推定の更新1回あたりの処理時間を表示する。
+
+使い方:
+    python benchmarks/bench_noise_floor.py [騒音のRMS] [各場面の秒数]
+"""
+
+import sys
+import time
+
+import numpy as np
+
+from fixtures import project_root  # noqa: F401  （プロジェクトルートをパスに追加）
+from src.audio.noise_floor import NoiseFloorTracker
+from src.audio.vad import VoiceActivityDetector
+from src.utils.config import Config
+
+SAMPLE_RATE = 16000
+CHUNK = 1024  # AudioRecorder.chunk と同じ
+
+
+def synthesize_scene(noise_rms, scene_sec, seed=0):
+    """
+    環境音が 静か → 騒音 → 静か と変わる中の発話を合成
+
+    騒音は低域に偏ったノイズ（空調のうなりの模擬）で、ゼロ交差率では除外できない。
+
+    Returns:
+        tuple: (int16の音声, [(開始位置, 終了位置)] の発話のリスト, [(開始位置, 終了位置)] の騒音の区間)
+    """
+    rng = np.random.default_rng(seed)
+    total = int(SAMPLE_RATE * scene_sec * 3)
+    audio = rng.normal(0, 30, total)
+
+    noisy = (int(SAMPLE_RATE * scene_sec), int(SAMPLE_RATE * scene_sec * 2))
+    rumble = np.convolve(rng.normal(0, 1, noisy[1] - noisy[0] + 63), np.ones(64) / 64, mode='valid')
+    audio[noisy[0]:noisy[1]] += rumble / np.std(rumble) * noise_rms
+
+    utterances = []
+    position = int(SAMPLE_RATE * rng.uniform(0.5, 1.0))
+    while position < total - SAMPLE_RATE:
+        length = int(SAMPLE_RATE * rng.uniform(0.6, 2.0))
+        end = min(total, position + length)
+        t = np.arange(end - position) / SAMPLE_RATE
+        f0 = rng.uniform(100, 220) * (1 + 0.05 * np.sin(2 * np.pi * 3 * t))
+        phase = 2 * np.pi * np.cumsum(f0) / SAMPLE_RATE
+        voiced = sum(np.sin(k * phase) / k for k in range(1, 8))
+        envelope = 0.55 + 0.45 * np.sin(2 * np.pi * rng.uniform(3, 5) * t)
+        audio[position:end] += rng.uniform(600, 3000) * voiced * envelope  # 声の大きさは話者によって違う
+        utterances.append((position, end))
+        position = end + int(SAMPLE_RATE * rng.uniform(1.0, 3.0))
+
+    return np.clip(audio, -32768, 32767).astype(np.int16), utterances, [noisy]
+
+
+def run(audio, utterances, tracker):
+    """VAD に流し、(区間, 発話なしの区間数, 取りこぼした発話数, 送った秒数, うち発話以外の秒数, 閾値の推移) を返す"""
+    vad = VoiceActivityDetector(SAMPLE_RATE, overlap_ms=0, noise_tracker=tracker)
+    segments = []
+    thresholds = []
+    for offset in range(0, len(audio), CHUNK):
+        segments.extend(vad.process(audio[offset:offset + CHUNK]))
+        thresholds.append((offset, vad.energy_threshold))
+    tail = vad.flush()
+    if tail:
+        segments.append(tail)
+
+    def overlaps(segment, utterance):
+        return segment.start < utterance[1] and utterance[0] < segment.end
+
+    wasted = sum(1 for segment in segments if not any(overlaps(segment, u) for u in utterances))
+    missed = sum(1 for utterance in utterances if not any(overlaps(s, utterance) for s in segments))
+    speech = np.zeros(len(audio), dtype=bool)
+    for start, end in utterances:
+        speech[start:end] = True
+    sent = sum(segment.end - segment.start for segment in segments)
+    sent_noise = sum(int(np.count_nonzero(~speech[segment.start:segment.end])) for segment in segments)
+    return segments, wasted, missed, sent / SAMPLE_RATE, sent_noise / SAMPLE_RATE, thresholds
+
+
+def main():
+    noise_rms = float(sys.argv[1]) if len(sys.argv) > 1 else 600.0
+    scene_sec = float(sys.argv[2]) if len(sys.argv) > 2 else 30.0
+
+    audio, utterances, noisy_ranges = synthesize_scene(noise_rms, scene_sec)
+
+    print("=" * 76)
+    print(f"環境ノイズへの追従: 静か → 騒音 RMS {noise_rms:.0f} → 静か（各 {scene_sec:.0f} 秒）, 発話 {len(utterances)} 件")
+    print("=" * 76)
+    print(f"{'閾値':<6} {'区間数':>6} {'発話なし':>8} {'取りこぼし':>8} {'送った秒':>8} {'うち非発話':>10} "
+          f"{'閾値:静か':>8} {'騒音中':>6} {'騒音後':>6}")
+    for label, tracker in (("固定", None), ("適応", NoiseFloorTracker())):
+        segments, wasted, missed, sent, sent_noise, thresholds = run(audio, utterances, tracker)
+        noisy_start, noisy_end = noisy_ranges[0]
+
+        def threshold_at(position):
+            return next((value for offset, value in thresholds if offset >= position), thresholds[-1][1])
+
+        print(f"{label:<6} {len(segments):>6} {wasted:>8} {missed:>8} {sent:>8.1f} {sent_noise:>10.1f} "
+              f"{threshold_at(noisy_start - CHUNK):>8.0f} {threshold_at(noisy_end - CHUNK):>6.0f} "
+              f"{threshold_at(len(audio) - CHUNK):>6.0f}")
+
+    # 更新1回（1チャンク分のフレーム）あたりの処理時間
+    tracker = NoiseFloorTracker()
+    frame_size = int(SAMPLE_RATE * Config.VAD_FRAME_MS / 1000)
+    rms = np.abs(np.random.default_rng(1).normal(300, 50, CHUNK // frame_size)).astype(np.float32)
+    repeats = 20000
+    started = time.perf_counter()
+    for _ in range(repeats):
+        tracker.update(rms, frame_size / SAMPLE_RATE)
+    per_update = (time.perf_counter() - started) / repeats
+    print("-" * 76)
+    print(f"推定の更新: 1回 {per_update * 1e6:.1f} µs（チャンク {CHUNK / SAMPLE_RATE * 1000:.0f} ms ごと、"
+          f"実時間の {per_update / (CHUNK / SAMPLE_RATE) * 100:.3f}%）")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+長い発話の区切り方（重ねない／重ねる）による単語誤り率のベンチマーク
+
+最大長（Config.PHRASE_TIME_LIMIT）より長い連続した発話を、単語ごとの時刻が分かる
+フィクスチャとして合成し、録音時と同じ1024フレーム単位で VoiceActivityDetector に流す。
+認識の代わりに、区間に丸ごと入った単語はそのまま、区切りで欠けた単語は欠けた割合に
+応じて断片か脱落として返す代役を使い、区間の結果を OverlapStitcher でつなぎ合わせて
+元の単語列との誤り率（WER、日本語は文字単位）と、認識に送った音声の増加率を表示する。
+
+使い方:
+    python benchmarks/bench_overlap.py [発話数] [重ねる長さ（ミリ秒）]
+"""
+
+import math
+import sys
+
+import numpy as np
+
+from fixtures import project_root  # noqa: F401  （プロジェクトルートをパスに追加）
+from src.audio.overlap import OverlapStitcher, tokenize
+from src.audio.vad import VoiceActivityDetector
+from src.utils.config import Config
+
+SAMPLE_RATE = 16000
+CHUNK = 1024  # AudioRecorder.chunk と同じ
+
+VOCABULARIES = {
+    '英単語': ("meeting budget schedule review project design customer report market "
+              "quality product support release feature testing planning analysis "
+              "strategy contract delivery").split(),
+    '日本語': ["かいぎ", "よさん", "けいかく", "しりょう", "けんとう", "もんだい", "かくにん",
+              "せつめい", "じっけん", "てすと", "せっけい", "しんちょく", "たんとう", "きじつ"],
+}
+
+
+def synthesize_script(words, utterances, seed=0):
+    """
+    単語の時刻付きの連続発話を合成
+
+    発話の中の単語の間は VAD のハングオーバーより短くし、1発話が最大長を
+    超えて強制的に区切られるようにする。
+
+    Returns:
+        tuple: (int16の音声, [(開始位置, 終了位置, 単語)] のリスト)
+    """
+    rng = np.random.default_rng(seed)
+    pieces = [rng.normal(0, 30, int(SAMPLE_RATE * 0.5))]
+    position = len(pieces[0])
+    timeline = []
+    for _ in range(utterances):
+        utterance_end = position + int(SAMPLE_RATE * rng.uniform(8, 20))
+        while position < utterance_end:
+            length = int(SAMPLE_RATE * rng.uniform(0.3, 0.6))
+            t = np.arange(length) / SAMPLE_RATE
+            f0 = rng.uniform(100, 220) * (1 + 0.05 * np.sin(2 * np.pi * 3 * t))
+            phase = 2 * np.pi * np.cumsum(f0) / SAMPLE_RATE
+            voiced = sum(np.sin(k * phase) / k for k in range(1, 8))
+            envelope = 0.6 + 0.4 * np.sin(np.pi * t / t[-1])
+            pieces.append(rng.normal(0, 30, length) + 3000 * voiced * envelope)
+            timeline.append((position, position + length, words[rng.integers(len(words))]))
+            position += length
+
+            gap = int(SAMPLE_RATE * rng.uniform(0.03, 0.1))
+            pieces.append(rng.normal(0, 30, gap))
+            position += gap
+        pause = int(SAMPLE_RATE * rng.uniform(0.8, 1.5))
+        pieces.append(rng.normal(0, 30, pause))
+        position += pause
+
+    audio = np.clip(np.concatenate(pieces), -32768, 32767).astype(np.int16)
+    return audio, timeline
+
+
+def segment(audio, overlap_ms):
+    """録音時と同じ単位で VAD に流して区間を取得"""
+    vad = VoiceActivityDetector(SAMPLE_RATE, overlap_ms=overlap_ms)
+    segments = []
+    for offset in range(0, len(audio), CHUNK):
+        segments.extend(vad.process(audio[offset:offset + CHUNK]))
+    tail = vad.flush()
+    if tail:
+        segments.append(tail)
+    return segments
+
+
+def recognize_window(timeline, start, end, separator):
+    """区間の認識の代役（欠けた単語は断片にするか落とす）"""
+    words = []
+    for word_start, word_end, word in timeline:
+        if word_end <= start or word_start >= end:
+            continue
+        covered = (min(end, word_end) - max(start, word_start)) / (word_end - word_start)
+        if covered >= 0.95:
+            words.append(word)
+        elif covered >= 0.4:
+            size = max(1, math.ceil(len(word) * covered) - 1)
+            words.append(word[:size] if word_start >= start else word[-size:])
+    return separator.join(words)
+
+
+def error_rate(reference, hypothesis):
+    """単位（単語、日本語は文字）ごとの編集距離 / 参照の単位数"""
+    ref = [token for _, _, token in tokenize(reference)]
+    hyp = [token for _, _, token in tokenize(hypothesis)]
+    row = list(range(len(hyp) + 1))
+    for i, ref_token in enumerate(ref, 1):
+        previous, row[0] = row[0], i
+        for j, hyp_token in enumerate(hyp, 1):
+            previous, row[j] = row[j], min(row[j] + 1, row[j - 1] + 1, previous + (ref_token != hyp_token))
+    return row[-1] / max(1, len(ref))
+
+
+def run(audio, timeline, overlap_ms, separator):
+    """区切り方ごとに認識・つなぎ合わせを行い、(WER, 区間数, 送った音声の秒数, つないだ数) を返す"""
+    segments = segment(audio, overlap_ms)
+    results = []
+    stitcher = OverlapStitcher(lambda source, utterance_id, result: results.append(result[0]))
+    for item in segments:
+        stitcher.register(None, item.start, item.end - item.start, item.overlap, item.continued)
+    # 認識レーンは録音順に結果を返すため、区間の順に完了させる
+    for item in segments:
+        text = recognize_window(timeline, item.start, item.end, separator)
+        stitcher.complete(None, item.start, (text, None))
+    stitcher.flush()
+
+    reference = separator.join(word for _, _, word in timeline)
+    hypothesis = separator.join(text for text in results if text)
+    sent = sum(item.end - item.start for item in segments) / SAMPLE_RATE
+    return error_rate(reference, hypothesis), len(segments), sent, stitcher.stitched_count
+
+
+def main():
+    utterances = int(sys.argv[1]) if len(sys.argv) > 1 else 40
+    overlap_ms = int(sys.argv[2]) if len(sys.argv) > 2 else Config.VAD_OVERLAP_MS
+
+    print("=" * 72)
+    print(f"長い発話の区切り方: {utterances} 発話, 最大長 {Config.PHRASE_TIME_LIMIT} 秒, 重ね {overlap_ms} ms")
+    print("=" * 72)
+    print(f"{'語彙':<6} {'区切り方':<10} {'誤り率':>8} {'区間数':>6} {'送った音声 秒':>12} {'増加':>7} {'つないだ数':>8}")
+    for name, words in VOCABULARIES.items():
+        separator = " " if name == '英単語' else ""
+        audio, timeline = synthesize_script(words, utterances)
+        baseline = None
+        for label, overlap in (("重ねない", 0), ("重ねる", overlap_ms)):
+            wer, count, sent, stitched = run(audio, timeline, overlap, separator)
+            baseline = baseline or sent
+            print(f"{name:<6} {label:<10} {wer * 100:>7.2f}% {count:>6} {sent:>12.1f} "
+                  f"{(sent / baseline - 1) * 100:>6.1f}% {stitched:>8}")
+
+
+if __name__ == "__main__":
+    main()
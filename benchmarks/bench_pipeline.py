@@ -0,0 +1,168 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+連続認識の処理方式（スレッド / asyncio パイプライン）のベンチマーク
+
+合成音声の入力元（SyntheticSource）の N 台のデバイスを同時に録音し、同じ音声を
+スレッド方式（デバイスごとの音声処理スレッド＋入力元ごとのレーン）と
+asyncio パイプライン（RecognitionPipeline）でそれぞれ 'fake' バックエンドに認識させる。
+処理方式ごとに、届いた結果の件数、同時に認識していたリクエスト数の最大値、
+再生スレッド以外のスレッド数の最大値、認識待ちの破棄数、録音停止から結果が
+出そろうまでの時間を表示する。
+
+使い方:
+    python benchmarks/bench_pipeline.py [デバイス数] [音声の秒数] [再生速度] [認識遅延（秒）]
+"""
+
+import sys
+import threading
+import time
+
+from fixtures import project_root  # noqa: F401  （プロジェクトルートをパスに追加）
+from src.audio.backends import FakeBackend
+from src.audio.multi_device import MultiDeviceRecorder
+from src.audio.pipeline import RecognitionPipeline
+from src.audio.recognizer import ResultKind, SpeechRecognizer
+from src.audio.sources import SyntheticSource
+
+
+class CountingBackend(FakeBackend):
+    """同時に認識しているリクエスト数を数える 'fake' バックエンド"""
+
+    name = 'fake'
+
+    def __init__(self, latency):
+        super().__init__(latency=latency)
+        self._lock = threading.Lock()
+        self.active = 0
+        self.peak = 0
+
+    def _enter(self):
+        with self._lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+
+    def _leave(self):
+        with self._lock:
+            self.active -= 1
+
+    def recognize(self, audio, language):
+        self._enter()
+        try:
+            return super().recognize(audio, language)
+        finally:
+            self._leave()
+
+    async def recognize_async(self, audio, language):
+        self._enter()
+        try:
+            return await super().recognize_async(audio, language)
+        finally:
+            self._leave()
+
+
+class ThreadMonitor:
+    """再生スレッド以外のスレッド数の最大値を記録"""
+
+    def __init__(self):
+        self.peak = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="ThreadMonitor")
+        self._thread.daemon = True
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(0.02):
+            count = sum(1 for thread in threading.enumerate()
+                        if thread.name not in ("ReplayStream", "ThreadMonitor"))
+            self.peak = max(self.peak, count)
+
+
+def run(mode, device_count, seconds, speed, latency):
+    """1つの処理方式で録音・認識し、結果をまとめて返す"""
+    audio_source = SyntheticSource(device_count, seconds, speed=speed, seed=100)
+    recorder = MultiDeviceRecorder(range(device_count), audio_source=audio_source)
+    backend = CountingBackend(latency)
+    results = [0]
+    lock = threading.Lock()
+
+    def on_result(text, trace=None, kind=ResultKind.FINAL, utterance_id=None, source=None):
+        if kind == ResultKind.FINAL and text:
+            with lock:
+                results[0] += 1
+
+    recognizer = pipeline = None
+    if mode == 'asyncio':
+        pipeline = RecognitionPipeline(backend)
+        pipeline.subscribe(on_result)
+        pipeline.set_callbacks(on_error=print)
+        recorder.set_callbacks(on_error=print, on_captured_audio=pipeline.feed)
+        pipeline.start()
+    else:
+        recognizer = SpeechRecognizer(use_microphone=False)
+        recognizer.backend = backend
+        recognizer.cache = None
+        if recognizer.spool is not None:
+            # ベンチマークの音声を次回起動時に再認識させない
+            recognizer.spool.close()
+            recognizer.spool = None
+
+        def on_audio_data(audio_data, trace=None, utterance_id=None, source=None, **segment):
+            recognizer.recognize_from_audio_data(audio_data, recorder.rate, trace, utterance_id, source, **segment)
+
+        recognizer.set_callbacks(on_recognition_result=on_result, on_error=print)
+        recorder.set_callbacks(on_audio_data=on_audio_data, on_error=print)
+
+    with ThreadMonitor() as monitor:
+        recorder.start_recording()
+        while not recorder.input_finished:
+            time.sleep(0.05)
+        stopped = time.perf_counter()
+        recorder.stop_recording()
+
+        # 認識待ちが捌けるまで待つ
+        if pipeline is not None:
+            pipeline.end_streams()
+            pipeline.drain(30)
+            dropped = pipeline.stats()['dropped_chunks']
+        else:
+            deadline = time.perf_counter() + 30
+            while (any(stats['pending'] for stats in recognizer.lane_stats().values())
+                   or backend.active) and time.perf_counter() < deadline:
+                time.sleep(0.01)
+            dropped = sum(stats['dropped'] for stats in recognizer.lane_stats().values())
+        settle = time.perf_counter() - stopped
+
+    if pipeline is not None:
+        pipeline.stop()
+    else:
+        recognizer.cleanup()
+    recorder.cleanup()
+    audio_source.terminate()
+    return results[0], backend.peak, monitor.peak, dropped, settle
+
+
+def main():
+    device_count = int(sys.argv[1]) if len(sys.argv) > 1 else 16
+    seconds = float(sys.argv[2]) if len(sys.argv) > 2 else 20.0
+    speed = float(sys.argv[3]) if len(sys.argv) > 3 else 4.0
+    latency = float(sys.argv[4]) if len(sys.argv) > 4 else 0.5
+
+    print("=" * 76)
+    print(f"連続認識の処理方式: {device_count} 台 × {seconds:.0f} 秒, {speed:.1f} 倍速, 認識遅延 {latency:.2f} 秒")
+    print("=" * 76)
+    print(f"{'処理方式':<10} {'結果':>6} {'同時リクエスト最大':>16} {'スレッド最大':>10} {'破棄':>6} {'停止後の待ち 秒':>14}")
+    for mode in ('threads', 'asyncio'):
+        count, peak_requests, peak_threads, dropped, settle = run(mode, device_count, seconds, speed, latency)
+        print(f"{mode:<10} {count:>6} {peak_requests:>16} {peak_threads:>10} {dropped:>6} {settle:>14.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+入力元（合成音声・WAVファイルの再生）による録音〜認識の負荷試験
+
+マイクの代わりに SyntheticSource / FileSource を AudioRecorder（複数デバイスでは
+MultiDeviceRecorder）に渡し、録音・発話区間の検出・'fake' バックエンドでの認識を
+実時間の何倍で回せるかを計測する。再生速度ごとに、処理にかかった時間と倍速、
+区間数、認識結果の件数、リングの上書き・認識待ちの破棄、最速再生の結果と
+同じ認識結果が得られたかを表示する。最速再生では区間を破棄せず
+（OverflowPolicy.BLOCK）、認識が空くまで入力元を待たせる。
+
+使い方:
+    python benchmarks/bench_replay.py [デバイス数] [音声の秒数] [認識遅延（秒）]
+"""
+
+import os
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+
+import numpy as np
+
+from fixtures import write_wav
+from src.audio.multi_device import create_recorder
+from src.audio.recognizer import ResultKind, SpeechRecognizer
+from src.audio.scheduler import OverflowPolicy
+from src.audio.sources import FileSource, SyntheticSource
+
+
+def run(audio_source, latency):
+    """入力元を最後まで認識し、(経過秒, 音声秒, 区間数, 入力元ごとの結果, 上書き, 破棄) を返す"""
+    recorder = create_recorder(audio_source=audio_source)
+    recognizer = SpeechRecognizer(
+        use_microphone=False,
+        overflow_policy=None if audio_source.realtime else OverflowPolicy.BLOCK
+    )
+    recognizer.set_backend('fake', latency=latency)
+    recognizer.cache = None
+    if recognizer.spool is not None:
+        # ベンチマークの音声を次回起動時に再認識させない
+        recognizer.spool.close()
+        recognizer.spool = None
+
+    results = defaultdict(list)
+    lock = threading.Lock()
+
+    def on_result(text, trace=None, kind=ResultKind.FINAL, utterance_id=None, source=None):
+        if kind == ResultKind.FINAL and text:
+            with lock:
+                results[source].append(text)
+
+    def on_audio_data(audio_data, trace=None, utterance_id=None, source=None, **segment):
+        recognizer.recognize_from_audio_data(audio_data, recorder.rate, trace, utterance_id, source, **segment)
+
+    recognizer.set_callbacks(on_recognition_result=on_result, on_error=print)
+    recorder.set_callbacks(on_audio_data=on_audio_data, on_error=print)
+
+    started = time.perf_counter()
+    recorder.start_recording()
+    while not recorder.input_finished:
+        time.sleep(0.005)
+    recorder.stop_recording()
+    recognizer.drain(60)
+    elapsed = time.perf_counter() - started
+
+    recorders = getattr(recorder, 'recorders', [recorder])
+    segments = sum(item.segment_count for item in recorders)
+    overruns = sum(item.overrun_count for item in recorders)
+    schedulers = [recognizer.scheduler] + list(recognizer.lanes.values())
+    dropped = sum(scheduler.dropped_count for scheduler in schedulers)
+    seconds = recorder.captured_seconds
+    recognizer.cleanup()
+    recorder.cleanup()
+    audio_source.terminate()
+    return elapsed, seconds, segments, dict(results), overruns, dropped
+
+
+def main():
+    device_count = int(sys.argv[1]) if len(sys.argv) > 1 else 4
+    seconds = float(sys.argv[2]) if len(sys.argv) > 2 else 60.0
+    latency = float(sys.argv[3]) if len(sys.argv) > 3 else 0.0
+
+    print("=" * 84)
+    print(f"入力元の再生による負荷試験: {device_count} 台 × {seconds:.0f} 秒, 認識遅延 {latency:.2f} 秒")
+    print("=" * 84)
+    print(f"{'入力元':<14} {'速度':>6} {'処理秒':>8} {'倍速':>8} {'区間':>6} {'結果':>6} "
+          f"{'上書き':>6} {'破棄':>6} {'最速と一致':>10}")
+
+    def show(label, speed, outcome, reference):
+        elapsed, audio_seconds, segments, results, overruns, dropped = outcome
+        count = sum(len(texts) for texts in results.values())
+        same = "-" if reference is None else ("はい" if results == reference else "いいえ")
+        print(f"{label:<14} {speed:>6} {elapsed:>8.2f} {audio_seconds / elapsed:>8.1f} {segments:>6} {count:>6} "
+              f"{overruns:>6} {dropped:>6} {same:>10}")
+
+    # 最速再生の結果を基準に、倍速を指定した再生と比べる
+    reference = run(SyntheticSource(device_count, seconds, speed=None), latency)
+    show("合成音声", "最速", reference, None)
+    for speed in (100.0, 10.0):
+        outcome = run(SyntheticSource(device_count, seconds, speed=speed), latency)
+        show("合成音声", f"{speed:.0f}x", outcome, reference[3])
+
+    # 同じ音声をWAVファイルに書き出して再生する（ファイル名が入力元の名前になる）
+    with tempfile.TemporaryDirectory() as directory:
+        synthetic = SyntheticSource(device_count, seconds)
+        paths = []
+        for device in synthetic.devices:
+            path = os.path.join(directory, f"{device['name']}.wav")
+            write_wav(path, np.frombuffer(device['pcm'], dtype=np.int16), int(device['defaultSampleRate']))
+            paths.append(path)
+        outcome = run(FileSource(paths, speed=None), latency)
+        renamed = {
+            f"{index}:{os.path.basename(path)}": reference[3].get(f"{index}:合成音声{index}")
+            for index, path in enumerate(paths)
+        } if device_count > 1 else reference[3]
+        show("WAVファイル", "最速", outcome, renamed)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+認識バックエンド障害時の動作確認ベンチマーク
+
+障害注入できる代替サーバー（stand_in_server.py）に対して連続認識を行い、
+正常 → 全面障害 → 不安定（失敗・応答停止）→ 正常 と状況を切り替えながら、
+区間の取りこぼし、ブレーカーの状態遷移、保留数、結果が届くまでの時間を表示する。
+
+使い方:
+    python benchmarks/bench_resilience.py [区間の投入間隔（秒）]
+"""
+
+import re
+import statistics
+import sys
+import threading
+import time
+import zlib
+
+from fixtures import synthesize_speech_like
+from stand_in_server import StandInServer
+from src.audio.recognizer import ResultKind, SpeechRecognizer
+
+SAMPLE_RATE = 16000
+
+# (フェーズ名, 秒数, 障害設定)
+PHASES = (
+    ('正常', 4, {'failure_rate': 0.0, 'stall_rate': 0.0}),
+    ('全面障害', 6, {'failure_rate': 1.0, 'stall_rate': 0.0}),
+    ('不安定', 5, {'failure_rate': 0.3, 'stall_rate': 0.1}),
+    ('正常', 6, {'failure_rate': 0.0, 'stall_rate': 0.0}),
+)
+
+
+def main():
+    interval = float(sys.argv[1]) if len(sys.argv) > 1 else 0.25
+
+    server = StandInServer(latency=0.05, stall_seconds=5).start()
+
+    recognizer = SpeechRecognizer(use_microphone=False)
+    recognizer.set_backend('http', url=server.url)
+    recognizer.cache = None
+    if recognizer.spool is not None:
+        # ベンチマークの音声を次回起動時に再認識させない
+        recognizer.spool.close()
+        recognizer.spool = None
+    recognizer.backend.timeout = 1.0       # 応答停止を早めに打ち切る
+    recognizer.breaker.reset_timeout = 2.0
+
+    submitted = {}   # 指紋 -> 投入時刻
+    delivered = {}   # 指紋 -> 結果が届くまでの秒数
+    transitions = []
+    errors = []
+    max_parked = [0]
+    lock = threading.Lock()
+    started = time.perf_counter()
+
+    def on_result(text, trace=None, kind=ResultKind.FINAL, utterance_id=None, source=None):
+        if kind != ResultKind.FINAL or not text:
+            return
+        match = re.search(r"#([0-9a-f]{8})", text)
+        with lock:
+            if match and match.group(1) in submitted:
+                delivered[match.group(1)] = time.perf_counter() - submitted[match.group(1)]
+
+    def on_status(state, parked_count):
+        with lock:
+            max_parked[0] = max(max_parked[0], parked_count)
+            if not transitions or transitions[-1][1] != state:
+                transitions.append((time.perf_counter() - started, state))
+
+    recognizer.set_callbacks(
+        on_recognition_result=on_result,
+        on_error=errors.append,
+        on_backend_status=on_status
+    )
+
+    print("=" * 60)
+    print(f"バックエンド障害テスト（区間の投入間隔 {interval:.2f} 秒）")
+    print("=" * 60)
+
+    seed = 0
+    for name, seconds, faults in PHASES:
+        server.set_faults(**faults)
+        print(f"{time.perf_counter() - started:6.1f}s  フェーズ: {name} {faults}")
+        phase_end = time.perf_counter() + seconds
+        while time.perf_counter() < phase_end:
+            seed += 1
+            pcm = synthesize_speech_like(SAMPLE_RATE, 1.0, seed=seed)
+            key = f"{zlib.crc32(pcm.tobytes()):08x}"
+            with lock:
+                submitted[key] = time.perf_counter()
+            recognizer.recognize_from_audio_data(pcm.tobytes(), SAMPLE_RATE, utterance_id=seed)
+            time.sleep(interval)
+
+    # 保留分が送り終わるまで待つ
+    deadline = time.perf_counter() + 30
+    while (recognizer.parked or recognizer.scheduler.pending_count()) and time.perf_counter() < deadline:
+        time.sleep(0.2)
+    time.sleep(1.0)
+    recognizer.cleanup()
+    server.stop()
+
+    latencies = sorted(delivered.values())
+    lost = len(submitted) - len(delivered)
+    print("-" * 60)
+    print("ブレーカーの状態遷移:")
+    for at, state in transitions:
+        print(f"  {at:6.1f}s  {state}")
+    print("-" * 60)
+    print(f"投入区間数:           {len(submitted)}")
+    print(f"結果が届いた区間数:   {len(delivered)}")
+    print(f"取りこぼし:           {lost}"
+          f"（待機キュー超過 {recognizer.scheduler.dropped_count}, "
+          f"保留上限超過 {recognizer.parked_dropped_count}）")
+    print(f"最大保留数:           {max_parked[0]}")
+    print(f"エラー通知数:         {len(errors)}")
+    print(f"サーバー要求数:       {server.stats['requests']}"
+          f"（注入した失敗 {server.stats['failures']}, 応答停止 {server.stats['stalls']}）")
+    if latencies:
+        print(f"結果までの時間:       中央値 {statistics.median(latencies):.2f}s, "
+              f"p95 {latencies[int(0.95 * (len(latencies) - 1))]:.2f}s, 最大 {latencies[-1]:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+サンプリングレート別の送信データ量ベンチマーク
+
+WAVフィクスチャ（44.1kHz）を発話区間に分け、各発話を
+  - 44.1kHzのまま
+  - PolyphaseResampler で16kHzに変換してから
+認識APIへ送る形式（WAV / FLAC）にエンコードし、1発話あたりの
+送信バイト数とエンコード時間を比較する。変換時間は別に表示する
+（アプリでは録音コールバック内で少しずつ変換される）。
+
+使い方:
+    python benchmarks/bench_sample_rate.py [WAVファイルのディレクトリ]
+"""
+
+import sys
+import time
+
+import numpy as np
+import speech_recognition as sr
+
+from fixtures import default_fixture_dir, ensure_fixtures, read_wav
+from src.audio.resampler import PolyphaseResampler
+from src.audio.vad import VoiceActivityDetector
+
+TARGET_RATE = 16000
+
+
+def collect_utterances(paths):
+    """フィクスチャを発話区間に分割"""
+    utterances = []
+    for path in paths:
+        pcm, sample_rate, channels = read_wav(path)
+        samples = np.frombuffer(pcm, dtype=np.int16)[::channels]
+        vad = VoiceActivityDetector(sample_rate)
+        ranges = vad.process(samples)
+        tail = vad.flush()
+        if tail:
+            ranges.append(tail)
+        utterances.extend((samples[segment.start:segment.end].tobytes(), sample_rate) for segment in ranges)
+    return utterances
+
+
+def encode(pcm, sample_rate, target_rate=None):
+    """1発話をエンコードし、(WAVバイト数, FLACバイト数, エンコード秒, 変換秒) を返す"""
+    start = time.perf_counter()
+    if target_rate and target_rate != sample_rate:
+        pcm = PolyphaseResampler(sample_rate, target_rate).process(pcm).tobytes()
+        sample_rate = target_rate
+    resampled = time.perf_counter()
+
+    audio = sr.AudioData(pcm, sample_rate, 2)
+    wav_bytes = len(audio.get_wav_data())
+    flac_bytes = len(audio.get_flac_data())
+    return wav_bytes, flac_bytes, time.perf_counter() - resampled, resampled - start
+
+
+def main():
+    directory = sys.argv[1] if len(sys.argv) > 1 else default_fixture_dir()
+    utterances = collect_utterances(ensure_fixtures(directory))
+    if not utterances:
+        print("発話区間が見つかりませんでした")
+        return
+
+    print("=" * 76)
+    print(f"サンプリングレート比較: {directory}（{len(utterances)} 発話）")
+    print("=" * 76)
+    print(f"{'条件':<16} {'WAV平均':>12} {'FLAC平均':>12} {'エンコード平均':>14} {'変換平均':>10}")
+    print("-" * 76)
+
+    results = {}
+    for label, target in (("44.1kHz そのまま", None), ("16kHz 変換後", TARGET_RATE)):
+        measured = [encode(pcm, rate, target) for pcm, rate in utterances]
+        wav_avg = sum(m[0] for m in measured) / len(measured)
+        flac_avg = sum(m[1] for m in measured) / len(measured)
+        time_avg = sum(m[2] for m in measured) / len(measured)
+        resample_avg = sum(m[3] for m in measured) / len(measured)
+        results[label] = (wav_avg, flac_avg, time_avg)
+        print(f"{label:<16} {wav_avg / 1024:>9.1f} KB {flac_avg / 1024:>9.1f} KB "
+              f"{time_avg * 1000:>11.2f} ms {resample_avg * 1000:>7.2f} ms")
+
+    print("-" * 76)
+    full, reduced = results["44.1kHz そのまま"], results["16kHz 変換後"]
+    print(f"送信データ量: WAV {reduced[0] / full[0]:.1%}, FLAC {reduced[1] / full[1]:.1%}（44.1kHz比）")
+    print(f"エンコード時間: {reduced[2] / full[2]:.1%}（44.1kHz比）")
+
+
+if __name__ == "__main__":
+    main()
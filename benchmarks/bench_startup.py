@@ -0,0 +1,59 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+ヘッドレスモードの起動時間ベンチマーク
+
+`python main.py --headless --check-startup` を繰り返し起動し、
+インタプリタ起動を含むプロセス全体の所要時間と、アプリ内で計測した
+起動時間（main.py 読み込みから録音開始可能まで）を表示する。
+
+使い方:
+    python benchmarks/bench_startup.py [回数] [バックエンド]
+"""
+
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from src.utils.config import Config
+
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    backend = sys.argv[2] if len(sys.argv) > 2 else 'fake'
+    command = [sys.executable, os.path.join(project_root, 'main.py'),
+               '--headless', '--check-startup', '--backend', backend]
+
+    wall_times = []
+    app_times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = subprocess.run(command, capture_output=True, text=True, encoding='utf-8')
+        wall_times.append(time.perf_counter() - start)
+
+        match = re.search(r"起動時間: (\d+) ms", result.stderr)
+        if match:
+            app_times.append(int(match.group(1)) / 1000)
+        else:
+            print(result.stderr.strip())
+
+    print("=" * 50)
+    print(f"ヘッドレス起動時間（{runs} 回, バックエンド: {backend}）")
+    print("=" * 50)
+    print(f"プロセス全体: 中央値 {statistics.median(wall_times) * 1000:.0f} ms, "
+          f"最大 {max(wall_times) * 1000:.0f} ms")
+    if app_times:
+        print(f"アプリ内計測: 中央値 {statistics.median(app_times) * 1000:.0f} ms, "
+              f"最大 {max(app_times) * 1000:.0f} ms")
+        verdict = "OK" if max(app_times) <= Config.HEADLESS_STARTUP_BUDGET else "超過"
+        print(f"起動予算 {Config.HEADLESS_STARTUP_BUDGET * 1000:.0f} ms: {verdict}")
+
+
+if __name__ == "__main__":
+    main()
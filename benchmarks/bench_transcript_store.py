@@ -0,0 +1,147 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+認識結果データベースのベンチマーク
+
+数か月分の認識結果を模した区間を TranscriptStore に保存し、
+まとめ書き（add）と1件ずつコミットする場合の保存速度、全文検索の応答時間
+（p50 / p95）を表示する。比較として、同じ内容を output/ と同じ形式の
+テキストファイルに書き出し、全ファイルを読んで検索する場合の時間も表示する。
+
+使い方:
+    python benchmarks/bench_transcript_store.py [区間数] [日数]
+"""
+
+import os
+import random
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+from fixtures import project_root  # noqa: F401  （プロジェクトルートをパスに追加）
+from src.utils.transcript_store import TranscriptStore
+
+WORDS = (
+    "会議", "予算", "確認", "資料", "来週", "担当", "進捗", "共有", "お客様", "見積もり",
+    "スケジュール", "リリース", "テスト", "不具合", "対応", "検討", "提案", "契約", "報告", "連絡",
+    "今日は", "よろしく", "お願いします", "ありがとうございます", "そうですね", "なるほど",
+)
+QUERIES = ("見積もり", "リリース 不具合", "予算確認", "お客様 契約 報告", "会議")
+SEGMENTS_PER_DAY_FILE = 400  # 1ファイル（1回の録音）あたりの区間数
+
+
+def make_segments(count, days, seed=0):
+    """(UNIX時刻, 入力元, テキスト) のリストを時刻順に生成"""
+    rng = random.Random(seed)
+    end = time.time()
+    start = end - days * 86400
+    times = sorted(rng.uniform(start, end) for _ in range(count))
+    sources = (None, "ch1", "ch2")
+    return [
+        (t, rng.choice(sources), "".join(rng.choice(WORDS) for _ in range(rng.randint(3, 10))))
+        for t in times
+    ]
+
+
+def percentile(values, ratio):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * ratio))]
+
+
+def write_text_files(segments, directory):
+    """output/ と同じ形式（[時刻] [入力元] テキスト）のファイルに書き出す"""
+    for index in range(0, len(segments), SEGMENTS_PER_DAY_FILE):
+        chunk = segments[index:index + SEGMENTS_PER_DAY_FILE]
+        stamp = datetime.fromtimestamp(chunk[0][0]).strftime("%Y%m%d_%H%M%S")
+        with open(os.path.join(directory, f"音声認識結果_{stamp}.txt"), 'w', encoding='utf-8') as file:
+            for recorded_at, source, text in chunk:
+                clock = datetime.fromtimestamp(recorded_at).strftime("%H:%M:%S")
+                file.write(f"[{clock}] [{source}] {text}\n" if source else f"[{clock}] {text}\n")
+
+
+def scan_text_files(directory, query):
+    """全ファイルを読み、すべての語を含む行を探す（データベースがない場合の検索）"""
+    terms = query.split()
+    hits = []
+    for entry in os.scandir(directory):
+        if entry.name.endswith('.txt'):
+            with open(entry.path, 'r', encoding='utf-8') as file:
+                hits.extend(line for line in file if all(term in line for term in terms))
+    return hits
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    days = int(sys.argv[2]) if len(sys.argv) > 2 else 180
+
+    segments = make_segments(count, days)
+    work_dir = tempfile.mkdtemp(prefix="bench_transcripts_")
+    try:
+        print("=" * 72)
+        print(f"認識結果データベース: {count} 区間（{days} 日分）")
+        print("=" * 72)
+
+        # 1件ずつコミット（まとめ書きしない場合）
+        sample = segments[:2000]
+        store = TranscriptStore(os.path.join(work_dir, "single.db"))
+        start = time.perf_counter()
+        for recorded_at, source, text in sample:
+            store.add(text, recorded_at=recorded_at, source=source, language='ja-JP')
+            store.flush()
+        single_rate = len(sample) / (time.perf_counter() - start)
+        store.close()
+
+        # まとめ書き
+        store = TranscriptStore(os.path.join(work_dir, "transcripts.db"), batch_size=512)
+        start = time.perf_counter()
+        for recorded_at, source, text in segments:
+            store.add(text, recorded_at=recorded_at, source=source, language='ja-JP')
+        store.flush()
+        batch_rate = count / (time.perf_counter() - start)
+
+        print(f"保存: 1件ずつ {single_rate:>10.0f} 区間/秒, まとめ書き {batch_rate:>10.0f} 区間/秒 "
+              f"（{batch_rate / single_rate:.0f} 倍）")
+        print(f"データベース: {os.path.getsize(store.path) / 1024 / 1024:.1f} MB, "
+              f"トークナイザー: {store.tokenizer}, SQLite {sqlite3.sqlite_version}")
+        print("-" * 72)
+
+        text_dir = os.path.join(work_dir, "output")
+        os.makedirs(text_dir)
+        write_text_files(segments, text_dir)
+
+        print(f"{'検索語':<20} {'件数':>6} {'p50 ms':>8} {'p95 ms':>8} {'テキスト走査 ms':>16}")
+        for query in QUERIES:
+            latencies = []
+            for _ in range(20):
+                start = time.perf_counter()
+                results = store.search(query, limit=50)
+                latencies.append((time.perf_counter() - start) * 1000)
+            start = time.perf_counter()
+            scan_text_files(text_dir, query)
+            scan_ms = (time.perf_counter() - start) * 1000
+            print(f"{query:<20} {len(results):>6} {percentile(latencies, 0.5):>8.2f} "
+                  f"{percentile(latencies, 0.95):>8.2f} {scan_ms:>16.1f}")
+        store.close()
+
+        # 既存テキストファイルの取り込み
+        store = TranscriptStore(os.path.join(work_dir, "imported.db"))
+        paths = [entry.path for entry in os.scandir(text_dir)]
+        start = time.perf_counter()
+        imported = store.import_text_files(paths)
+        elapsed = time.perf_counter() - start
+        start = time.perf_counter()
+        store.import_text_files(paths)
+        again = time.perf_counter() - start
+        store.close()
+        print("-" * 72)
+        print(f"取り込み: {len(paths)} ファイル {imported} 区間を {elapsed:.2f} 秒"
+              f"（変更なしの再取り込み {again * 1000:.0f} ms）")
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+長時間セッションの認識結果表示のベンチマーク
+
+数時間分の認識結果（既定 50 万行）を TranscriptModel に追加し、
+使用メモリ（tracemalloc）の推移、任意の位置へのスクロールでの表示範囲の読み出し時間、
+保存（一時ファイルに書いて置き換え）と読み込みを少しずつ行う速度を表示する。比較として、全行を1つの文字列として
+保持する従来の方法のメモリも表示する。
+
+Tk が起動できる環境では、従来の ScrolledText に全行を入れた場合と
+TranscriptView の描画・スクロールの時間もあわせて計測する。
+
+使い方:
+    python benchmarks/bench_transcript_view.py [行数]
+"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from src.gui.transcript_model import TranscriptModel
+from src.utils.file_handler import FileHandler
+
+SAMPLE_TEXT = "これは長時間の会議を文字起こしした認識結果のサンプルテキストです"
+VISIBLE_ROWS = 40
+
+
+def make_line(index):
+    seconds = index * 3
+    return f"[{seconds // 3600 % 24:02d}:{seconds // 60 % 60:02d}:{seconds % 60:02d}] {SAMPLE_TEXT} {index}"
+
+
+def bench_model(count, work_dir):
+    """モデルへの追加・スクロール・保存"""
+    tracemalloc.start()
+    model = TranscriptModel(directory=work_dir)
+    checkpoints = {count // 4, count // 2, count}
+    print(f"{'行数':>10} {'モデルのメモリ KB':>18} {'全文の文字列 KB':>18}")
+    start = time.perf_counter()
+    for index in range(1, count + 1):
+        model.append_lines([make_line(index)])
+        if index in checkpoints:
+            current, _ = tracemalloc.get_traced_memory()
+            text_kb = (model.char_count * 2 + 74) / 1024  # 全文を str で持つ場合（日本語を含む str は1文字2バイト）
+            print(f"{index:>10} {current / 1024:>18.0f} {text_kb:>18.0f}")
+    append_rate = count / (time.perf_counter() - start)
+    tracemalloc.stop()
+    print(f"追加: {append_rate:.0f} 行/秒")
+
+    rng = random.Random(0)
+    latencies = []
+    for _ in range(500):
+        first = rng.randrange(0, count - VISIBLE_ROWS)
+        start = time.perf_counter()
+        model.get_lines(first, first + VISIBLE_ROWS)
+        latencies.append((time.perf_counter() - start) * 1000)
+    latencies.sort()
+    print(f"任意位置の表示範囲（{VISIBLE_ROWS} 行）の読み出し: "
+          f"p50 {latencies[len(latencies) // 2]:.3f} ms, p99 {latencies[int(len(latencies) * 0.99)]:.3f} ms")
+
+    path = os.path.join(work_dir, "saved.txt")
+    start = time.perf_counter()
+    FileHandler.write_lines_atomic(model.iter_lines(), path)
+    elapsed = time.perf_counter() - start
+    size_mb = os.path.getsize(path) / 1024 / 1024
+    print(f"保存（少しずつ書いて置き換え）: {size_mb:.1f} MB を {elapsed:.2f} 秒")
+
+    loaded = TranscriptModel(directory=work_dir)
+    tracemalloc.start()
+    start = time.perf_counter()
+    FileHandler.read_lines_chunked(path, loaded.append_lines)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"読み込み（少しずつ読んで追加）: {len(loaded)} 行を {elapsed:.2f} 秒, "
+          f"最大メモリ {peak / 1024 / 1024:.1f} MB")
+    loaded.close()
+    return model
+
+
+def bench_tk(model, count):
+    """Tk での描画とスクロール（ディスプレイがない場合は省略）"""
+    try:
+        import tkinter as tk
+        from tkinter import scrolledtext
+        from src.gui.transcript_view import TranscriptView
+        root = tk.Tk()
+    except Exception as e:
+        print(f"Tk の計測は省略（{e}）")
+        return
+    root.withdraw()
+
+    legacy_count = min(count, 100000)
+    text_area = scrolledtext.ScrolledText(root)
+    start = time.perf_counter()
+    text_area.insert("1.0", "\n".join(make_line(index) for index in range(1, legacy_count + 1)))
+    text_area.see("end")
+    root.update_idletasks()
+    insert_sec = time.perf_counter() - start
+    start = time.perf_counter()
+    text_area.get("1.0", "end")
+    get_sec = time.perf_counter() - start
+    text_area.destroy()
+    print(f"ScrolledText（{legacy_count} 行）: 挿入 {insert_sec:.2f} 秒, 全文取得 {get_sec * 1000:.0f} ms")
+
+    view = TranscriptView(root, model)
+    start = time.perf_counter()
+    for index in range(200):
+        view.scroll_to(index * (count // 200))
+    root.update_idletasks()
+    scroll_ms = (time.perf_counter() - start) / 200 * 1000
+    print(f"TranscriptView（{count} 行）: スクロール1回 {scroll_ms:.2f} ms")
+    root.destroy()
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 500000
+    work_dir = tempfile.mkdtemp(prefix="bench_transcript_view_")
+
+    print("=" * 64)
+    print(f"長時間セッションの表示: {count} 行（約 {count * 3 / 3600:.0f} 時間分）")
+    print("=" * 64)
+    model = bench_model(count, work_dir)
+    print("-" * 64)
+    bench_tk(model, count)
+    model.close()
+    os.remove(os.path.join(work_dir, "saved.txt"))
+    os.rmdir(work_dir)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+認識結果のテキストエリア追加のベンチマーク
+
+認識結果を1件ずつ insert して全文から文字数を数え直す従来の方法と、
+BatchedTextAppender で一定間隔ごとにまとめて反映する方法について、
+UIスレッドで費やした時間を比較する（まとめる方法は TranscriptModel /
+TranscriptView に反映する）。
+1フレーム（Config.UI_FLUSH_INTERVAL_MS）ごとに届く件数を変えて計測する。
+
+ディスプレイ（Tk が起動できる環境）が必要。
+
+使い方:
+    python benchmarks/bench_ui_append.py [件数]
+"""
+
+import os
+import sys
+import time
+import tkinter as tk
+from datetime import datetime
+from tkinter import scrolledtext
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from src.gui.text_appender import BatchedTextAppender
+from src.gui.transcript_model import TranscriptModel
+from src.gui.transcript_view import TranscriptView
+from src.utils.config import Config
+
+SAMPLE_TEXT = "これは音声認識結果のサンプルテキストです"
+
+
+def legacy_append(text_area, text):
+    """従来の方法（1件ごとに insert し、全文を読み直して文字数を数える）"""
+    current_text = text_area.get("1.0", tk.END).strip()
+    timestamp = datetime.now().strftime("%H:%M:%S")
+    if current_text:
+        text_area.insert(tk.END, f"\n[{timestamp}] {text}")
+    else:
+        text_area.insert(tk.END, f"[{timestamp}] {text}")
+    text_area.see(tk.END)
+    len(text_area.get("1.0", tk.END).strip())
+
+
+def bench_legacy(root, count):
+    text_area = scrolledtext.ScrolledText(root)
+    start = time.perf_counter()
+    for i in range(count):
+        legacy_append(text_area, f"{SAMPLE_TEXT} {i}")
+    root.update_idletasks()
+    elapsed = time.perf_counter() - start
+    text_area.destroy()
+    return elapsed
+
+
+def bench_batched(root, count, per_frame):
+    model = TranscriptModel()
+    view = TranscriptView(root, model)
+    appender = BatchedTextAppender(root, model, view)
+    start = time.perf_counter()
+    for i in range(count):
+        appender.add(f"{SAMPLE_TEXT} {i}")
+        if (i + 1) % per_frame == 0:
+            appender.flush()  # 本来は root.after で呼ばれる1フレーム分の反映
+    appender.flush()
+    root.update_idletasks()
+    elapsed = time.perf_counter() - start
+    view.destroy()
+    model.close()
+    return elapsed
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    legacy_count = min(count, 5000)  # 従来方式は件数の2乗で遅くなるため件数を抑える
+
+    root = tk.Tk()
+    root.withdraw()
+
+    print("=" * 60)
+    print(f"テキストエリア追加（反映間隔 {Config.UI_FLUSH_INTERVAL_MS} ms）")
+    print("=" * 60)
+    print(f"{'方式':<24}{'件数':>8}{'合計(s)':>10}{'1件あたり(µs)':>16}")
+
+    elapsed = bench_legacy(root, legacy_count)
+    print(f"{'従来（1件ずつ）':<24}{legacy_count:>8}{elapsed:>10.2f}"
+          f"{elapsed / legacy_count * 1e6:>16.1f}")
+
+    for per_frame in (1, 10, 100):
+        elapsed = bench_batched(root, count, per_frame)
+        label = f"まとめて（{per_frame}件/フレーム）"
+        print(f"{label:<24}{count:>8}{elapsed:>10.2f}{elapsed / count * 1e6:>16.1f}")
+
+    root.destroy()
+
+
+if __name__ == "__main__":
+    main()
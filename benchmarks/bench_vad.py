@@ -0,0 +1,84 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+音声区間検出（VAD）のベンチマーク
+
+WAVフィクスチャを録音時と同じ1024フレーム単位で VoiceActivityDetector に流し、
+1秒あたりの処理区間数と、従来の50チャンク固定バッチと比べて
+削減できた認識API呼び出しの割合を表示する。
+
+使い方:
+    python benchmarks/bench_vad.py [WAVファイルのディレクトリ]
+"""
+
+import math
+import sys
+import time
+
+import numpy as np
+
+from fixtures import default_fixture_dir, ensure_fixtures, read_wav
+from src.audio.vad import VoiceActivityDetector
+
+CHUNK = 1024               # AudioRecorder.chunk と同じ
+LEGACY_BATCH_CHUNKS = 50   # 従来の固定バッチ長
+
+
+def run_file(path):
+    """1ファイル分のベンチマークを実行"""
+    pcm, sample_rate, channels = read_wav(path)
+    if channels != 1:
+        # 先頭チャンネルのみを使用
+        pcm = np.frombuffer(pcm, dtype=np.int16)[::channels].tobytes()
+
+    chunk_bytes = CHUNK * 2
+    chunks = [pcm[i:i + chunk_bytes] for i in range(0, len(pcm), chunk_bytes)]
+
+    vad = VoiceActivityDetector(sample_rate)
+    segments = 0
+    start = time.perf_counter()
+    for chunk in chunks:
+        segments += len(vad.process(chunk))
+    if vad.flush() is not None:
+        segments += 1
+    elapsed = time.perf_counter() - start
+
+    legacy_calls = math.ceil(len(chunks) / LEGACY_BATCH_CHUNKS)
+    audio_sec = len(pcm) / 2 / sample_rate
+    return segments, legacy_calls, elapsed, audio_sec
+
+
+def main():
+    directory = sys.argv[1] if len(sys.argv) > 1 else default_fixture_dir()
+    paths = ensure_fixtures(directory)
+
+    print("=" * 72)
+    print(f"VADベンチマーク: {directory}")
+    print("=" * 72)
+    print(f"{'ファイル':<28} {'区間数':>6} {'従来呼出':>8} {'削減率':>8} {'区間/秒':>10} {'実時間比':>8}")
+    print("-" * 72)
+
+    total_segments = total_legacy = 0
+    total_elapsed = total_audio = 0.0
+    for path in paths:
+        segments, legacy_calls, elapsed, audio_sec = run_file(path)
+        total_segments += segments
+        total_legacy += legacy_calls
+        total_elapsed += elapsed
+        total_audio += audio_sec
+
+        saved = 1 - segments / legacy_calls if legacy_calls else 0.0
+        name = path.replace('\\', '/').rsplit('/', 1)[-1]
+        print(f"{name:<28} {segments:>6} {legacy_calls:>8} {saved:>8.1%} "
+              f"{segments / elapsed:>10.1f} {audio_sec / elapsed:>7.0f}x")
+
+    print("-" * 72)
+    saved = 1 - total_segments / total_legacy if total_legacy else 0.0
+    print(f"合計: 区間 {total_segments} / 従来 {total_legacy} 回 "
+          f"（認識呼び出し {saved:.1%} 削減）")
+    print(f"処理速度: {total_segments / total_elapsed:.1f} 区間/秒, "
+          f"実時間の {total_audio / total_elapsed:.0f} 倍")
+
+
+if __name__ == "__main__":
+    main()
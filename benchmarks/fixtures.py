@@ -0,0 +1,102 @@
+# -*- coding: utf-8 -*-
+"""
+ベンチマーク用のWAVフィクスチャを生成するモジュール
+
+実際の録音がない環境でも計測できるよう、発話と無音（環境ノイズ）が
+交互に並ぶ音声を合成する。
+"""
+
+import os
+import sys
+import wave
+
+import numpy as np
+
+# プロジェクトルートをパスに追加
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from src.audio.sources import synthesize_speech  # noqa: E402
+
+
+def synthesize_speech_like(sample_rate, duration_sec, seed=0):
+    """
+    発話らしい音声を合成（SyntheticSource と同じ音声）
+
+    Args:
+        sample_rate: サンプリングレート
+        duration_sec: 全体の長さ（秒）
+        seed: 乱数シード
+
+    Returns:
+        numpy.ndarray: int16のモノラル音声
+    """
+    return synthesize_speech(sample_rate, duration_sec, seed)
+
+
+def write_wav(path, samples, sample_rate, channels=1):
+    """
+    int16の音声をWAVファイルに書き込み
+
+    Args:
+        path: 出力先のパス
+        samples: int16の音声（多チャンネルの場合はインターリーブ済み）
+        sample_rate: サンプリングレート
+        channels: チャンネル数
+    """
+    with wave.open(path, 'wb') as wav_file:
+        wav_file.setnchannels(channels)
+        wav_file.setsampwidth(2)
+        wav_file.setframerate(sample_rate)
+        wav_file.writeframes(np.asarray(samples, dtype=np.int16).tobytes())
+
+
+def read_wav(path):
+    """
+    WAVファイルを読み込み
+
+    Args:
+        path: WAVファイルのパス
+
+    Returns:
+        tuple: (PCMデータ（バイト列）, サンプリングレート, チャンネル数)
+    """
+    with wave.open(path, 'rb') as wav_file:
+        return (wav_file.readframes(wav_file.getnframes()),
+                wav_file.getframerate(),
+                wav_file.getnchannels())
+
+
+def ensure_fixtures(directory, sample_rate=44100, count=4, duration_sec=30):
+    """
+    フィクスチャディレクトリにWAVファイルがなければ合成して作成
+
+    Args:
+        directory: フィクスチャディレクトリ
+        sample_rate: サンプリングレート
+        count: 作成するファイル数
+        duration_sec: 1ファイルの長さ（秒）
+
+    Returns:
+        list: WAVファイルのパスのリスト
+    """
+    os.makedirs(directory, exist_ok=True)
+    paths = sorted(
+        os.path.join(directory, name)
+        for name in os.listdir(directory)
+        if name.lower().endswith('.wav')
+    )
+    if paths:
+        return paths
+
+    for i in range(count):
+        path = os.path.join(directory, f"synthetic_{i:02d}.wav")
+        write_wav(path, synthesize_speech_like(sample_rate, duration_sec, seed=i), sample_rate)
+        paths.append(path)
+    return paths
+
+
+def default_fixture_dir():
+    """既定のフィクスチャディレクトリを取得"""
+    from src.utils.config import Config
+    return os.path.join(Config.TEMP_DIR, 'bench_fixtures')
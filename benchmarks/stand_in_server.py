@@ -0,0 +1,200 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+障害注入できる認識サーバー（'http' バックエンドの代替サーバー）
+
+WAV または FLAC を POST /recognize で受け取り、音声の長さと指紋から決まる文字列を
+JSON {"text": "..."} で返す。遅延・失敗（HTTP 503）・応答停止を指定した
+確率で注入でき、実行中も POST /control（JSON）で変更できる。
+
+使い方:
+    python benchmarks/stand_in_server.py [--port 8765] [--latency 0.05]
+        [--failure-rate 0.2] [--stall-rate 0.05] [--stall-seconds 30] [--handshake 0.03]
+
+    python main.py --headless --backend http
+"""
+
+import argparse
+import io
+import json
+import random
+import subprocess
+import threading
+import time
+import wave
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse
+
+import speech_recognition as sr
+
+
+class StandInServer:
+    """障害注入できる認識サーバー"""
+
+    def __init__(self, port=0, latency=0.05, jitter=0.02, failure_rate=0.0,
+                 stall_rate=0.0, stall_seconds=30.0, handshake=0.0):
+        """
+        Args:
+            port: 待ち受けポート（0は空きポート）
+            latency: 応答までの基本遅延（秒）
+            jitter: 遅延に加える揺らぎの最大値（秒）
+            failure_rate: HTTP 503 を返す確率
+            stall_rate: 応答を stall_seconds 秒止める確率（クライアントのタイムアウト確認用）
+            stall_seconds: 応答を止める秒数
+            handshake: 新しい接続ごとに最初の応答を遅らせる秒数（TCP・TLS の接続確立の模擬）
+        """
+        self.faults = {
+            'latency': latency,
+            'jitter': jitter,
+            'failure_rate': failure_rate,
+            'stall_rate': stall_rate,
+            'stall_seconds': stall_seconds,
+            'handshake': handshake,
+        }
+        self.stats = {'requests': 0, 'connections': 0, 'failures': 0, 'stalls': 0, 'bytes': 0}
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(('127.0.0.1', port), self._make_handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        """認識エンドポイントのURL"""
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/recognize"
+
+    def set_faults(self, **faults):
+        """障害の設定を変更（latency, jitter, failure_rate, stall_rate, stall_seconds, handshake）"""
+        with self._lock:
+            self.faults.update(faults)
+
+    def start(self):
+        """別スレッドで待ち受けを開始"""
+        self._thread = threading.Thread(target=self._server.serve_forever, name="StandInServer")
+        self._thread.daemon = True
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """待ち受けを停止"""
+        self._server.shutdown()
+        self._server.server_close()
+
+    def serve_forever(self):
+        """現在のスレッドで待ち受け"""
+        self._server.serve_forever()
+
+    def transcribe(self, body, content_type='audio/wav'):
+        """音声から決定的な文字列を作る（無音は空文字列、WAV と FLAC で同じ結果）"""
+        if content_type == 'audio/flac':
+            body = self._decode_flac(body)
+        with wave.open(io.BytesIO(body), 'rb') as wav:
+            frames = wav.readframes(wav.getnframes())
+            seconds = wav.getnframes() / wav.getframerate()
+        if frames.count(0) == len(frames):
+            return ''
+        return f"{seconds:.2f}s #{zlib.crc32(frames):08x}"
+
+    @staticmethod
+    def _decode_flac(flac_data):
+        """FLACをWAVに復号（speech_recognition 同梱の flac コマンドを使用）"""
+        process = subprocess.run(
+            [sr.get_flac_converter(), '--decode', '--stdout', '--totally-silent', '-'],
+            input=flac_data, stdout=subprocess.PIPE
+        )
+        if process.returncode != 0:
+            raise ValueError("FLACを復号できません")
+        return process.stdout
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            # ヘッダーと本文を別々に書き込むため、キープアライブ時に遅延ACKを待たないようにする
+            disable_nagle_algorithm = True
+
+            def setup(self):
+                super().setup()
+                with server._lock:
+                    server.stats['connections'] += 1
+                    handshake = server.faults['handshake']
+                time.sleep(handshake)
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+                path = urlparse(self.path).path
+                if path == '/control':
+                    server.set_faults(**json.loads(body or b'{}'))
+                    self._reply(200, {'faults': server.faults})
+                elif path == '/recognize':
+                    self._recognize(body)
+                else:
+                    self._reply(404, {'error': 'not found'})
+
+            def _recognize(self, body):
+                with server._lock:
+                    faults = dict(server.faults)
+                    server.stats['requests'] += 1
+                    server.stats['bytes'] += len(body)
+
+                if random.random() < faults['stall_rate']:
+                    with server._lock:
+                        server.stats['stalls'] += 1
+                    time.sleep(faults['stall_seconds'])
+                time.sleep(faults['latency'] + random.uniform(0, faults['jitter']))
+
+                if random.random() < faults['failure_rate']:
+                    with server._lock:
+                        server.stats['failures'] += 1
+                    self._reply(503, {'error': 'injected failure'})
+                    return
+
+                try:
+                    text = server.transcribe(body, self.headers.get('Content-Type', 'audio/wav'))
+                except (wave.Error, EOFError, ValueError):
+                    self._reply(400, {'error': 'invalid audio'})
+                    return
+                self._reply(200, {'text': text})
+
+            def _reply(self, status, payload):
+                data = json.dumps(payload).encode('utf-8')
+                try:
+                    self.send_response(status)
+                    self.send_header('Content-Type', 'application/json')
+                    self.send_header('Content-Length', str(len(data)))
+                    self.end_headers()
+                    self.wfile.write(data)
+                except OSError:
+                    # クライアントがタイムアウトで切断済み
+                    pass
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="障害注入できる認識サーバー")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--jitter", type=float, default=0.02)
+    parser.add_argument("--failure-rate", type=float, default=0.0)
+    parser.add_argument("--stall-rate", type=float, default=0.0)
+    parser.add_argument("--stall-seconds", type=float, default=30.0)
+    parser.add_argument("--handshake", type=float, default=0.0)
+    args = parser.parse_args()
+
+    server = StandInServer(args.port, args.latency, args.jitter, args.failure_rate,
+                           args.stall_rate, args.stall_seconds, args.handshake)
+    print(f"認識サーバーを起動しました: {server.url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -5,17 +5,104 @@
 メインエントリーポイント
 """
 
+import time
+
+# 起動時間の計測基準（ヘッドレスモードの起動予算チェックに使用）
+PROCESS_STARTED_AT = time.perf_counter()
+
 import sys
 import os
-import tkinter as tk
-from tkinter import messagebox
+import argparse
 
 # プロジェクトルートをパスに追加
 project_root = os.path.dirname(os.path.abspath(__file__))
 sys.path.insert(0, project_root)
 
-def check_dependencies():
-    """必要なライブラリがインストールされているかチェック"""
+def show_error_dialog(title, message):
+    """
+    エラーダイアログを表示
+    
+    tkinter はGUI起動時にのみ読み込む（ヘッドレス・コマンドライン実行では使わない）
+    """
+    import tkinter as tk
+    from tkinter import messagebox
+    
+    root = tk.Tk()
+    root.withdraw()  # メインウィンドウを非表示
+    messagebox.showerror(title, message)
+    root.destroy()
+
+def parse_device_indexes(value):
+    """カンマ区切りの入力デバイス番号をリストに変換"""
+    try:
+        return [int(index) for index in value.split(",") if index.strip()]
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"デバイス番号はカンマ区切りの整数で指定してください: {value}")
+
+def parse_date(value):
+    """YYYY-MM-DD 形式の日付をその日の0時（ローカル時刻）のUNIX時刻に変換"""
+    from datetime import datetime
+    
+    try:
+        return datetime.strptime(value, "%Y-%m-%d").timestamp()
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"日付は YYYY-MM-DD 形式で指定してください: {value}")
+
+def parse_arguments(argv=None):
+    """コマンドライン引数を解析"""
+    parser = argparse.ArgumentParser(description="音声文字起こしアプリケーション（引数なしでGUIを起動）")
+    
+    # ヘッドレス（GUIなし）の連続認識
+    parser.add_argument("--headless", action="store_true", help="GUIを起動せず、認識結果を標準出力に逐次出力")
+    parser.add_argument("--format", choices=["text", "jsonl"], default="text", help="ヘッドレス時の出力形式")
+    parser.add_argument("--backend", help="認識バックエンド（google / vosk / fake）")
+    parser.add_argument("--language", help="認識言語（例: ja-JP）")
+    parser.add_argument("--check-startup", action="store_true", help="ヘッドレスの起動時間を計測して終了")
+    parser.add_argument("--devices", type=parse_device_indexes, metavar="N,N,...",
+                        help="ヘッドレス時に同時録音する入力デバイスの番号（カンマ区切り）")
+    parser.add_argument("--channels", type=int, metavar="N",
+                        help="ヘッドレス時に録音するチャンネル数（2以上でチャンネルごとに認識）")
+    parser.add_argument("--pipeline", choices=["threads", "asyncio"],
+                        help="ヘッドレス時の連続認識の処理方式（asyncio は1つのイベントループで並行処理）")
+    parser.add_argument("--replay", nargs="+", metavar="WAV",
+                        help="ヘッドレス時にマイクの代わりに再生するWAVファイル（複数はデバイスごと。再生が終わると終了）")
+    parser.add_argument("--replay-speed", type=float, default=1.0, metavar="X",
+                        help="--replay の再生速度（1で実時間、0は処理に合わせて最速）")
+    
+    # 遅延計測（GUIではデバッグパネルを表示）
+    parser.add_argument("--trace-latency", nargs="?", const="", metavar="JSONL",
+                        help="発話ごとの処理遅延を計測し、JSONLに書き出す（省略時は temp/latency/ 以下）")
+    
+    subparsers = parser.add_subparsers(dest="command")
+    
+    # 一括文字起こし
+    batch_parser = subparsers.add_parser("batch", help="録音済み音声ファイルを一括で文字起こし")
+    batch_parser.add_argument("inputs", nargs="+", help="音声ファイル・ディレクトリ・globパターン")
+    batch_parser.add_argument("-o", "--output-dir", help="文字起こし結果の出力先（既定: output/）")
+    batch_parser.add_argument("-j", "--workers", type=int, help="ワーカープロセス数")
+    batch_parser.add_argument("--backend", help="認識バックエンド（google / vosk / fake）")
+    batch_parser.add_argument("--language", help="認識言語（例: ja-JP）")
+    batch_parser.add_argument("--no-cache", action="store_true", help="認識結果キャッシュを使わない")
+    
+    # 蓄積した認識結果の検索
+    search_parser = subparsers.add_parser("search", help="蓄積した認識結果を全文検索")
+    search_parser.add_argument("query", nargs="*", help="検索語（空白区切りですべてを含む区間。省略時は最新の区間）")
+    search_parser.add_argument("--import", dest="import_files", nargs="*", metavar="TXT",
+                               help="保存済みのテキストファイルを取り込んでから検索（省略時は output/*.txt）")
+    search_parser.add_argument("--source", help="入力元の名前で絞り込む")
+    search_parser.add_argument("--since", type=parse_date, metavar="YYYY-MM-DD", help="この日付以降に絞り込む")
+    search_parser.add_argument("-n", "--limit", type=int, default=50, help="最大件数")
+    
+    return parser.parse_args(argv)
+
+def check_dependencies(use_gui=True, use_microphone=True):
+    """
+    必要なライブラリがインストールされているかチェック
+    
+    Args:
+        use_gui: エラーをダイアログでも表示するか
+        use_microphone: マイクから録音するか（False なら pyaudio は不要）
+    """
     missing_packages = []
     
     try:
@@ -23,10 +110,16 @@ def check_dependencies():
     except ImportError:
         missing_packages.append("SpeechRecognition")
     
+    if use_microphone:
+        try:
+            import pyaudio
+        except ImportError:
+            missing_packages.append("pyaudio")
+    
     try:
-        import pyaudio
+        import numpy
     except ImportError:
-        missing_packages.append("pyaudio")
+        missing_packages.append("numpy")
     
     if missing_packages:
         error_message = (
@@ -40,10 +133,8 @@ def check_dependencies():
         )
         
         # GUIでエラーメッセージを表示
-        root = tk.Tk()
-        root.withdraw()  # メインウィンドウを非表示
-        messagebox.showerror("依存関係エラー", error_message)
-        root.destroy()
+        if use_gui:
+            show_error_dialog("依存関係エラー", error_message)
         
         print("=" * 60)
         print("依存関係エラー")
@@ -55,8 +146,36 @@ def check_dependencies():
     
     return True
 
+def run_command(args):
+    """サブコマンド・ヘッドレスモードを実行（GUIを使わない）"""
+    # 音声ファイルを再生する場合はマイクを使わない
+    if not check_dependencies(use_gui=False, use_microphone=not args.replay):
+        sys.exit(1)
+    
+    if args.command == "search":
+        from src.cli.search import run_search
+        sys.exit(run_search(args))
+    
+    if args.command == "batch":
+        from src.cli.batch import run_batch
+        sys.exit(run_batch(args))
+    
+    if args.headless:
+        from src.cli.headless import run_headless
+        sys.exit(run_headless(args, PROCESS_STARTED_AT))
+
 def main():
     """メイン関数"""
+    args = parse_arguments()
+    if args.trace_latency is not None:
+        from src.utils.config import Config
+        from src.utils.tracing import tracer
+        tracer.enable(args.trace_latency or Config.LATENCY_TRACE_FILE)
+    
+    if args.command or args.headless:
+        run_command(args)
+        return
+    
     print("音声文字起こしアプリケーションを開始します...")
     
     # 依存関係をチェック
@@ -79,10 +198,7 @@ def main():
         print(f"エラー: {error_message}")
         
         # GUIでエラーメッセージを表示
-        root = tk.Tk()
-        root.withdraw()
-        messagebox.showerror("インポートエラー", error_message)
-        root.destroy()
+        show_error_dialog("インポートエラー", error_message)
         
         sys.exit(1)
         
@@ -91,10 +207,7 @@ def main():
         print(f"エラー: {error_message}")
         
         # GUIでエラーメッセージを表示
-        root = tk.Tk()
-        root.withdraw()
-        messagebox.showerror("エラー", error_message)
-        root.destroy()
+        show_error_dialog("エラー", error_message)
         
         sys.exit(1)
 
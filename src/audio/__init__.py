@@ -5,6 +5,32 @@
 """
 
 from .recorder import AudioRecorder
-from .recognizer import SpeechRecognizer
+from .multi_device import MultiDeviceRecorder, create_recorder
+from .sources import AudioSource, PyAudioSource, FileSource, SyntheticSource
+from .recognizer import ResultKind, SpeechRecognizer
+from .merger import ResultMerger
+from .overlap import OverlapStitcher, stitch_overlap
+from .noise_floor import NoiseFloorTracker
+from .partial import PartialRecognizer
+from .pipeline import RecognitionPipeline, PipelineStream
+from .resilience import BreakerState, CircuitBreaker
+from .scheduler import RecognitionScheduler, OverflowPolicy
+from .cache import RecognitionCache
+from .codec import EncodedAudio
+from .async_http import AsyncHttpClient
+from .http_pool import HttpConnectionPool
+from .spool import AudioSpool
+from .backends import (
+    RecognitionBackend, BackendCapabilities,
+    register_backend, create_backend, available_backends
+)
 
-__all__ = ['AudioRecorder', 'SpeechRecognizer']
\ No newline at end of file
+__all__ = [
+    'AudioRecorder', 'MultiDeviceRecorder', 'create_recorder',
+    'AudioSource', 'PyAudioSource', 'FileSource', 'SyntheticSource', 'SpeechRecognizer', 'ResultKind', 'ResultMerger', 'OverlapStitcher', 'stitch_overlap', 'NoiseFloorTracker', 'PartialRecognizer',
+    'RecognitionPipeline', 'PipelineStream',
+    'RecognitionScheduler', 'OverflowPolicy', 'BreakerState', 'CircuitBreaker',
+    'RecognitionCache', 'AudioSpool', 'EncodedAudio', 'AsyncHttpClient', 'HttpConnectionPool',
+    'RecognitionBackend', 'BackendCapabilities',
+    'register_backend', 'create_backend', 'available_backends'
+]
\ No newline at end of file
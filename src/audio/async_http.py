@@ -0,0 +1,154 @@
+# -*- coding: utf-8 -*-
+"""
+asyncio 上の HTTP/1.1 クライアントを管理するモジュール
+
+1つのイベントループで多数の認識リクエストを並行して送るため、スレッドを使わず
+asyncio のストリームで送受信し、接続はキープアライブで使い回す。
+"""
+
+import asyncio
+import ssl
+import time
+from urllib.parse import urlsplit
+
+from ..utils.config import Config
+
+
+class AsyncHttpClient:
+    """
+    接続を使い回す asyncio の HTTP/1.1 クライアント
+
+    接続先（ホスト・ポート・スキーム）ごとに空いている接続を保持し、同時に使う接続数は
+    max_connections までに抑える（超えた分は接続が空くまで待つ）。使い回した接続が
+    サーバー側で閉じられていた場合は、新しい接続で1回だけ送り直す。
+    イベントループごとに1つ生成して使う。
+    """
+
+    def __init__(self, max_connections=None, stats=None):
+        """
+        Args:
+            max_connections: 同時に使う接続数の上限（省略時は Config.HTTP_POOL_SIZE）
+            stats: 成功したリクエストの使い回し・所要時間を加える HttpConnectionPool
+                （スレッドから送った分と合わせて stats() で集計する。省略時は集計しない）
+        """
+        self.max_connections = max_connections or Config.HTTP_POOL_SIZE
+        self.stats = stats
+        self._slots = asyncio.Semaphore(self.max_connections)
+        self._idle = {}  # (スキーム, ホスト, ポート) -> [(reader, writer)]
+        self.connections_opened = 0
+        self.requests_sent = 0
+
+    async def request(self, method, url, body=b"", headers=None):
+        """
+        リクエストを送り、応答を受け取る
+
+        Args:
+            method: HTTPメソッド
+            url: URL（http または https）
+            body: 送信するデータ
+            headers: 追加のヘッダー（辞書）
+
+        Returns:
+            tuple: (ステータスコード, 応答の本文)
+
+        Raises:
+            OSError: 接続・送受信に失敗した場合
+        """
+        parts = urlsplit(url)
+        key = (parts.scheme, parts.hostname, parts.port or (443 if parts.scheme == 'https' else 80))
+        target = parts.path or "/"
+        if parts.query:
+            target += "?" + parts.query
+
+        lines = [f"{method} {target} HTTP/1.1", f"Host: {parts.netloc}",
+                 f"Content-Length: {len(body)}", "Connection: keep-alive"]
+        lines += [f"{name}: {value}" for name, value in (headers or {}).items()]
+        message = ("\r\n".join(lines) + "\r\n\r\n").encode('latin-1') + bytes(body)
+
+        async with self._slots:
+            started = time.perf_counter()
+            retried = False
+            idle = self._idle.setdefault(key, [])
+            while idle:
+                reader, writer = idle.pop()
+                if reader.at_eof() or writer.is_closing():
+                    writer.close()
+                    continue
+                try:
+                    response = await self._exchange(key, reader, writer, message)
+                except (ConnectionError, asyncio.IncompleteReadError):
+                    # サーバーが閉じたキープアライブ接続は新しい接続で送り直す
+                    writer.close()
+                    retried = True
+                    continue
+                self._record(started, reused=True)
+                return response
+            reader, writer = await self._connect(key)
+            response = await self._exchange(key, reader, writer, message)
+            self._record(started, reused=False, retried=retried)
+            return response
+
+    def _record(self, started, reused, retried=False):
+        """成功したリクエストを統計に加える"""
+        if self.stats is not None:
+            self.stats.record_request(time.perf_counter() - started, reused, retried)
+
+    async def _connect(self, key):
+        """新しい接続を開く"""
+        scheme, host, port = key
+        context = ssl.create_default_context() if scheme == 'https' else None
+        reader, writer = await asyncio.open_connection(host, port, ssl=context)
+        self.connections_opened += 1
+        return reader, writer
+
+    async def _exchange(self, key, reader, writer, message):
+        """1往復の送受信（途中で失敗した接続は閉じる）"""
+        try:
+            writer.write(message)
+            await writer.drain()
+            self.requests_sent += 1
+
+            status_line = await reader.readuntil(b"\r\n")
+            version, status = status_line.decode('latin-1').split(None, 2)[:2]
+            response_headers = {}
+            while True:
+                line = await reader.readuntil(b"\r\n")
+                if line == b"\r\n":
+                    break
+                name, _, value = line.decode('latin-1').partition(":")
+                response_headers[name.strip().lower()] = value.strip()
+
+            if response_headers.get('transfer-encoding', '').lower() == 'chunked':
+                body = await self._read_chunked(reader)
+            elif 'content-length' in response_headers:
+                body = await reader.readexactly(int(response_headers['content-length']))
+            else:
+                body = await reader.read()
+        except BaseException:
+            writer.close()
+            raise
+
+        if version == "HTTP/1.0" or response_headers.get('connection', '').lower() == 'close' or reader.at_eof():
+            writer.close()
+        else:
+            self._idle.setdefault(key, []).append((reader, writer))
+        return int(status), body
+
+    @staticmethod
+    async def _read_chunked(reader):
+        """チャンク形式の本文を読む"""
+        chunks = []
+        while True:
+            size = int((await reader.readuntil(b"\r\n")).split(b";")[0], 16)
+            if size == 0:
+                await reader.readuntil(b"\r\n")
+                return b"".join(chunks)
+            chunks.append(await reader.readexactly(size))
+            await reader.readexactly(2)
+
+    async def close(self):
+        """空いている接続をすべて閉じる"""
+        idle, self._idle = self._idle, {}
+        for connections in idle.values():
+            for _, writer in connections:
+                writer.close()
@@ -0,0 +1,595 @@
+# -*- coding: utf-8 -*-
+"""
+音声認識エンジン（バックエンド）を管理するモジュール
+"""
+
+import asyncio
+import http.client
+import json
+import threading
+import time
+import urllib.parse
+import zlib
+
+import speech_recognition as sr
+
+try:
+    # SpeechRecognition 3.10.1 以降は Google 認識のリクエストの組み立てと応答の解析を公開している
+    from speech_recognition.recognizers import google as sr_google
+except ImportError:
+    sr_google = None
+
+from ..utils.config import Config
+from .async_http import AsyncHttpClient
+from .http_pool import HttpConnectionPool
+from .codec import CONTENT_TYPES, EncodedAudio
+
+
+class BackendCapabilities:
+    """バックエンドが対応する機能"""
+
+    def __init__(self, streaming=False, batching=False, sample_rates=None, codecs=None):
+        """
+        Args:
+            streaming: 音声を少しずつ渡して途中結果を得られるか
+            batching: 複数の区間を1回の呼び出しで認識できるか
+            sample_rates: 対応するサンプリングレートのタプル（Noneは任意）
+            codecs: 送信時に受け付ける音声形式のタプル（Noneは符号化せずPCMのまま扱う）
+        """
+        self.streaming = streaming
+        self.batching = batching
+        self.sample_rates = tuple(sample_rates) if sample_rates else None
+        self.codecs = tuple(codecs) if codecs else None
+
+    def supports_rate(self, sample_rate):
+        """
+        サンプリングレートに対応しているか
+
+        Args:
+            sample_rate: サンプリングレート
+
+        Returns:
+            bool: 変換なしで受け付けられる場合True
+        """
+        return self.sample_rates is None or sample_rate in self.sample_rates
+
+    def __repr__(self):
+        return (f"BackendCapabilities(streaming={self.streaming}, "
+                f"batching={self.batching}, sample_rates={self.sample_rates}, "
+                f"codecs={self.codecs})")
+
+
+class RecognitionBackend:
+    """
+    音声認識バックエンドの基底クラス
+
+    recognize は認識結果の文字列を返し、認識できない場合は
+    sr.UnknownValueError、サービスやエンジンの問題は sr.RequestError を送出する。
+    通信を伴うバックエンドは1回の呼び出しを timeout 秒で打ち切り、
+    sr.RequestError として扱う。
+
+    recognize_async は asyncio パイプライン用のコルーチン版。既定ではスレッドプールで
+    recognize を呼ぶが、非同期に通信できるバックエンドは上書きして、1つの
+    イベントループで多数の呼び出しを並行させる。
+    """
+
+    name = None
+    capabilities = BackendCapabilities()
+    timeout = Config.BACKEND_TIMEOUT  # 1回の呼び出しの制限時間（秒）
+
+    def recognize(self, audio, language):
+        """
+        音声を認識
+
+        Args:
+            audio: sr.AudioData
+            language: 言語コード（例: 'ja-JP'）
+
+        Returns:
+            str: 認識結果
+        """
+        raise NotImplementedError
+
+    async def recognize_async(self, audio, language):
+        """
+        音声を認識（コルーチン）
+
+        Args:
+            audio: sr.AudioData
+            language: 言語コード
+
+        Returns:
+            str: 認識結果
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self.recognize, audio, language)
+
+    async def close_async(self):
+        """recognize_async で使った資源（接続など）を解放"""
+
+    def close(self):
+        """recognize で使った資源（保持している接続など）を解放"""
+
+    def connection_stats(self):
+        """
+        認識サービスへの接続の使い回しと所要時間の統計を取得（recognize_async で送った分も含む）
+
+        Returns:
+            dict: HttpConnectionPool.stats() の結果（通信しないバックエンドはNone）
+        """
+        return None
+
+    def recognize_batch(self, audios, language):
+        """
+        複数の音声をまとめて認識
+
+        Args:
+            audios: sr.AudioData のリスト
+            language: 言語コード
+
+        Returns:
+            list: 認識結果（認識できなかった区間はNone）
+        """
+        results = []
+        for audio in audios:
+            try:
+                results.append(self.recognize(audio, language))
+            except sr.UnknownValueError:
+                results.append(None)
+        return results
+
+    def create_stream(self, sample_rate, language):
+        """
+        逐次認識用のストリームを生成（capabilities.streaming が True の場合のみ）
+
+        Args:
+            sample_rate: 入力音声のサンプリングレート
+            language: 言語コード
+
+        Returns:
+            ストリーム。accept(音声データ) で音声を追加し、その時点の途中結果
+            （まだ結果がない場合はNone）を返す
+        """
+        raise NotImplementedError(f"{self.name} は逐次認識に対応していません")
+
+
+# 名前 -> バックエンドクラス
+_BACKENDS = {}
+
+
+def register_backend(cls):
+    """バックエンドクラスを登録するデコレーター"""
+    _BACKENDS[cls.name] = cls
+    return cls
+
+
+def available_backends():
+    """登録済みのバックエンド名一覧を取得"""
+    return sorted(_BACKENDS)
+
+
+def create_backend(name=None, **options):
+    """
+    バックエンドを生成
+
+    Args:
+        name: バックエンド名（省略時は Config.RECOGNITION_BACKEND）
+        **options: バックエンドのコンストラクタに渡す引数
+
+    Returns:
+        RecognitionBackend: 生成したバックエンド
+    """
+    name = name or Config.RECOGNITION_BACKEND
+    if name not in _BACKENDS:
+        raise ValueError(
+            f"不明な認識バックエンド: {name}（利用可能: {', '.join(available_backends())}）"
+        )
+    return _BACKENDS[name](**options)
+
+
+@register_backend
+class GoogleBackend(RecognitionBackend):
+    """
+    Google音声認識（Web Speech API）バックエンド
+
+    speech_recognition の recognize_google と同じリクエストを、発話ごとに接続を開かずに
+    HttpConnectionPool の接続を使い回して送る。接続先・APIキーの既定値・応答の解析は
+    speech_recognition のものを使う（組み立て処理を公開していない 3.10.0 以前では、
+    接続を使い回さずに recognize_google をそのまま呼ぶ）。recognize_async は
+    AsyncHttpClient で送り、1つのイベントループで多数の区間を並行して認識する。
+    """
+
+    name = 'google'
+    capabilities = BackendCapabilities(
+        streaming=False,
+        batching=False,
+        sample_rates=(8000, 16000, 22050, 32000, 44100, 48000),
+        codecs=('flac',)
+    )
+
+    def __init__(self, key=None, pool=None):
+        """
+        Args:
+            key: APIキー（省略時は Config.GOOGLE_API_KEY、それも None なら speech_recognition の既定キー）
+            pool: 使う接続プール（省略時はバックエンドごとに生成）
+        """
+        self.key = key or Config.GOOGLE_API_KEY
+        self.pool = pool or HttpConnectionPool()
+        self._async_client = None  # recognize_async 用（イベントループごとに生成）
+        self._async_loop = None
+
+    def _build_request(self, audio, language):
+        """
+        speech_recognition の組み立て処理で送信するリクエストを作る
+
+        Args:
+            audio: sr.AudioData
+            language: 言語コード
+
+        Returns:
+            tuple: (URL, FLAC データ, ヘッダーの辞書)
+        """
+        options = {'key': self.key, 'language': language}
+        if hasattr(sr_google, 'ENDPOINT'):
+            # 3.11 以降は接続先を呼び出し側で指定する
+            options['endpoint'] = sr_google.ENDPOINT
+        builder = sr_google.create_request_builder(**options)
+        # build_data は EncodedAudio が保持した結果を返す（再試行時に符号化し直さない）
+        audio = EncodedAudio.wrap(audio)
+        return builder.build_url(), builder.build_data(audio), builder.build_headers(audio)
+
+    def recognize(self, audio, language):
+        if sr_google is None:
+            recognizer = sr.Recognizer()
+            recognizer.operation_timeout = self.timeout
+            return recognizer.recognize_google(EncodedAudio.wrap(audio), key=self.key, language=language)
+        url, flac_data, headers = self._build_request(audio, language)
+        try:
+            status, body = self.pool.request('POST', url, flac_data, headers=headers, timeout=self.timeout)
+        except (OSError, http.client.HTTPException) as e:
+            raise sr.RequestError(f"recognition connection failed: {e}")
+        if status >= 400:
+            raise sr.RequestError(f"recognition request failed: HTTP {status}")
+        return self._parse_response(body)
+
+    async def recognize_async(self, audio, language):
+        if sr_google is None:
+            return await super().recognize_async(audio, language)
+        url, flac_data, headers = self._build_request(audio, language)
+        loop = asyncio.get_running_loop()
+        if self._async_loop is not loop:
+            # 接続はイベントループに結び付くため、ループごとに接続プールを作る
+            # （統計はスレッドから送った分と合わせて self.pool で集計する）
+            self._async_client = AsyncHttpClient(stats=self.pool)
+            self._async_loop = loop
+        try:
+            status, body = await asyncio.wait_for(
+                self._async_client.request('POST', url, flac_data, headers=headers),
+                self.timeout
+            )
+        except asyncio.TimeoutError:
+            raise sr.RequestError("recognition connection failed: timed out")
+        except (OSError, ValueError, asyncio.IncompleteReadError) as e:
+            raise sr.RequestError(f"recognition connection failed: {e}")
+        if status >= 400:
+            raise sr.RequestError(f"recognition request failed: HTTP {status}")
+        return self._parse_response(body)
+
+    @staticmethod
+    def _parse_response(body):
+        """1行ずつの JSON 応答から最も確からしい候補を取り出す（解析は speech_recognition に任せる）"""
+        parser = sr_google.OutputParser(show_all=False, with_confidence=False)
+        try:
+            return parser.parse(body.decode('utf-8'))
+        except (ValueError, KeyError, IndexError, TypeError):
+            raise sr.RequestError("recognition response is not valid JSON")
+
+    def connection_stats(self):
+        return self.pool.stats()
+
+    def close(self):
+        self.pool.close()
+
+    async def close_async(self):
+        if self._async_client is not None:
+            await self._async_client.close()
+            self._async_client = None
+            self._async_loop = None
+
+
+@register_backend
+class HttpBackend(RecognitionBackend):
+    """
+    任意のHTTP認識サーバーを使うバックエンド
+
+    FLAC（または WAV）を POST し、JSON {"text": "..."} を受け取る。自前の認識サーバーや
+    障害注入用の代替サーバー（benchmarks/stand_in_server.py）で使う。
+    """
+
+    name = 'http'
+    capabilities = BackendCapabilities(streaming=False, batching=False, codecs=('flac', 'wav'))
+
+    def __init__(self, url=None, codec=None, pool=None):
+        """
+        Args:
+            url: 認識サーバーのURL（省略時は Config.HTTP_BACKEND_URL）
+            codec: 送信する音声形式 'flac' / 'wav'（省略時は Config.UPLOAD_CODEC）
+            pool: 使う接続プール（省略時はバックエンドごとに生成）
+        """
+        self.url = url or Config.HTTP_BACKEND_URL
+        self.codec = codec or Config.UPLOAD_CODEC
+        if self.codec not in self.capabilities.codecs:
+            raise ValueError(f"http バックエンドが対応していない音声形式: {self.codec}")
+        self.pool = pool or HttpConnectionPool()
+        self._async_client = None  # recognize_async 用（イベントループごとに生成）
+        self._async_loop = None
+
+    def _encode(self, audio):
+        """送信する音声（再試行時は EncodedAudio に保持した符号化結果をそのまま使う）"""
+        try:
+            return EncodedAudio.wrap(audio).encoded(self.codec)
+        except OSError as e:
+            raise sr.RequestError(f"音声の符号化に失敗しました: {e}")
+
+    def recognize(self, audio, language):
+        query = urllib.parse.urlencode({'lang': language})
+        body = self._encode(audio)
+        try:
+            status, body = self.pool.request(
+                'POST', f"{self.url}?{query}", body,
+                headers={'Content-Type': CONTENT_TYPES[self.codec]},
+                timeout=self.timeout
+            )
+        except (OSError, http.client.HTTPException) as e:
+            raise sr.RequestError(f"認識サーバーに接続できません: {e}")
+        if status >= 400:
+            raise sr.RequestError(f"認識サーバーエラー: HTTP {status}")
+        return self._parse_response(body)
+
+    async def recognize_async(self, audio, language):
+        query = urllib.parse.urlencode({'lang': language})
+        body = self._encode(audio)
+        loop = asyncio.get_running_loop()
+        if self._async_loop is not loop:
+            # 接続はイベントループに結び付くため、ループごとに接続プールを作る
+            # （統計はスレッドから送った分と合わせて self.pool で集計する）
+            self._async_client = AsyncHttpClient(stats=self.pool)
+            self._async_loop = loop
+        try:
+            status, body = await asyncio.wait_for(
+                self._async_client.request(
+                    'POST', f"{self.url}?{query}", body,
+                    headers={'Content-Type': CONTENT_TYPES[self.codec]}
+                ),
+                self.timeout
+            )
+        except asyncio.TimeoutError:
+            raise sr.RequestError("認識サーバーに接続できません: timed out")
+        except (OSError, ValueError, asyncio.IncompleteReadError) as e:
+            raise sr.RequestError(f"認識サーバーに接続できません: {e}")
+        if status >= 400:
+            raise sr.RequestError(f"認識サーバーエラー: HTTP {status}")
+        return self._parse_response(body)
+
+    def connection_stats(self):
+        return self.pool.stats()
+
+    def close(self):
+        self.pool.close()
+
+    async def close_async(self):
+        if self._async_client is not None:
+            await self._async_client.close()
+            self._async_client = None
+            self._async_loop = None
+
+    @staticmethod
+    def _parse_response(body):
+        """JSON {"text": "..."} の応答から認識結果を取り出す"""
+        try:
+            text = json.loads(body.decode('utf-8')).get('text', '').strip()
+        except ValueError:
+            raise sr.RequestError("認識サーバーの応答を解析できません")
+        if not text:
+            raise sr.UnknownValueError()
+        return text
+
+
+@register_backend
+class VoskBackend(RecognitionBackend):
+    """
+    Voskによるオフライン認識バックエンド
+
+    ネットワーク通信を行わないため、往復の遅延がなく閉じた環境でも動作する。
+    vosk パッケージと Config.VOSK_MODEL_PATH のモデルが必要。
+    """
+
+    name = 'vosk'
+    capabilities = BackendCapabilities(
+        streaming=True,
+        batching=False,
+        sample_rates=(16000,)
+    )
+
+    def __init__(self, model_path=None):
+        """
+        Args:
+            model_path: モデルディレクトリ（省略時は Config.VOSK_MODEL_PATH）
+        """
+        self.model_path = model_path or Config.VOSK_MODEL_PATH
+        self._model = None
+        self._lock = threading.Lock()
+
+    def _load_model(self):
+        """モデルを初回使用時に読み込み"""
+        with self._lock:
+            if self._model is None:
+                try:
+                    import vosk
+                except ImportError:
+                    raise sr.RequestError("vosk がインストールされていません（pip install vosk）")
+                try:
+                    vosk.SetLogLevel(-1)
+                    self._model = vosk.Model(self.model_path)
+                except Exception as e:
+                    raise sr.RequestError(f"Voskモデルを読み込めません: {self.model_path} ({str(e)})")
+            return self._model
+
+    def create_recognizer(self, sample_rate):
+        """
+        逐次入力用の認識器を生成
+
+        Args:
+            sample_rate: 入力音声のサンプリングレート
+
+        Returns:
+            vosk.KaldiRecognizer: 認識器
+        """
+        model = self._load_model()
+        import vosk
+        return vosk.KaldiRecognizer(model, sample_rate)
+
+    def create_stream(self, sample_rate, language):
+        return VoskStream(self.create_recognizer(sample_rate), language)
+
+    def recognize(self, audio, language):
+        rate = audio.sample_rate if self.capabilities.supports_rate(audio.sample_rate) else 16000
+        recognizer = self.create_recognizer(rate)
+        recognizer.AcceptWaveform(audio.get_raw_data(convert_rate=rate, convert_width=2))
+        return self.parse_result(recognizer.FinalResult(), language)
+
+    @staticmethod
+    def parse_result(result_json, language, key='text'):
+        """
+        VoskのJSON結果から文字列を取り出す
+
+        Args:
+            result_json: Result / FinalResult / PartialResult の戻り値
+            language: 言語コード
+            key: 取り出すキー（途中結果は 'partial'）
+
+        Returns:
+            str: 認識結果
+        """
+        text = json.loads(result_json).get(key, '').strip()
+        if not text:
+            raise sr.UnknownValueError()
+        if language.startswith(('ja', 'zh')):
+            # 分かち書きの空白を除去
+            text = text.replace(' ', '')
+        return text
+
+
+class VoskStream:
+    """Voskの認識器に音声を逐次渡し、途中結果を返すストリーム"""
+
+    def __init__(self, recognizer, language):
+        """
+        Args:
+            recognizer: vosk.KaldiRecognizer
+            language: 言語コード
+        """
+        self.recognizer = recognizer
+        self.language = language
+        self._committed = []  # 発話内の区切りで確定した部分
+
+    def accept(self, audio_data):
+        """
+        音声を追加して途中結果を取得
+
+        Args:
+            audio_data: 16bit PCMの音声データ
+
+        Returns:
+            str: 発話先頭からの途中結果（まだ結果がない場合はNone）
+        """
+        if self.recognizer.AcceptWaveform(bytes(audio_data)):
+            result, key = self.recognizer.Result(), 'text'
+        else:
+            result, key = self.recognizer.PartialResult(), 'partial'
+
+        try:
+            text = VoskBackend.parse_result(result, self.language, key)
+        except sr.UnknownValueError:
+            text = ''
+        if key == 'text' and text:
+            self._committed.append(text)
+            text = ''
+
+        separator = '' if self.language.startswith(('ja', 'zh')) else ' '
+        return separator.join(self._committed + ([text] if text else [])) or None
+
+
+@register_backend
+class FakeBackend(RecognitionBackend):
+    """
+    テスト・負荷計測用の決定的なバックエンド
+
+    ネットワークやモデルなしで、音声内容から常に同じ結果を返す。
+    無音（全サンプルが0）の場合は認識できないものとして扱う。
+    """
+
+    name = 'fake'
+    capabilities = BackendCapabilities(streaming=True, batching=True)
+
+    def __init__(self, latency=0.0, transcript=None):
+        """
+        Args:
+            latency: 1回の認識で待機する秒数（遅いバックエンドの模擬。
+                timeout を超える場合は timeout 秒後に sr.RequestError）
+            transcript: 常に返す文字列（省略時は音声の指紋から生成）
+        """
+        self.latency = latency
+        self.transcript = transcript
+        self.call_count = 0
+
+    def recognize(self, audio, language):
+        self.call_count += 1
+        if self.latency:
+            if self.timeout and self.latency > self.timeout:
+                time.sleep(self.timeout)
+                raise sr.RequestError("タイムアウト")
+            time.sleep(self.latency)
+        return self._transcribe(audio, language)
+
+    async def recognize_async(self, audio, language):
+        # 待機はイベントループ上で行い、スレッドを使わない
+        self.call_count += 1
+        if self.latency:
+            if self.timeout and self.latency > self.timeout:
+                await asyncio.sleep(self.timeout)
+                raise sr.RequestError("タイムアウト")
+            await asyncio.sleep(self.latency)
+        return self._transcribe(audio, language)
+
+    def _transcribe(self, audio, language):
+        """音声の内容から決まる結果を作る"""
+        raw = bytes(audio.get_raw_data())
+        if raw.count(0) == len(raw):
+            raise sr.UnknownValueError()
+        if self.transcript is not None:
+            return self.transcript
+
+        seconds = len(raw) / (audio.sample_rate * audio.sample_width)
+        return f"[{language}] {seconds:.2f}s #{zlib.crc32(raw):08x}"
+
+    def create_stream(self, sample_rate, language):
+        return FakeStream(sample_rate, language)
+
+
+class FakeStream:
+    """FakeBackend の逐次認識ストリーム（受け取った音声の長さを途中結果として返す）"""
+
+    def __init__(self, sample_rate, language):
+        self.sample_rate = sample_rate
+        self.language = language
+        self._bytes = 0
+        self._has_sound = False
+
+    def accept(self, audio_data):
+        raw = bytes(audio_data)
+        self._bytes += len(raw)
+        self._has_sound = self._has_sound or raw.count(0) != len(raw)
+        if not self._has_sound:
+            return None
+        return f"[{self.language}] {self._bytes / (self.sample_rate * 2):.2f}s"
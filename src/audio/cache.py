@@ -0,0 +1,248 @@
+# -*- coding: utf-8 -*-
+"""
+音声認識結果のキャッシュを管理するモジュール
+"""
+
+import hashlib
+import json
+import os
+import sys
+import threading
+from collections import OrderedDict
+
+import speech_recognition as sr
+
+from ..utils.config import Config
+
+
+class RecognitionCache:
+    """
+    音声の指紋をキーにした認識結果キャッシュ
+
+    メモリ上のLRUと、Config.RECOGNITION_CACHE_DIR 以下のディスクストアの2段構成。
+    同じ音声・言語・バックエンドの組み合わせはバックエンドを呼ばずに結果を返す。
+    認識できなかった音声は空文字列として記録する。
+    """
+
+    def __init__(self, cache_dir=None, memory_entries=None, disk_bytes=None):
+        """
+        Args:
+            cache_dir: ディスクストアのディレクトリ
+            memory_entries: メモリに保持する最大件数
+            disk_bytes: ディスクストアの最大合計サイズ（バイト）
+        """
+        self.cache_dir = cache_dir or Config.RECOGNITION_CACHE_DIR
+        self.memory_entries = memory_entries or Config.RECOGNITION_CACHE_MEMORY_ENTRIES
+        self.disk_bytes = disk_bytes or Config.RECOGNITION_CACHE_DISK_BYTES
+
+        self._memory = OrderedDict()   # キー -> 認識結果
+        self._disk = None              # キー -> ファイルサイズ（アクセス順、初回使用時に読み込み）
+        self._disk_total = 0
+        self._lock = threading.Lock()
+
+        # 統計
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(audio_data, sample_rate, sample_width, language, backend_name):
+        """
+        キャッシュキーを生成
+
+        Args:
+            audio_data: PCMデータ（bytes-like）
+            sample_rate: サンプリングレート
+            sample_width: サンプル幅（バイト）
+            language: 言語コード
+            backend_name: バックエンド名
+
+        Returns:
+            str: キー（16進文字列）
+        """
+        digest = hashlib.blake2b(digest_size=20)
+        digest.update(f"{backend_name}|{language}|{sample_rate}|{sample_width}|".encode('utf-8'))
+        digest.update(audio_data)
+        return digest.hexdigest()
+
+    def get(self, key):
+        """
+        キャッシュから認識結果を取得
+
+        Args:
+            key: キャッシュキー
+
+        Returns:
+            str: 認識結果（認識できなかった音声は空文字列、未登録はNone）
+        """
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+                return self._memory[key]
+
+            text = self._read_disk(key)
+            if text is None:
+                self.misses += 1
+                return None
+
+            self.disk_hits += 1
+            self._remember(key, text)
+            return text
+
+    def put(self, key, text):
+        """
+        認識結果をキャッシュに登録
+
+        Args:
+            key: キャッシュキー
+            text: 認識結果（認識できなかった場合は空文字列）
+        """
+        with self._lock:
+            self._remember(key, text)
+            self._write_disk(key, text)
+
+    def recognize_with(self, backend, audio, language):
+        """
+        キャッシュを確認し、なければバックエンドで認識して登録
+
+        Args:
+            backend: RecognitionBackend
+            audio: sr.AudioData
+            language: 言語コード
+
+        Returns:
+            str: 認識結果
+
+        Raises:
+            sr.UnknownValueError: 認識できなかった場合（キャッシュ済みの場合も含む）
+        """
+        key = self.make_key(
+            audio.frame_data, audio.sample_rate, audio.sample_width,
+            language, backend.name
+        )
+        text = self.get(key)
+        if text is None:
+            try:
+                text = backend.recognize(audio, language)
+            except sr.UnknownValueError:
+                self.put(key, '')
+                raise
+            self.put(key, text)
+
+        if not text:
+            raise sr.UnknownValueError()
+        return text
+
+    def stats(self):
+        """
+        ヒット・ミスの統計を取得
+
+        Returns:
+            dict: 統計値
+        """
+        with self._lock:
+            lookups = self.memory_hits + self.disk_hits + self.misses
+            return {
+                'memory_hits': self.memory_hits,
+                'disk_hits': self.disk_hits,
+                'misses': self.misses,
+                'hit_rate': (self.memory_hits + self.disk_hits) / lookups if lookups else 0.0,
+                'memory_entries': len(self._memory),
+                'disk_bytes': self._disk_total,
+            }
+
+    def clear(self):
+        """キャッシュをすべて削除"""
+        with self._lock:
+            self._memory.clear()
+            self._load_disk_index()
+            for key in list(self._disk):
+                self._remove_disk(key)
+
+    def _remember(self, key, text):
+        """メモリLRUに登録"""
+        self._memory[key] = text
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    def _path(self, key):
+        """キーに対応するファイルパス（先頭2文字でディレクトリを分ける）"""
+        return os.path.join(self.cache_dir, key[:2], f"{key}.json")
+
+    def _load_disk_index(self):
+        """ディスクストアの索引を作成（最終アクセス順）"""
+        if self._disk is not None:
+            return
+
+        entries = []
+        if os.path.isdir(self.cache_dir):
+            for root, _, files in os.walk(self.cache_dir):
+                for filename in files:
+                    if filename.endswith('.json'):
+                        path = os.path.join(root, filename)
+                        try:
+                            stat = os.stat(path)
+                        except OSError:
+                            continue
+                        entries.append((stat.st_mtime, filename[:-5], stat.st_size))
+
+        self._disk = OrderedDict()
+        self._disk_total = 0
+        for _, key, size in sorted(entries):
+            self._disk[key] = size
+            self._disk_total += size
+
+    def _read_disk(self, key):
+        """ディスクストアから読み込み（他プロセスが書き込んだ分も対象）"""
+        self._load_disk_index()
+        path = self._path(key)
+        try:
+            with open(path, 'r', encoding='utf-8') as file:
+                text = json.load(file)['text']
+            os.utime(path)
+        except FileNotFoundError:
+            self._disk_total -= self._disk.pop(key, 0)
+            return None
+        except (OSError, ValueError, KeyError):
+            self._remove_disk(key)
+            return None
+
+        if key not in self._disk:
+            size = os.path.getsize(path)
+            self._disk[key] = size
+            self._disk_total += size
+        self._disk.move_to_end(key)
+        return text
+
+    def _write_disk(self, key, text):
+        """ディスクストアに書き込み、上限を超えたら古いものから削除"""
+        self._load_disk_index()
+        path = self._path(key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            temp_path = f"{path}.{os.getpid()}.tmp"  # 複数プロセスからの同時書き込み対策
+            with open(temp_path, 'w', encoding='utf-8') as file:
+                json.dump({'text': text}, file, ensure_ascii=False)
+            os.replace(temp_path, path)
+            size = os.path.getsize(path)
+        except OSError as e:
+            print(f"認識キャッシュ書き込みエラー: {e}", file=sys.stderr)
+            return
+
+        self._disk_total += size - self._disk.get(key, 0)
+        self._disk[key] = size
+        self._disk.move_to_end(key)
+
+        while self._disk_total > self.disk_bytes and len(self._disk) > 1:
+            oldest = next(iter(self._disk))
+            self._remove_disk(oldest)
+
+    def _remove_disk(self, key):
+        """ディスクストアから削除"""
+        self._disk_total -= self._disk.pop(key, 0)
+        try:
+            os.remove(self._path(key))
+        except OSError:
+            pass
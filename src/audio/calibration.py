@@ -0,0 +1,107 @@
+# -*- coding: utf-8 -*-
+"""
+マイクのエネルギー閾値（環境音キャリブレーション結果）の保存を管理するモジュール
+"""
+
+import json
+import os
+import sys
+import threading
+import time
+
+from ..utils.config import Config
+
+
+class EnergyThresholdStore:
+    """
+    入力デバイスごとのエネルギー閾値を保存するクラス
+
+    起動のたびに環境音の調整で待たされないよう、前回の結果を
+    Config.CALIBRATION_CACHE_FILE に保存して再利用する。
+    """
+
+    def __init__(self, path=None):
+        """
+        Args:
+            path: 保存先のJSONファイル
+        """
+        self.path = path or Config.CALIBRATION_CACHE_FILE
+        self._entries = None
+        self._lock = threading.Lock()
+
+    def get(self, device_key):
+        """
+        保存済みの閾値を取得
+
+        Args:
+            device_key: 入力デバイスを識別する文字列
+
+        Returns:
+            dict: {'threshold': 閾値, 'updated_at': 保存時刻（UNIX秒）}（未保存はNone）
+        """
+        with self._lock:
+            return self._load().get(device_key)
+
+    def put(self, device_key, threshold):
+        """
+        閾値を保存
+
+        Args:
+            device_key: 入力デバイスを識別する文字列
+            threshold: エネルギー閾値
+        """
+        with self._lock:
+            entries = self._load()
+            entries[device_key] = {'threshold': float(threshold), 'updated_at': time.time()}
+            try:
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+                temp_path = f"{self.path}.tmp"
+                with open(temp_path, 'w', encoding='utf-8') as file:
+                    json.dump(entries, file, ensure_ascii=False, indent=2)
+                os.replace(temp_path, self.path)
+            except OSError as e:
+                print(f"キャリブレーション結果の保存エラー: {e}", file=sys.stderr)
+
+    @staticmethod
+    def is_stale(entry, max_age=None):
+        """
+        保存済みの閾値が古いか
+
+        Args:
+            entry: get() の戻り値
+            max_age: 有効期間（秒）
+
+        Returns:
+            bool: 再キャリブレーションが必要な場合True
+        """
+        max_age = Config.CALIBRATION_MAX_AGE if max_age is None else max_age
+        return entry is None or time.time() - entry.get('updated_at', 0) > max_age
+
+    @staticmethod
+    def has_drifted(entry, threshold, ratio=None):
+        """
+        現在の閾値が保存済みの値から大きくずれたか
+
+        Args:
+            entry: get() の戻り値
+            threshold: 現在の閾値
+            ratio: 許容する相対変化量
+
+        Returns:
+            bool: 保存し直すべき場合True
+        """
+        ratio = Config.CALIBRATION_DRIFT_RATIO if ratio is None else ratio
+        if entry is None:
+            return True
+        saved = entry['threshold']
+        return abs(threshold - saved) > saved * ratio
+
+    def _load(self):
+        """保存ファイルを初回のみ読み込み"""
+        if self._entries is None:
+            try:
+                with open(self.path, 'r', encoding='utf-8') as file:
+                    self._entries = json.load(file)
+            except (OSError, ValueError):
+                self._entries = {}
+        return self._entries
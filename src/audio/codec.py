@@ -0,0 +1,174 @@
+# -*- coding: utf-8 -*-
+"""
+認識バックエンドへ送る音声の符号化を管理するモジュール
+"""
+
+import io
+import os
+import subprocess
+import threading
+import time
+import wave
+
+import speech_recognition as sr
+
+from ..utils.config import Config
+
+CONTENT_TYPES = {
+    'wav': 'audio/wav',
+    'flac': 'audio/flac',
+}
+
+
+def encode_wav(pcm, sample_rate, sample_width):
+    """
+    PCMをWAVに符号化
+
+    Args:
+        pcm: モノラルPCM（bytes-like）
+        sample_rate: サンプリングレート
+        sample_width: サンプル幅（バイト）
+
+    Returns:
+        bytes: WAVデータ
+    """
+    buffer = io.BytesIO()
+    with wave.open(buffer, 'wb') as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(sample_width)
+        wav.setframerate(sample_rate)
+        wav.writeframes(pcm)
+    return buffer.getvalue()
+
+
+def encode_flac(pcm, sample_rate, sample_width, level=None):
+    """
+    PCMをFLACに符号化
+
+    speech_recognition 同梱の flac コマンドに生のPCMをパイプで流し込む
+    （WAV/AIFFのコンテナを組み立て直すコピーを省く）。
+
+    Args:
+        pcm: モノラルPCM（bytes-like。memoryviewも可）
+        sample_rate: サンプリングレート
+        sample_width: サンプル幅（バイト）
+        level: 圧縮レベル 0〜8（省略時は Config.UPLOAD_FLAC_LEVEL）
+
+    Returns:
+        bytes: FLACデータ
+
+    Raises:
+        OSError: flac コマンドが使えない・失敗した場合
+    """
+    level = Config.UPLOAD_FLAC_LEVEL if level is None else level
+    pcm = memoryview(pcm).cast('B')
+    command = [
+        sr.get_flac_converter(), '--stdout', '--totally-silent', f'-{level}',
+        # 標準入力では長さが分からないため、総サンプル数をヘッダーに書けるよう指定する
+        '--force-raw-format', f'--input-size={len(pcm)}', '--endian=little',
+        '--sign=signed' if sample_width > 1 else '--sign=unsigned',
+        '--channels=1', f'--bps={sample_width * 8}', f'--sample-rate={sample_rate}', '-',
+    ]
+    startup_info = None
+    if os.name == 'nt':
+        # Windowsではコンソールウィンドウを表示しない
+        startup_info = subprocess.STARTUPINFO()
+        startup_info.dwFlags |= subprocess.STARTF_USESHOWWINDOW
+        startup_info.wShowWindow = subprocess.SW_HIDE
+
+    process = subprocess.Popen(command, stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                               startupinfo=startup_info)
+    flac_data, _ = process.communicate(pcm)
+    if process.returncode != 0:
+        raise OSError(f"FLACへの変換に失敗しました（終了コード {process.returncode}）")
+    return flac_data
+
+
+ENCODERS = {
+    'wav': encode_wav,
+    'flac': encode_flac,
+}
+
+
+class EncodedAudio(sr.AudioData):
+    """
+    符号化結果を保持する音声データ
+
+    最初に必要になったときに1回だけ符号化し、再試行や保留後の再送では
+    同じ符号化結果を使う。speech_recognition の get_flac_data / get_wav_data を
+    変換なしで呼ぶ場合（recognize_google など）も保持した結果を返す。
+    """
+
+    def __init__(self, frame_data, sample_rate, sample_width):
+        super().__init__(frame_data, sample_rate, sample_width)
+        self._encoded = {}   # 形式 -> 符号化結果
+        self._lock = threading.Lock()
+        self.encode_seconds = 0.0
+
+    @classmethod
+    def wrap(cls, audio):
+        """
+        sr.AudioData を EncodedAudio に変換（すでに EncodedAudio ならそのまま）
+
+        Args:
+            audio: sr.AudioData
+
+        Returns:
+            EncodedAudio
+        """
+        if isinstance(audio, cls):
+            return audio
+        return cls(audio.frame_data, audio.sample_rate, audio.sample_width)
+
+    def detach(self, frame_data=None):
+        """
+        音声データをコピーした EncodedAudio を取得（符号化結果は引き継ぐ）
+
+        リングバッファのスライスを包んでいる場合、保留する前に呼ぶ。
+
+        Args:
+            frame_data: 代わりに保持する同じ内容の音声データ（スプールから読み直した場合など）
+        """
+        frame_data = bytes(self.frame_data) if frame_data is None else frame_data
+        audio = EncodedAudio(frame_data, self.sample_rate, self.sample_width)
+        with self._lock:
+            audio._encoded = dict(self._encoded)
+            audio.encode_seconds = self.encode_seconds
+        return audio
+
+    def encoded(self, codec=None):
+        """
+        指定した形式の符号化結果を取得
+
+        Args:
+            codec: 'flac' または 'wav'（省略時は Config.UPLOAD_CODEC）
+
+        Returns:
+            bytes: 符号化結果
+        """
+        codec = codec or Config.UPLOAD_CODEC
+        if codec not in ENCODERS:
+            raise ValueError(f"不明な音声形式: {codec}（利用可能: {', '.join(sorted(ENCODERS))}）")
+
+        # 並行して呼ばれても符号化は1回だけ
+        with self._lock:
+            if codec not in self._encoded:
+                start = time.perf_counter()
+                self._encoded[codec] = ENCODERS[codec](self.frame_data, self.sample_rate, self.sample_width)
+                self.encode_seconds += time.perf_counter() - start
+            return self._encoded[codec]
+
+    def get_flac_data(self, convert_rate=None, convert_width=None):
+        if self._is_native(convert_rate, convert_width):
+            return self.encoded('flac')
+        return super().get_flac_data(convert_rate, convert_width)
+
+    def get_wav_data(self, convert_rate=None, convert_width=None):
+        if self._is_native(convert_rate, convert_width):
+            return self.encoded('wav')
+        return super().get_wav_data(convert_rate, convert_width)
+
+    def _is_native(self, convert_rate, convert_width):
+        """変換なしの呼び出しか"""
+        return (convert_rate in (None, self.sample_rate)
+                and convert_width in (None, self.sample_width))
@@ -0,0 +1,218 @@
+# -*- coding: utf-8 -*-
+"""
+認識サービスへの HTTP 接続を使い回すモジュール
+
+発話ごとに接続を開くと、そのたびに TCP（https では TLS も）の接続確立を待つことになる。
+接続先ごとにキープアライブの接続を保持し、認識ワーカーのスレッド間で共有する。
+"""
+
+import http.client
+import ssl
+import threading
+import time
+from urllib.parse import urlsplit
+
+from ..utils.config import Config
+from ..utils.tracing import LatencyHistogram
+
+# 使い回した接続がサーバー側で閉じられていた場合に起きるエラー
+STALE_CONNECTION_ERRORS = (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError)
+
+
+class HttpConnectionPool:
+    """
+    スレッドセーフな HTTP/1.1 接続プール
+
+    接続先（スキーム・ホスト・ポート）ごとに空いている接続を保持し、同時に使う接続数は
+    max_connections までに抑える（超えた分は接続が空くまで待つ）。idle_timeout 秒より
+    長く使っていない接続はサーバー側で閉じられている可能性が高いため捨てる。
+    使い回した接続が閉じられていた場合は、新しい接続で1回だけ送り直す。
+    keep_alive=False ではリクエストごとに接続を開いて閉じる（使い回さない場合の比較用）。
+    """
+
+    def __init__(self, max_connections=None, idle_timeout=None, keep_alive=None):
+        """
+        Args:
+            max_connections: 同時に使う接続数の上限（省略時は Config.HTTP_POOL_SIZE）
+            idle_timeout: 空いている接続を保持する秒数（省略時は Config.HTTP_POOL_IDLE_TIMEOUT）
+            keep_alive: 接続を使い回すか（省略時は Config.HTTP_POOL_ENABLED）
+        """
+        self.max_connections = max_connections or Config.HTTP_POOL_SIZE
+        self.keep_alive = Config.HTTP_POOL_ENABLED if keep_alive is None else keep_alive
+        self.idle_timeout = idle_timeout if idle_timeout is not None else Config.HTTP_POOL_IDLE_TIMEOUT
+        self._slots = threading.BoundedSemaphore(self.max_connections)
+        self._lock = threading.Lock()
+        self._idle = {}  # (スキーム, ホスト, ポート) -> [(接続, 最後に使った時刻)]
+
+        # 統計
+        self.requests_sent = 0
+        self.connections_opened = 0
+        self.reused_count = 0     # 空いている接続を使い回したリクエスト数
+        self.retried_count = 0    # 閉じられていた接続から送り直したリクエスト数
+        self.latency = LatencyHistogram()
+
+    def request(self, method, url, body=b"", headers=None, timeout=None):
+        """
+        リクエストを送り、応答を受け取る
+
+        Args:
+            method: HTTPメソッド
+            url: URL（http または https）
+            body: 送信するデータ
+            headers: 追加のヘッダー（辞書）
+            timeout: 接続の空き待ち・接続・送受信それぞれの制限時間（秒）
+
+        Returns:
+            tuple: (ステータスコード, 応答の本文)
+
+        Raises:
+            OSError: 接続・送受信に失敗した場合（制限時間を超えた場合は TimeoutError）
+            http.client.HTTPException: 応答が不正な場合
+        """
+        parts = urlsplit(url)
+        key = (parts.scheme, parts.hostname, parts.port or (443 if parts.scheme == 'https' else 80))
+        target = parts.path or "/"
+        if parts.query:
+            target += "?" + parts.query
+        headers = dict(headers or {}, Connection='keep-alive' if self.keep_alive else 'close')
+
+        if not self._slots.acquire(timeout=timeout):
+            raise TimeoutError("接続の空きを待つ間に制限時間を超えました")
+        try:
+            started = time.perf_counter()
+            connection = self._checkout(key, timeout)
+            reused = connection is not None
+            if not reused:
+                connection = self._open(key, timeout)
+            try:
+                status, data, keep_alive = self._exchange(connection, method, target, body, headers)
+            except STALE_CONNECTION_ERRORS:
+                if not reused:
+                    raise
+                # サーバーが閉じたキープアライブ接続は新しい接続で送り直す
+                with self._lock:
+                    self.retried_count += 1
+                reused = False
+                connection = self._open(key, timeout)
+                status, data, keep_alive = self._exchange(connection, method, target, body, headers)
+
+            keep_alive = keep_alive and self.keep_alive
+            with self._lock:
+                self.requests_sent += 1
+                self.reused_count += reused
+                self.latency.add(time.perf_counter() - started)
+                if keep_alive:
+                    self._idle.setdefault(key, []).append((connection, time.monotonic()))
+            if not keep_alive:
+                connection.close()
+            return status, data
+        finally:
+            self._slots.release()
+
+    def _checkout(self, key, timeout):
+        """空いている接続を取り出す（古すぎる接続は閉じる。ない場合はNone）"""
+        expired = []
+        connection = None
+        with self._lock:
+            idle = self._idle.get(key, [])
+            now = time.monotonic()
+            while idle:
+                candidate, last_used = idle.pop()
+                if now - last_used > self.idle_timeout:
+                    expired.append(candidate)
+                    continue
+                connection = candidate
+                break
+        for candidate in expired:
+            candidate.close()
+        if connection is not None:
+            connection.timeout = timeout
+            if connection.sock is not None:
+                connection.sock.settimeout(timeout)
+        return connection
+
+    def _open(self, key, timeout):
+        """新しい接続を作る（接続自体は最初の送信時に確立される）"""
+        scheme, host, port = key
+        if scheme == 'https':
+            connection = http.client.HTTPSConnection(host, port, timeout=timeout,
+                                                     context=ssl.create_default_context())
+        else:
+            connection = http.client.HTTPConnection(host, port, timeout=timeout)
+        with self._lock:
+            self.connections_opened += 1
+        return connection
+
+    @staticmethod
+    def _exchange(connection, method, target, body, headers):
+        """1往復の送受信（途中で失敗した接続は閉じる）"""
+        try:
+            connection.request(method, target, body=body, headers=headers)
+            response = connection.getresponse()
+            data = response.read()
+        except BaseException:
+            connection.close()
+            raise
+        return response.status, data, not response.will_close
+
+    def record_request(self, elapsed, reused, retried=False):
+        """
+        プールを通さずに送ったリクエストを統計に加える
+
+        asyncio の AsyncHttpClient で送ったリクエストも stats() にまとめて集計するために使う。
+
+        Args:
+            elapsed: 所要時間（秒）
+            reused: 空いている接続を使い回したか（False なら新しい接続を開いた）
+            retried: 閉じられていた接続から送り直したか
+        """
+        with self._lock:
+            self.requests_sent += 1
+            self.connections_opened += not reused
+            self.reused_count += reused
+            self.retried_count += retried
+            self.latency.add(elapsed)
+
+    def stats(self):
+        """
+        接続の使い回しと所要時間の統計を取得
+
+        Returns:
+            dict: requests, connections_opened, reused, retried, reuse_ratio と、
+                1リクエストの所要時間の百分位数 latency（LatencyHistogram.percentiles() の結果）
+        """
+        with self._lock:
+            return {
+                'requests': self.requests_sent,
+                'connections_opened': self.connections_opened,
+                'reused': self.reused_count,
+                'retried': self.retried_count,
+                'reuse_ratio': self.reused_count / self.requests_sent if self.requests_sent else 0.0,
+                'latency': self.latency.percentiles(),
+            }
+
+    def close(self):
+        """空いている接続をすべて閉じる"""
+        with self._lock:
+            idle, self._idle = self._idle, {}
+        for connections in idle.values():
+            for connection, _ in connections:
+                connection.close()
+
+
+def format_connection_stats(stats):
+    """
+    接続の統計を1行の文字列に整形
+
+    Args:
+        stats: HttpConnectionPool.stats() の結果
+
+    Returns:
+        str: リクエスト数・接続数・使い回しの割合・所要時間の p50/p95
+    """
+    text = (f"HTTP接続: {stats['requests']} 件のリクエストに {stats['connections_opened']} 接続"
+            f"（使い回し {stats['reuse_ratio'] * 100:.0f}%、送り直し {stats['retried']} 件）")
+    latency = stats['latency']
+    if latency['count']:
+        text += f" p50 {latency['p50'] * 1000:.0f} ms / p95 {latency['p95'] * 1000:.0f} ms"
+    return text
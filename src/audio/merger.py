@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+"""
+複数の入力元の認識結果を録音順に合流させるモジュール
+"""
+
+import threading
+from collections import deque
+
+
+class ResultMerger:
+    """
+    入力元ごとのレーンで並列に認識した結果を、区間の投入順に並べ直して通知するクラス
+
+    区間の投入時に register で通し番号を割り当て、レーンから結果が届いたら
+    complete で記録する。通し番号の若い区間の結果が揃った分から順に on_result を呼ぶ。
+    AudioRecorder は複数チャンネルの区間を開始位置の順に通知するため、
+    投入順に並べれば発話の開始時刻順になる。
+    """
+
+    def __init__(self, sources, on_result):
+        """
+        Args:
+            sources: 合流させる入力元の名前のリスト
+            on_result: 結果を順番どおりに受け取る関数 (source, utterance_id, result)
+        """
+        self.sources = frozenset(sources)
+        self.on_result = on_result
+        self._lock = threading.Lock()
+        self._waiting = {source: deque() for source in self.sources}  # 入力元 -> (通し番号, 発話ID)
+        self._completed = {}    # 通し番号 -> (入力元, 発話ID, 結果)
+        self._next_ticket = 0
+        self._next_emit = 0
+
+    def handles(self, source):
+        """入力元が合流の対象か"""
+        return source in self.sources
+
+    def register(self, source, utterance_id):
+        """
+        区間の投入を記録（レーンへ投入する前に呼ぶ）
+
+        Args:
+            source: 入力元の名前
+            utterance_id: 発話ID
+        """
+        with self._lock:
+            self._waiting[source].append((self._next_ticket, utterance_id))
+            self._next_ticket += 1
+
+    def complete(self, source, utterance_id, result):
+        """
+        レーンから届いた結果を記録し、順番が来た結果を通知
+
+        レーンで連結された区間は後の発話IDで結果が届くため、それより前に投入した
+        同じ入力元の区間は結果なしで完了とする。
+
+        Args:
+            source: 入力元の名前
+            utterance_id: 発話ID
+            result: on_result へそのまま渡す結果
+        """
+        with self._lock:
+            waiting = self._waiting[source]
+            if not any(registered == utterance_id for _, registered in waiting):
+                # 登録されていない区間（合流の設定前に投入した区間など）はそのまま通知
+                self.on_result(source, utterance_id, result)
+                return
+            while waiting:
+                ticket, registered = waiting.popleft()
+                if registered == utterance_id:
+                    self._completed[ticket] = (source, utterance_id, result)
+                    break
+                self._completed[ticket] = None
+
+            while self._next_emit in self._completed:
+                entry = self._completed.pop(self._next_emit)
+                self._next_emit += 1
+                if entry is not None:
+                    self.on_result(*entry)
+
+    def pending_count(self):
+        """結果を待っている区間の数"""
+        with self._lock:
+            return self._next_ticket - self._next_emit
@@ -0,0 +1,195 @@
+# -*- coding: utf-8 -*-
+"""
+複数の入力デバイスからの同時録音を管理するモジュール
+"""
+
+from ..utils.config import Config
+from .recorder import AudioRecorder
+from .sources import PyAudioSource
+
+
+def create_recorder(device_indexes=None, channels=None, audio_source=None):
+    """
+    入力デバイスの指定に応じた録音クラスを生成
+
+    Args:
+        device_indexes: 録音する入力デバイスの番号のリスト（省略時は Config.INPUT_DEVICES。
+            audio_source を指定した場合はそのすべてのデバイス）
+        channels: 1台で録音する場合のチャンネル数（省略時は Config.INPUT_CHANNELS。
+            複数デバイスでは各デバイスをモノラルで録音する）
+        audio_source: 録音の入力元（AudioSource。省略時はマイク）
+
+    Returns:
+        2台以上なら MultiDeviceRecorder、それ以外は AudioRecorder（空なら既定の入力デバイス）
+    """
+    if device_indexes is None:
+        device_indexes = (Config.INPUT_DEVICES if audio_source is None
+                          else [device['index'] for device in audio_source.list_devices()])
+    device_indexes = list(device_indexes)
+    if len(device_indexes) > 1:
+        return MultiDeviceRecorder(device_indexes, audio_source=audio_source)
+    return AudioRecorder(device_index=device_indexes[0] if device_indexes else None, channels=channels,
+                         audio_source=audio_source)
+
+
+class MultiDeviceRecorder:
+    """
+    複数の入力デバイスから同時に録音するクラス
+
+    デバイスごとに AudioRecorder（ストリームのコールバック・リングバッファ・
+    VADの処理スレッド）を持ち、発話区間には入力元の名前（source）を付けて通知する。
+    SpeechRecognizer に source を渡すと入力元ごとのレーンで認識される。
+    AudioRecorder と同じ操作（set_callbacks / start_recording / stop_recording /
+    cleanup）で扱える。
+    """
+
+    def __init__(self, device_indexes, audio=None, audio_source=None):
+        """
+        Args:
+            device_indexes: 録音する入力デバイスの番号のリスト
+            audio: 共有する pyaudio.PyAudio（audio_source を省略した場合に使う）
+            audio_source: 全デバイスで共有する録音の入力元（AudioSource）。
+                audio とともに省略した場合はマイク（PyAudioSource）を生成し、cleanup で終了する
+        """
+        self._owns_audio = audio_source is None and audio is None
+        self.audio_source = audio_source or PyAudioSource(audio)
+        self.recorders = [
+            AudioRecorder(device_index=index, source=self._device_tag(index), channels=1,
+                          audio_source=self.audio_source)
+            for index in device_indexes
+        ]
+        self.rate = self.recorders[0].rate if self.recorders else None
+        self.on_error = None
+
+    def _device_tag(self, index):
+        """入力元の名前（デバイス番号:デバイス名）"""
+        try:
+            return f"{index}:{self.audio_source.get_device_info(index)['name']}"
+        except Exception:
+            return str(index)
+
+    @property
+    def is_recording(self):
+        """いずれかのデバイスで録音中か"""
+        return any(recorder.is_recording for recorder in self.recorders)
+
+    @property
+    def input_finished(self):
+        """すべてのデバイスで入力元の音声が終わり、録音した分を処理し終えたか"""
+        return bool(self.recorders) and all(recorder.input_finished for recorder in self.recorders)
+
+    @property
+    def captured_seconds(self):
+        """全デバイスで録音した音声の長さの合計（秒）"""
+        return sum(recorder.captured_seconds for recorder in self.recorders)
+
+    @property
+    def merged_sources(self):
+        """結果を録音順に合流させる入力元（デバイスごとに時刻の基準が異なるため合流しない）"""
+        return []
+
+    def set_callbacks(self, on_audio_data=None, on_error=None, on_partial_audio=None,
+                      on_captured_audio=None):
+        """
+        コールバック関数を設定（全デバイス共通）
+
+        Args:
+            on_audio_data: 発話区間の確定時に呼ばれる関数
+                (音声データ, trace=遅延計測のトレース, utterance_id=発話ID, source=入力元の名前,
+                overlap=前の区間と重なる先頭のサンプル数, continued=続きの区間を重ねて始めたか)
+            on_error: エラー発生時に呼ばれる関数
+            on_partial_audio: 発話途中の音声データ通知のコールバック。
+                途中結果は1つの発話にしか対応しないため、複数デバイスでは使わない
+            on_captured_audio: 録音チャンクをそのまま渡す関数 (音声データ, 入力元の名前)
+        """
+        self.on_error = on_error
+        for recorder in self.recorders:
+            recorder.set_callbacks(on_audio_data=on_audio_data, on_error=on_error,
+                                   on_captured_audio=on_captured_audio)
+
+    def start_recording(self):
+        """
+        全デバイスで録音開始
+
+        Returns:
+            bool: 1台以上で録音を開始できた場合True（開始できなかったデバイスは on_error で通知）
+        """
+        started = [recorder.start_recording() for recorder in self.recorders]
+        return any(started)
+
+    def stop_recording(self):
+        """全デバイスで録音停止"""
+        for recorder in self.recorders:
+            recorder.stop_recording()
+
+    def is_microphone_available(self):
+        """いずれかのデバイスが利用可能かチェック"""
+        return any(recorder.is_microphone_available() for recorder in self.recorders)
+
+    @property
+    def noise_tracker(self):
+        """認識側と共有する環境ノイズの推定（先頭のデバイスのもの）"""
+        return self.recorders[0].noise_tracker if self.recorders else None
+
+    @property
+    def overrun_count(self):
+        """リングバッファの上書き（取りこぼし）回数の合計"""
+        return sum(recorder.overrun_count for recorder in self.recorders)
+
+    def report(self, speech_recognizer=None):
+        """
+        デバイスごとの処理量と取りこぼしを取得
+
+        Args:
+            speech_recognizer: 認識レーンの破棄数も含める場合の SpeechRecognizer
+
+        Returns:
+            list: デバイスごとの辞書
+                source, device_index, captured_seconds（録音した音声の秒数）,
+                realtime_ratio（経過時間に対する録音音声の比、1.0で取りこぼしなし）,
+                segments, overruns（リングの上書き）, dropped（認識待ちの破棄）, pending,
+                threshold（発話とみなす現在の閾値）
+        """
+        lane_stats = speech_recognizer.lane_stats() if speech_recognizer else {}
+        rows = []
+        for recorder in self.recorders:
+            elapsed = recorder.elapsed_seconds
+            lane = lane_stats.get(recorder.source, {})
+            rows.append({
+                'source': recorder.source,
+                'device_index': recorder.device_index,
+                'captured_seconds': recorder.captured_seconds,
+                'realtime_ratio': recorder.captured_seconds / elapsed if elapsed else 0.0,
+                'segments': recorder.segment_count,
+                'overruns': recorder.overrun_count,
+                'dropped': lane.get('dropped', 0),
+                'pending': lane.get('pending', 0),
+                'threshold': (recorder.noise_tracker.threshold if recorder.noise_tracker
+                              else Config.VAD_ENERGY_THRESHOLD),
+            })
+        return rows
+
+    def format_report(self, speech_recognizer=None):
+        """
+        デバイスごとの処理量と取りこぼしを表形式の文字列で取得
+
+        Args:
+            speech_recognizer: 認識レーンの破棄数も含める場合の SpeechRecognizer
+
+        Returns:
+            str: 表示用の文字列
+        """
+        lines = [f"{'入力元':<28} {'録音秒':>8} {'実時間比':>8} {'区間':>6} {'上書き':>6} {'破棄':>6} {'待機':>6} {'閾値':>6}"]
+        for row in self.report(speech_recognizer):
+            lines.append(
+                f"{row['source']:<28} {row['captured_seconds']:>8.1f} {row['realtime_ratio']:>8.2f} "
+                f"{row['segments']:>6} {row['overruns']:>6} {row['dropped']:>6} {row['pending']:>6} {row['threshold']:>6.0f}"
+            )
+        return "\n".join(lines)
+
+    def cleanup(self):
+        """リソースのクリーンアップ"""
+        for recorder in self.recorders:
+            recorder.cleanup()
+        if self._owns_audio:
+            self.audio_source.terminate()
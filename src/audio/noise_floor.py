@@ -0,0 +1,154 @@
+# -*- coding: utf-8 -*-
+"""
+環境ノイズの大きさ（ノイズフロア）の推定を管理するモジュール
+
+録音中の環境音は空調や人の出入りで変わるため、起動時に1回測った閾値のままでは
+うるさくなると雑音を発話として認識に送り、静かになると小さな声を取りこぼす。
+VAD が計算したフレームごとの RMS から環境ノイズを逐次推定し、発話とみなす
+閾値を更新し続ける。
+"""
+
+import math
+
+import numpy as np
+
+from ..utils.config import Config
+
+
+class NoiseFloorTracker:
+    """
+    ストリーミング型のノイズフロア推定クラス
+
+    発話の合間には必ず環境音だけの区間があるため、直近 window_sec 秒のフレーム RMS の
+    最小値を環境ノイズの観測値とする（半分の長さのブロック2つの最小値だけを保持し、
+    状態は入力の長さによらず一定）。観測値が推定値より小さい場合は fall_sec、
+    大きい場合は rise_sec の時定数で推定値を近づけ、推定値の ratio 倍を
+    [minimum, maximum] に収めた値を閾値とする（発話が続いても閾値はゆっくりしか
+    上がらず、静かになった場合はすぐ下がる）。推定はフレームごとに進めるため、
+    同じ音声なら update に渡す単位（録音チャンクの区切り方）によらず同じ閾値になる。
+    1つの入力（録音スレッド）から update し、閾値は他のスレッドから読んでよい。
+    """
+
+    def __init__(self, initial_threshold=None, window_sec=None, rise_sec=None, fall_sec=None,
+                 ratio=None, minimum=None, maximum=None):
+        """
+        Args:
+            initial_threshold: 最初の閾値（省略時は Config.VAD_ENERGY_THRESHOLD）
+            window_sec: 最小値を取る区間の長さ（秒）
+            rise_sec: 環境音が大きくなった場合に追従する時定数（秒）
+            fall_sec: 環境音が小さくなった場合に追従する時定数（秒）
+            ratio: 閾値とするノイズフロアの倍率
+            minimum: 閾値の下限
+            maximum: 閾値の上限
+        """
+        self.window_sec = window_sec or Config.NOISE_FLOOR_WINDOW_SEC
+        self.rise_sec = rise_sec or Config.NOISE_FLOOR_RISE_SEC
+        self.fall_sec = fall_sec or Config.NOISE_FLOOR_FALL_SEC
+        self.ratio = ratio or Config.NOISE_THRESHOLD_RATIO
+        self.minimum = minimum if minimum is not None else Config.VAD_ENERGY_THRESHOLD_MIN
+        self.maximum = maximum if maximum is not None else Config.VAD_ENERGY_THRESHOLD_MAX
+
+        self._block_min = math.inf      # 現在のブロックの最小値
+        self._previous_min = math.inf   # 直前のブロックの最小値
+        self._block_frames = 0          # 現在のブロックに入ったフレーム数
+        self._steps = (None, 0.0, 0.0, 1)  # (フレームの長さ, 上昇時の係数, 下降時の係数, ブロックのフレーム数)
+        self.update_count = 0
+        self.seed(initial_threshold if initial_threshold is not None else Config.VAD_ENERGY_THRESHOLD)
+
+    def seed(self, threshold):
+        """
+        閾値を外部の測定値（環境音キャリブレーションの結果など）に合わせる
+
+        Args:
+            threshold: 閾値（16bit振幅のRMS）
+        """
+        self.floor = float(threshold) / self.ratio
+        self.threshold = self._clamp(float(threshold))
+
+    def update(self, frame_rms, frame_duration):
+        """
+        フレームごとの RMS で推定値と閾値を更新
+
+        Args:
+            frame_rms: フレームごとの RMS（numpy配列）
+            frame_duration: 1フレームの長さ（秒）
+
+        Returns:
+            numpy.ndarray: フレームごとの閾値（そのフレームまでの推定による値）
+        """
+        thresholds = np.empty(len(frame_rms), dtype=np.float32)
+        if len(frame_rms) == 0 or frame_duration <= 0:
+            thresholds.fill(self.threshold)
+            return thresholds
+
+        if self._steps[0] != frame_duration:
+            self._steps = (frame_duration,
+                           1 - math.exp(-frame_duration / self.rise_sec),
+                           1 - math.exp(-frame_duration / self.fall_sec),
+                           max(1, math.ceil(self.window_sec / 2 / frame_duration - 1e-9)))
+        _, rise, fall, block_frames = self._steps
+
+        # ブロックの境目で区切り、区切りの中はまとめて計算する（境目は window_sec / 2 秒ごと）
+        values = np.asarray(frame_rms, dtype=np.float64)
+        floors = np.empty(len(values))
+        start = 0
+        while start < len(values):
+            end = min(len(values), start + block_frames - self._block_frames)
+            block_min = np.minimum(np.minimum.accumulate(values[start:end]), self._block_min)
+            observed = np.minimum(block_min, self._previous_min)
+            floors[start:end] = self._follow(observed, rise, fall)
+
+            self._block_frames += end - start
+            if self._block_frames >= block_frames:
+                self._previous_min, self._block_min = float(block_min[-1]), math.inf
+                self._block_frames = 0
+            else:
+                self._block_min = float(block_min[-1])
+            start = end
+
+        np.multiply(floors, self.ratio, out=thresholds, casting='unsafe')
+        np.clip(thresholds, self.minimum, self.maximum, out=thresholds)
+        self.threshold = float(thresholds[-1])
+        self.update_count += 1
+        return thresholds
+
+    def _follow(self, observed, rise, fall):
+        """
+        フレームごとの観測値に推定値を追従させる
+
+        ブロック内の観測値は増えない（最小値を取り続ける）ため、いったん推定値を
+        下回ればその後は下がり続ける。上昇の係数で追従させた列のうち観測値が推定値を
+        初めて下回るフレームを探し、そこから先を下降の係数で計算し直す。
+
+        Args:
+            observed: 1つのブロック内のフレームごとの観測値（増えない numpy配列）
+            rise: 上昇時の係数
+            fall: 下降時の係数
+
+        Returns:
+            numpy.ndarray: フレームごとの推定値
+        """
+        floors = self._smooth(observed, self.floor, rise)
+        previous = np.concatenate(([self.floor], floors[:-1]))
+        falling = np.flatnonzero(observed < previous)
+        if len(falling):
+            first = falling[0]
+            floors[first:] = self._smooth(observed[first:], previous[first], fall)
+        self.floor = float(floors[-1])
+        return floors
+
+    @staticmethod
+    def _smooth(values, initial, coefficient):
+        """
+        指数移動平均 y[i] = y[i-1] + (values[i] - y[i-1]) * coefficient を一括で計算
+
+        y[i] = decay**(i+1) * (initial + coefficient * Σ values[k] / decay**(k+1)) を使う。
+        1回に渡すのは1ブロック（window_sec / 2 秒）以内のため decay の累乗は桁あふれしない。
+        """
+        decay = 1 - coefficient
+        powers = decay ** np.arange(1, len(values) + 1)
+        return powers * (initial + coefficient * np.cumsum(values / powers))
+
+    def _clamp(self, threshold):
+        """閾値を上下限の範囲に収める"""
+        return min(self.maximum, max(self.minimum, threshold))
@@ -0,0 +1,195 @@
+# -*- coding: utf-8 -*-
+"""
+重ねて区切った区間の認識結果をつなぎ合わせるモジュール
+
+長い発話を強制的に区切る際、VAD は次の区間の先頭を少し前（Config.VAD_OVERLAP_MS）から
+始める。境界をまたぐ単語はどちらかの区間に丸ごと含まれるが、重なった部分は
+両方の認識結果に現れるため、結果の末尾と先頭の単語の並びを照合して重複を取り除く。
+"""
+
+import math
+import re
+import threading
+from collections import namedtuple
+
+from ..utils.config import Config
+
+# 英数字は単語ごと、それ以外（日本語など）は1文字ずつを照合の単位とする
+TOKEN_PATTERN = re.compile(r"[0-9A-Za-zÀ-ɏ']+|\S")
+
+OverlapWindow = namedtuple('OverlapWindow', ['length', 'overlap', 'continued'])
+
+
+def tokenize(text):
+    """
+    テキストを照合の単位に分割
+
+    Args:
+        text: 認識結果
+
+    Returns:
+        list: (開始位置, 終了位置, 正規化した単位) のリスト
+    """
+    return [(match.start(), match.end(), match.group().casefold())
+            for match in TOKEN_PATTERN.finditer(text)]
+
+
+def _search_range(count, share):
+    """重なりに含まれうる単位数（長さの割合から見積もり、区切りで欠けた単語の分を足す）"""
+    limit = Config.OVERLAP_SEARCH_TOKENS
+    if share is None:
+        return limit
+    return min(limit, math.ceil(count * share) + Config.OVERLAP_TOKEN_MARGIN)
+
+
+def stitch_overlap(previous, text, previous_share=None, text_share=None, min_match=None):
+    """
+    重なった2つの区間の認識結果から重複を取り除く
+
+    前の結果の末尾と次の結果の先頭のうち、重なった音声に対応しうる範囲で最も長く
+    一致する並びを探し、一致した部分は前の結果に残す。前の結果で一致より後ろの単位
+    （区切りで欠けた単語）と、次の結果で一致より前の単位（重なりの重複と欠けた単語）は
+    取り除く。一致が min_match 単位に満たない場合は、重なりの中点で分けたとみなし、
+    長さの割合から見積もった単位数を前の結果の末尾と次の結果の先頭から取り除く
+    （割合が分からない場合はどちらも変更しない）。
+
+    Args:
+        previous: 前の区間の認識結果
+        text: 次の区間の認識結果
+        previous_share: 前の区間の長さに占める重なりの割合（省略時は照合範囲の上限まで探す）
+        text_share: 次の区間の長さに占める重なりの割合
+        min_match: 重なりとみなす最小の一致長（省略時は Config.OVERLAP_MIN_MATCH_TOKENS）
+
+    Returns:
+        tuple: (前の区間の結果, 次の区間の結果)
+    """
+    if not previous or not text:
+        return previous, text
+    min_match = min_match or Config.OVERLAP_MIN_MATCH_TOKENS
+
+    previous_tokens = tokenize(previous)
+    text_tokens = tokenize(text)
+    tail = previous_tokens[-_search_range(len(previous_tokens), previous_share):]
+    head = text_tokens[:_search_range(len(text_tokens), text_share)]
+
+    # 最長共通部分列（連続）を動的計画法で探す。同じ長さなら境界に近いものを選ぶ
+    best = None  # (一致長, 境界からの距離, 前の一致の終端, 次の一致の終端)
+    lengths = [0] * (len(head) + 1)
+    for i in range(1, len(tail) + 1):
+        previous_row = lengths
+        lengths = [0] * (len(head) + 1)
+        for j in range(1, len(head) + 1):
+            if tail[i - 1][2] == head[j - 1][2]:
+                lengths[j] = previous_row[j - 1] + 1
+                length = lengths[j]
+                distance = (len(tail) - i) + (j - length)
+                candidate = (length, -distance, i, j)
+                if best is None or candidate[:2] > best[:2]:
+                    best = candidate
+
+    if best is not None and best[0] >= min_match:
+        _, _, tail_end, head_end = best
+        head_start = head_end
+    elif previous_share is not None and text_share is not None:
+        # 一致が見つからない場合は重なりの中点で分ける
+        tail_end = len(tail) - round(len(previous_tokens) * previous_share / 2)
+        head_start = round(len(text_tokens) * text_share / 2)
+    else:
+        return previous, text
+
+    if tail_end < len(tail):
+        previous = previous[:tail[max(0, tail_end)][0]].rstrip()
+    if head_start > 0:
+        text = text[head[min(head_start, len(head)) - 1][1]:].lstrip()
+    return previous, text
+
+
+class OverlapStitcher:
+    """
+    入力元ごとに、重ねて区切った区間の認識結果を録音順につなぎ合わせて通知するクラス
+
+    続きのある区間（強制的に区切った区間）の結果は、続きの区間の結果が届くまで
+    1件だけ保持し、届いたら stitch_overlap で重複を取り除いてから両方を順に通知する。
+    保持するのは入力元ごとに最大1件のため、長時間の録音でもメモリは増えない。
+    """
+
+    def __init__(self, on_result, min_match=None):
+        """
+        Args:
+            on_result: 結果を順番どおりに受け取る関数 (source, utterance_id, (テキスト, trace))
+            min_match: 重なりとみなす最小の一致長（単位数）
+        """
+        self.on_result = on_result
+        self.min_match = min_match
+        self._lock = threading.Lock()
+        self._windows = {}  # 入力元 -> {発話ID: OverlapWindow}
+        self._held = {}     # 入力元 -> (発話ID, (テキスト, trace), 区間の長さ)
+        self.stitched_count = 0
+
+    def register(self, source, utterance_id, length, overlap=0, continued=False):
+        """
+        区間の重なりを記録（レーンへ投入する前に呼ぶ）
+
+        Args:
+            source: 入力元の名前
+            utterance_id: 発話ID
+            length: 区間の長さ（サンプル数）
+            overlap: 先頭が前の区間の末尾と重なっているサンプル数
+            continued: 続きの区間を重ねて始めたか（強制的に区切った区間）
+        """
+        if not overlap and not continued:
+            return
+        with self._lock:
+            self._windows.setdefault(source, {})[utterance_id] = OverlapWindow(length, overlap, continued)
+
+    def complete(self, source, utterance_id, result):
+        """
+        レーンから録音順に届いた結果を記録し、通知できる結果を通知
+
+        Args:
+            source: 入力元の名前
+            utterance_id: 発話ID
+            result: (テキスト, trace)
+        """
+        with self._lock:
+            windows = self._windows.get(source)
+            window = None
+            if windows:
+                window = windows.pop(utterance_id, None)
+                # レーンで連結された区間の記録は結果が届かないため捨てる
+                for older in [key for key in windows if key < utterance_id]:
+                    del windows[older]
+
+            held = self._held.pop(source, None)
+            if held is not None:
+                held_id, (held_text, held_trace), held_length = held
+                if window is not None and window.overlap:
+                    text, trace = result
+                    stitched, text = stitch_overlap(
+                        held_text, text,
+                        window.overlap / held_length, window.overlap / window.length,
+                        self.min_match
+                    )
+                    if (stitched, text) != (held_text, result[0]):
+                        self.stitched_count += 1
+                    held_text = stitched
+                    result = (text, trace)
+                self.on_result(source, held_id, (held_text, held_trace))
+
+            if window is not None and window.continued:
+                self._held[source] = (utterance_id, result, window.length)
+            else:
+                self.on_result(source, utterance_id, result)
+
+    def flush(self):
+        """保持している結果をすべて通知（停止時に呼ぶ）"""
+        with self._lock:
+            held, self._held = self._held, {}
+            self._windows.clear()
+            for source, (utterance_id, result, _) in held.items():
+                self.on_result(source, utterance_id, result)
+
+    def pending_count(self):
+        """続きの区間を待っている結果の数"""
+        with self._lock:
+            return len(self._held)
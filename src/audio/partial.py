@@ -0,0 +1,152 @@
+# -*- coding: utf-8 -*-
+"""
+発話途中の認識結果（途中結果）を管理するモジュール
+"""
+
+import threading
+
+import speech_recognition as sr
+
+from ..utils.config import Config
+
+
+class PartialRecognizer:
+    """
+    進行中の発話から途中結果を作るクラス
+
+    逐次認識に対応したバックエンドでは発話ごとにストリームを作り、前回以降に
+    増えた音声だけを渡す。対応していないバックエンドでは、発話の末尾
+    Config.PARTIAL_WINDOW_SEC 秒の窓を毎回認識し直す（窓は前回と重なる）。
+    認識は専用の1スレッドで行い、処理中に届いた要求は最新のものだけを残す。
+    """
+
+    def __init__(self, on_partial=None, window_sec=None):
+        """
+        Args:
+            on_partial: 途中結果を受け取る関数 (発話ID, テキスト)
+            window_sec: 逐次認識に対応しないバックエンドで認識する窓の長さ（秒）
+        """
+        self.on_partial = on_partial
+        self.window_sec = window_sec or Config.PARTIAL_WINDOW_SEC
+
+        self._request = None          # 処理待ちの最新の要求
+        self._condition = threading.Condition()
+        self._thread = None
+        self._running = False
+
+        self._finished_through = None  # この発話ID以前は確定済み（途中結果を出さない）
+        self._stream_id = None         # ストリームを作成済みの発話ID
+        self._stream = None
+        self._stream_fed = 0           # ストリームに渡し済みのバイト数
+
+        # 統計
+        self.superseded_count = 0      # 新しい要求に置き換えられた要求数
+
+    def submit(self, audio_data, sample_rate, utterance_id, backend, language):
+        """
+        途中結果の認識を要求
+
+        Args:
+            audio_data: 発話の先頭から現在までの音声データ（bytes-like）
+            sample_rate: サンプリングレート
+            utterance_id: 発話ID（同じ発話では同じ値）
+            backend: RecognitionBackend
+            language: 言語コード
+        """
+        with self._condition:
+            if self._is_finished(utterance_id):
+                return
+            if not self._running:
+                self._start()
+            if self._request is not None:
+                self.superseded_count += 1
+            # 参照先（リングバッファ）が上書きされる前に処理できるとは限らないためコピーする
+            self._request = (bytes(audio_data), sample_rate, utterance_id, backend, language)
+            self._condition.notify()
+
+    def finish(self, utterance_id):
+        """
+        発話の確定を通知（以降、この発話とそれ以前の途中結果は出さない）
+
+        Args:
+            utterance_id: 確定した発話ID
+        """
+        with self._condition:
+            if not self._is_finished(utterance_id):
+                self._finished_through = utterance_id
+            if self._request is not None and self._is_finished(self._request[2]):
+                self._request = None
+
+    def stop(self, timeout=1.0):
+        """
+        認識スレッドを停止
+
+        Args:
+            timeout: スレッドの終了を待つ最大秒数
+        """
+        with self._condition:
+            if not self._running:
+                return
+            self._running = False
+            self._request = None
+            self._condition.notify_all()
+        self._thread.join(timeout)
+        self._thread = None
+
+    def _start(self):
+        """認識スレッドを開始（ロック取得済みで呼ぶ）"""
+        self._running = True
+        self._thread = threading.Thread(target=self._worker_loop, name="PartialRecognizer")
+        self._thread.daemon = True
+        self._thread.start()
+
+    def _is_finished(self, utterance_id):
+        """確定済みの発話か（ロック取得済みで呼ぶ）"""
+        return self._finished_through is not None and utterance_id <= self._finished_through
+
+    def _worker_loop(self):
+        """認識スレッドのメインループ"""
+        while True:
+            with self._condition:
+                while self._running and self._request is None:
+                    self._condition.wait()
+                if not self._running:
+                    return
+                request = self._request
+                self._request = None
+
+            audio_data, sample_rate, utterance_id, backend, language = request
+            try:
+                text = self._recognize(audio_data, sample_rate, utterance_id, backend, language)
+            except Exception:
+                # 途中結果の失敗は無視する（エラーは確定結果の認識で通知される）
+                text = None
+
+            with self._condition:
+                # 認識中に確定した発話の途中結果は捨てる
+                if not text or self._is_finished(utterance_id) or not self.on_partial:
+                    continue
+                self.on_partial(utterance_id, text)
+
+    def _recognize(self, audio_data, sample_rate, utterance_id, backend, language):
+        """
+        1回分の途中結果を認識
+
+        Returns:
+            str: 途中結果（結果がない場合はNone）
+        """
+        if backend.capabilities.streaming:
+            if self._stream_id != utterance_id or self._stream is None:
+                self._stream = backend.create_stream(sample_rate, language)
+                self._stream_id = utterance_id
+                self._stream_fed = 0
+            new_data = audio_data[self._stream_fed:]
+            self._stream_fed = len(audio_data)
+            return self._stream.accept(new_data) if new_data else None
+
+        window_bytes = int(self.window_sec * sample_rate) * 2
+        audio = sr.AudioData(audio_data[-window_bytes:], sample_rate, 2)
+        try:
+            return backend.recognize(audio, language)
+        except sr.UnknownValueError:
+            return None
@@ -0,0 +1,522 @@
+# -*- coding: utf-8 -*-
+"""
+asyncio による連続認識パイプラインを管理するモジュール
+
+録音チャンクの受け取り → 発話区間の検出 → 符号化 → 認識 → 結果の配信 の各段を
+1つのイベントループ上のコルーチンとし、段の間を上限付きの asyncio.Queue でつなぐ。
+認識は区間ごとのタスクとして並行させるため、多数の入力元・多数の同時リクエストを
+区間ごとのスレッドなしで扱える（同期 API しかないバックエンドはスレッドプールで呼ぶ）。
+"""
+
+import asyncio
+import threading
+import time
+
+import speech_recognition as sr
+
+from ..utils.config import Config
+from ..utils.tracing import tracer
+from .backends import create_backend
+from .codec import EncodedAudio
+from .noise_floor import NoiseFloorTracker
+from .overlap import OverlapStitcher
+from .recognizer import ResultKind
+from .resilience import CircuitBreaker, backoff_delay
+from .vad import VoiceActivityDetector
+
+_END = object()  # 入力の終わり（進行中の発話を確定させる）
+
+
+class _Job:
+    """認識する1区間（結果は録音順の配信待ちの Future に入る）"""
+
+    __slots__ = ('source', 'utterance_id', 'audio', 'trace', 'result')
+
+    def __init__(self, source, utterance_id, audio, trace, result):
+        self.source = source
+        self.utterance_id = utterance_id
+        self.audio = audio
+        self.trace = trace
+        self.result = result
+
+
+class PipelineStream:
+    """
+    1つの入力元の録音チャンクの受け口
+
+    feed は録音のコールバックから呼べるよう待たずに戻り、受け口のキューが満杯の場合は
+    チャンクを破棄して dropped_chunks に数える（録音側を止めない）。
+    """
+
+    def __init__(self, pipeline, source):
+        """
+        Args:
+            pipeline: RecognitionPipeline
+            source: 入力元の名前
+        """
+        self.pipeline = pipeline
+        self.source = source
+        # キューはイベントループのスレッドで作る（open_queues。Python 3.9 以前では
+        # 他のスレッドで作るとイベントループが見つからずエラーになる）
+        self.inbox = None     # (PCM, 受け取った時刻)
+        self.frames = None    # VAD へ渡すチャンク
+        self.ordered = None   # 録音順の配信待ち（件数は区間数の上限で抑える）
+        self.dropped_chunks = 0
+        self.position = 0               # 受け取った通算サンプル数
+        # 発話とみなす閾値は入力元ごとに環境ノイズから推定し続ける
+        self.noise_tracker = NoiseFloorTracker() if Config.VAD_ADAPTIVE_THRESHOLD else None
+        self.tasks = []
+
+    def feed(self, audio_data, block=False):
+        """
+        録音したPCMを渡す（スレッドセーフ）
+
+        Args:
+            audio_data: 16bit PCMの音声データ（bytes-like。呼び出し後に書き換えてよい）
+            block: 受け口が満杯の場合に破棄せず、空くまで呼び出し側を待たせるか
+                （音声ファイルの最速再生など、実時間でない入力元用）
+        """
+        # どちらもキューを作る _start_stream の後にイベントループで実行される
+        if block:
+            item = (bytes(audio_data), time.perf_counter())
+            asyncio.run_coroutine_threadsafe(self._put_waiting(item), self.pipeline._loop).result()
+            return
+        self.pipeline._loop.call_soon_threadsafe(self._put, bytes(audio_data), time.perf_counter())
+
+    def end(self):
+        """入力の終わりを伝え、進行中の発話を確定させる（スレッドセーフ）"""
+        self.pipeline._loop.call_soon_threadsafe(self._put, _END, None)
+
+    def open_queues(self):
+        """受け口から配信までのキューを作る（イベントループのスレッド）"""
+        self.inbox = asyncio.Queue(maxsize=Config.PIPELINE_CAPTURE_QUEUE)
+        self.frames = asyncio.Queue(maxsize=Config.PIPELINE_QUEUE_SIZE)
+        self.ordered = asyncio.Queue()
+
+    async def _put_waiting(self, item):
+        """受け口のキューが空くのを待って入れる（イベントループのスレッド）"""
+        await self.inbox.put(item)
+
+    def _put(self, data, arrived_at):
+        """受け口のキューに入れる（イベントループのスレッド）"""
+        try:
+            self.inbox.put_nowait((data, arrived_at))
+        except asyncio.QueueFull:
+            if data is _END:
+                # 終わりの印は破棄せず、空くのを待って入れる
+                self.pipeline._spawn(self.inbox.put((data, arrived_at)))
+            else:
+                self.dropped_chunks += 1
+
+
+class RecognitionPipeline:
+    """
+    連続認識をイベントループ1つで行うクラス
+
+    専用スレッドでイベントループを動かし、入力元ごとに受け取り・区間検出・配信の
+    コルーチンを、全体で符号化（Config.PIPELINE_ENCODERS 個）と認識の振り分けの
+    コルーチンを動かす。配信前の区間数は Config.PIPELINE_MAX_IN_FLIGHT までに抑え、
+    超えた場合は区間検出の段が待つ（受け口のキューがあふれた分は破棄する）。
+    結果は入力元ごとに録音順に、重ねて区切った区間の重複を除いてから、
+    subscribe した関数へ SpeechRecognizer.on_recognition_result と同じ形で渡す。
+    バックエンドの遮断中は認識を待たせ、回復してから送る。
+    """
+
+    def __init__(self, backend=None, language=None, sample_rate=None, max_in_flight=None):
+        """
+        Args:
+            backend: 認識バックエンド（省略時は Config.RECOGNITION_BACKEND から生成）
+            language: 認識言語、または現在の認識言語を返す関数（区間ごとに呼び出す。
+                省略時は Config.RECOGNITION_LANGUAGE）
+            sample_rate: 入力のサンプリングレート（省略時は Config.SAMPLE_RATE）
+            max_in_flight: 認識中・配信待ちの区間数の上限
+        """
+        self.backend = backend or create_backend()
+        self.language = language or Config.RECOGNITION_LANGUAGE
+        self.sample_rate = sample_rate or Config.SAMPLE_RATE
+        self.max_in_flight = max_in_flight or Config.PIPELINE_MAX_IN_FLIGHT
+
+        self.breaker = CircuitBreaker(on_state_change=lambda state: self._notify_backend_status())
+        self.stitcher = OverlapStitcher(self._publish)
+        self._subscribers = []
+        self._streams = {}
+        self._streams_lock = threading.Lock()
+
+        # コールバック関数
+        self.on_error = None           # エラー発生時のコールバック
+        self.on_backend_status = None  # バックエンドの状態変化時のコールバック
+
+        # 統計
+        self.segment_count = 0
+        self.published_count = 0
+        self.active_requests = 0       # バックエンドを呼び出し中の区間数
+        self.peak_requests = 0
+        self.waiting_count = 0         # 遮断の回復を待っている区間数
+
+        self._loop = None
+        self._thread = None
+        self._tasks = set()
+
+    def set_callbacks(self, on_error=None, on_backend_status=None):
+        """
+        コールバック関数を設定
+
+        Args:
+            on_error: エラー発生時に呼ばれる関数 (メッセージ)
+            on_backend_status: バックエンドの状態変化時に呼ばれる関数
+                (BreakerState, 回復待ちの区間数)
+        """
+        self.on_error = on_error
+        self.on_backend_status = on_backend_status
+
+    def subscribe(self, callback):
+        """
+        認識結果を受け取る関数を登録
+
+        関数はイベントループのスレッドから呼ばれるため、時間のかかる処理や
+        UIの更新は呼び出し側のスレッドへ渡して行う。
+
+        Args:
+            callback: (テキスト, trace=遅延計測のトレース, kind=ResultKind, utterance_id=発話ID,
+                source=入力元の名前) を受け取る関数
+
+        Returns:
+            callable: 登録を解除する関数
+        """
+        self._subscribers.append(callback)
+
+        def unsubscribe():
+            if callback in self._subscribers:
+                self._subscribers.remove(callback)
+        return unsubscribe
+
+    @property
+    def running(self):
+        """イベントループが動いているか"""
+        return self._thread is not None
+
+    def current_language(self):
+        """現在の認識言語（language に関数を渡した場合は呼び出した結果）"""
+        return self.language() if callable(self.language) else self.language
+
+    def start(self):
+        """イベントループのスレッドを開始"""
+        if self._thread is not None:
+            return
+        self._loop = asyncio.new_event_loop()
+        ready = threading.Event()
+        self._thread = threading.Thread(target=self._run, args=(ready,), name="RecognitionPipeline")
+        self._thread.daemon = True
+        self._thread.start()
+        ready.wait()
+
+    def stream(self, source=None):
+        """
+        入力元の受け口を取得（初めての入力元は受け口と処理のコルーチンを作る）
+
+        Args:
+            source: 入力元の名前
+
+        Returns:
+            PipelineStream
+        """
+        with self._streams_lock:
+            stream = self._streams.get(source)
+            if stream is None:
+                stream = PipelineStream(self, source)
+                self._streams[source] = stream
+                self._loop.call_soon_threadsafe(self._start_stream, stream)
+            return stream
+
+    def feed(self, audio_data, source=None, block=False):
+        """
+        録音したPCMを渡す（スレッドセーフ。AudioRecorder の on_captured_audio に使える）
+
+        Args:
+            audio_data: 16bit PCMの音声データ
+            source: 入力元の名前
+            block: 受け口が満杯の場合に空くまで待つか（PipelineStream.feed）
+        """
+        self.stream(source).feed(audio_data, block)
+
+    def end_streams(self):
+        """すべての入力元の進行中の発話を確定させる（録音停止時に呼ぶ）"""
+        with self._streams_lock:
+            streams = list(self._streams.values())
+        for stream in streams:
+            stream.end()
+
+    def drain(self, timeout=None):
+        """
+        受け取った音声の認識と配信が済むまで待つ（スレッドセーフ）
+
+        Args:
+            timeout: 待つ秒数の上限
+
+        Returns:
+            bool: 済んだ場合True
+        """
+        if self._thread is None:
+            return True
+        future = asyncio.run_coroutine_threadsafe(self._drain(), self._loop)
+        try:
+            future.result(timeout)
+            return True
+        except Exception:
+            future.cancel()
+            return False
+
+    def stop(self, timeout=5.0):
+        """
+        進行中の発話を確定させ、配信が済むまで（最大 timeout 秒）待ってから停止
+
+        Args:
+            timeout: 配信を待つ秒数の上限
+        """
+        if self._thread is None:
+            return
+        self.end_streams()
+        self.drain(timeout)
+        self._loop.call_soon_threadsafe(self._stopping.set)
+        self._thread.join(timeout)
+        self._thread = None
+        with self._streams_lock:
+            self._streams.clear()
+
+    def stats(self):
+        """
+        処理状況を取得
+
+        Returns:
+            dict: 入力元数・区間数・配信数・破棄したチャンク数・呼び出し中と最大の同時リクエスト数
+        """
+        with self._streams_lock:
+            streams = list(self._streams.values())
+        return {
+            'streams': len(streams),
+            'segments': self.segment_count,
+            'published': self.published_count,
+            'dropped_chunks': sum(stream.dropped_chunks for stream in streams),
+            'active_requests': self.active_requests,
+            'peak_requests': self.peak_requests,
+        }
+
+    def _run(self, ready):
+        """イベントループのスレッド"""
+        asyncio.set_event_loop(self._loop)
+        try:
+            self._loop.run_until_complete(self._main(ready))
+        finally:
+            self._loop.close()
+
+    async def _main(self, ready):
+        """共通の段を開始し、停止を待ってから後始末"""
+        self._stopping = asyncio.Event()
+        self._slots = asyncio.Semaphore(self.max_in_flight)
+        self._encode_queue = asyncio.Queue(maxsize=Config.PIPELINE_QUEUE_SIZE)
+        self._recognize_queue = asyncio.Queue(maxsize=Config.PIPELINE_QUEUE_SIZE)
+        for _ in range(Config.PIPELINE_ENCODERS):
+            self._spawn(self._encode_stage())
+        self._spawn(self._recognize_stage())
+        ready.set()
+
+        await self._stopping.wait()
+        tasks = list(self._tasks)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self.stitcher.flush()
+        await self.backend.close_async()
+
+    def _spawn(self, coroutine):
+        """停止時に取り消すタスクとして開始"""
+        task = self._loop.create_task(coroutine)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    def _start_stream(self, stream):
+        """入力元のキューを作り、入力元ごとの段を開始（イベントループのスレッド）"""
+        stream.open_queues()
+        stream.tasks = [
+            self._spawn(self._capture_stage(stream)),
+            self._spawn(self._segment_stage(stream)),
+            self._spawn(self._publish_stage(stream)),
+        ]
+
+    async def _drain(self):
+        """受け口から配信までのキューが空になるまで待つ"""
+        with self._streams_lock:
+            streams = list(self._streams.values())
+        for stream in streams:
+            if stream.inbox is None:
+                continue
+            await stream.inbox.join()
+            await stream.frames.join()
+            await stream.ordered.join()
+
+    async def _capture_stage(self, stream):
+        """受け取ったチャンクの位置を数え、区間検出の段へ渡す（満杯なら待つ）"""
+        while True:
+            data, arrived_at = await stream.inbox.get()
+            if data is not _END:
+                stream.position += len(data) // 2
+            await stream.frames.put((data, arrived_at))
+            stream.inbox.task_done()
+
+    async def _segment_stage(self, stream):
+        """VAD で発話区間を切り出し、区間ごとに認識の段へ渡す"""
+        vad = VoiceActivityDetector(self.sample_rate, noise_tracker=stream.noise_tracker)
+        pending = bytearray()   # retain_from 以降の音声
+        pending_start = 0       # pending の先頭の通算サンプル位置
+        while True:
+            data, arrived_at = await stream.frames.get()
+            if data is _END:
+                segment = vad.flush()
+                segments = [segment] if segment else []
+            else:
+                pending += data
+                segments = vad.process(data)
+
+            for segment in segments:
+                audio = bytes(pending[(segment.start - pending_start) * 2:(segment.end - pending_start) * 2])
+                await self._submit(stream, segment, audio, arrived_at)
+
+            # 今後の区間に含まれない音声は捨てる
+            drop = vad.retain_from - pending_start
+            if drop > 0:
+                del pending[:drop * 2]
+                pending_start += drop
+            stream.frames.task_done()
+
+    async def _submit(self, stream, segment, audio, arrived_at):
+        """区間を符号化の段へ渡し、録音順の配信待ちに並べる"""
+        # 配信前の区間数が上限に達している間は待つ（前の段へ背圧をかける）
+        await self._slots.acquire()
+
+        trace = None
+        if tracer.enabled:
+            trace = tracer.start(timestamp=arrived_at)
+            trace.mark('segmented')
+
+        self.segment_count += 1
+        self.stitcher.register(stream.source, segment.start, segment.end - segment.start,
+                               segment.overlap, segment.continued)
+        job = _Job(stream.source, segment.start, EncodedAudio(audio, self.sample_rate, 2),
+                   trace, self._loop.create_future())
+        stream.ordered.put_nowait(job)
+        await self._encode_queue.put(job)
+
+    async def _encode_stage(self):
+        """送信形式に符号化（スレッドプールで実行し、結果は区間に保持される）"""
+        codec = getattr(self.backend, 'codec', None)
+        while True:
+            job = await self._encode_queue.get()
+            if codec:
+                try:
+                    await self._loop.run_in_executor(None, job.audio.encoded, codec)
+                except (OSError, ValueError):
+                    pass  # 送信時に改めて符号化し、失敗すれば認識エラーとして扱う
+            await self._recognize_queue.put(job)
+
+    async def _recognize_stage(self):
+        """区間ごとに認識のタスクを開始（同時に動くタスク数は区間数の上限で抑えられる）"""
+        while True:
+            job = await self._recognize_queue.get()
+            self._spawn(self._recognize(job))
+
+    async def _recognize(self, job):
+        """1区間を認識し、結果を配信待ちの Future に入れる"""
+        if job.trace:
+            job.trace.mark('dequeued')
+        text = None
+        try:
+            text = await self._recognize_with_retry(job.audio)
+        except sr.UnknownValueError:
+            # 認識できない音声は無視（連続認識時は正常な動作）
+            pass
+        except sr.RequestError as e:
+            self._report(f"音声認識サービスエラー: {str(e)}")
+        except Exception as e:
+            self._report(f"音声データ認識エラー: {str(e)}")
+        if job.trace:
+            job.trace.mark('recognized')
+        if not job.result.done():
+            job.result.set_result(text)
+
+    async def _recognize_with_retry(self, audio):
+        """遮断中は回復を待ち、sr.RequestError の場合はバックオフして再試行"""
+        deadline = self._loop.time() + Config.BACKEND_DEADLINE
+        attempt = 0
+        while True:
+            if not self.breaker.allow():
+                self.waiting_count += 1
+                self._notify_backend_status()
+                try:
+                    while not self.breaker.allow():
+                        await asyncio.sleep(0.5)
+                finally:
+                    self.waiting_count -= 1
+                    self._notify_backend_status()
+                deadline = self._loop.time() + Config.BACKEND_DEADLINE
+
+            self.active_requests += 1
+            self.peak_requests = max(self.peak_requests, self.active_requests)
+            try:
+                text = await self.backend.recognize_async(audio, self.current_language())
+                self.breaker.record_success()
+                return text
+            except sr.UnknownValueError:
+                self.breaker.record_success()
+                raise
+            except sr.RequestError:
+                self.breaker.record_failure()
+                delay = backoff_delay(attempt)
+                if attempt >= Config.BACKEND_RETRIES or self._loop.time() + delay > deadline:
+                    raise
+            except BaseException:
+                # 認識以外のエラーや停止による中断では、回復確認の試行を次の呼び出しに譲る
+                self.breaker.release()
+                raise
+            finally:
+                self.active_requests -= 1
+            attempt += 1
+            await asyncio.sleep(delay)
+
+    async def _publish_stage(self, stream):
+        """入力元ごとに録音順に結果を待ち、重複を除いて配信"""
+        while True:
+            job = await stream.ordered.get()
+            try:
+                text = await job.result
+                if job.trace:
+                    job.trace.mark('ordered')
+                self.stitcher.complete(job.source, job.utterance_id, (text, job.trace))
+            finally:
+                self._slots.release()
+                stream.ordered.task_done()
+
+    def _publish(self, source, utterance_id, result):
+        """登録された関数へ確定結果を渡す"""
+        text, trace = result
+        self.published_count += 1
+        for callback in list(self._subscribers):
+            try:
+                if text:
+                    callback(text, trace=trace, kind=ResultKind.FINAL,
+                             utterance_id=utterance_id, source=source)
+                else:
+                    # 結果がなくても途中結果を取り消せるよう空の確定結果を渡す
+                    callback('', kind=ResultKind.FINAL, utterance_id=utterance_id, source=source)
+            except Exception as e:
+                self._report(f"認識結果の配信エラー: {str(e)}")
+
+    def _report(self, message):
+        """エラーを通知"""
+        if self.on_error:
+            self.on_error(message)
+
+    def _notify_backend_status(self):
+        """バックエンドの状態と回復待ちの区間数を通知"""
+        if self.on_backend_status:
+            self.on_backend_status(self.breaker.state, self.waiting_count)
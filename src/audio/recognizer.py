@@ -4,52 +4,223 @@
 """
 
 import speech_recognition as sr
-import io
-import wave
+import sys
 import threading
+import time
+from collections import deque
 from ..utils.config import Config
+from .backends import create_backend
+from .cache import RecognitionCache
+from .calibration import EnergyThresholdStore
+from .codec import EncodedAudio
+from .merger import ResultMerger
+from .overlap import OverlapStitcher
+from .partial import PartialRecognizer
+from .resilience import BreakerState, CircuitBreaker, backoff_delay, call_with_retry
+from .scheduler import RecognitionScheduler
+from .spool import AudioSpool
+
+class ResultKind:
+    """認識結果の種類"""
+    
+    INTERIM = 'interim'  # 発話途中の結果（同じ発話IDの後続の結果で置き換える）
+    FINAL = 'final'      # 発話の確定結果（空文字列は「結果なし」として途中結果を取り消す）
 
 class SpeechRecognizer:
     """音声認識を管理するクラス"""
     
-    def __init__(self):
+    def __init__(self, use_microphone=True, overflow_policy=None):
+        """
+        Args:
+            use_microphone: 一回認識用のマイクを初期化するか
+                （連続認識のみで使う場合はFalseにして環境音の調整を省く）
+            overflow_policy: 認識待ちが満杯のときの動作（OverflowPolicy。省略時は
+                Config.RECOGNITION_OVERFLOW_POLICY）
+        """
         self.recognizer = sr.Recognizer()
         self.microphone = None
         
+        # 環境音キャリブレーションの状態（デバイスごとの閾値を保存して再利用）
+        self.threshold_store = EnergyThresholdStore()
+        self.device_key = None
+        self.calibrated = threading.Event()
+        self._microphone_lock = threading.Lock()
+        self._microphone_failed = False
+        # 録音側と共有する環境ノイズの推定（連続録音中に更新される閾値）
+        self.noise_tracker = None
+        
         # コールバック関数
         self.on_recognition_result = None  # 認識結果受信時のコールバック
         self.on_error = None               # エラー発生時のコールバック
         self.on_listening = None           # 音声待機開始時のコールバック
+        self.on_backend_status = None      # バックエンドの状態変化時のコールバック
         
         # 認識設定
         self.language = Config.RECOGNITION_LANGUAGE
+        self.backend = create_backend()
+        self.cache = RecognitionCache() if Config.RECOGNITION_CACHE_ENABLED else None
+        
+        # 連続認識用のワーカープール（チャンクごとのスレッド生成を避ける）
+        self.overflow_policy = overflow_policy
+        self.scheduler = RecognitionScheduler(
+            self._recognize_chunk,
+            on_result=self._on_scheduled_result,
+            overflow_policy=overflow_policy,
+            on_drop=self._confirm_spooled
+        )
+        # 複数デバイス録音時は入力元ごとに専用のワーカープール（レーン）を使い、
+        # 1台の発話が詰まっても他の入力元の認識・順序待ちを止めない
+        self.lanes = {}
+        self._lanes_lock = threading.Lock()
+        self.merger = None  # 複数チャンネルの結果を録音順に合流させる場合のみ
+        # 重ねて区切った区間の結果は重複を除いてから通知する
+        self.stitcher = OverlapStitcher(self._deliver_final)
+        
+        # 発話途中の結果（連続認識時）
+        self.partial_recognizer = PartialRecognizer(on_partial=self._on_partial_result)
+        
+        # バックエンド障害時は区間を保留し、回復後に認識する
+        self.breaker = CircuitBreaker(on_state_change=lambda state: self._notify_backend_status())
+        self.parked = deque()
+        self.parked_dropped_count = 0
+        self._parked_lock = threading.Lock()
+        self._drain_thread = None
+        self._stop_event = threading.Event()
+        
+        # 認識前の区間をディスクに退避（異常終了・障害時も次回起動時に再認識できる）
+        self.spool = self._open_spool() if Config.SPOOL_ENABLED else None
         
         # マイクロフォンの初期化
-        self._initialize_microphone()
+        if use_microphone:
+            self._initialize_microphone()
+    
+    def _open_spool(self):
+        """音声スプールを開く（開けない・別のプロセスが使用中の場合は退避せずに続行）"""
+        spool = AudioSpool()
+        try:
+            spool.open()
+        except OSError as e:
+            print(f"音声スプールを開けません: {e}", file=sys.stderr)
+            return None
+        return spool
     
     def _initialize_microphone(self):
-        """マイクロフォンを初期化"""
+        """
+        マイクロフォンを初期化
+        
+        環境音の調整は起動を待たせないようバックグラウンドで行う。
+        """
         try:
             self.microphone = sr.Microphone()
-            # 環境音に合わせてマイクを調整
-            with self.microphone as source:
-                self.recognizer.adjust_for_ambient_noise(source, duration=1)
         except Exception as e:
+            self._microphone_failed = True
+            self.calibrated.set()
             if self.on_error:
                 self.on_error(f"マイク初期化エラー: {str(e)}")
+            return
+        
+        thread = threading.Thread(target=self._calibrate_in_background)
+        thread.daemon = True
+        thread.start()
+    
+    def _calibrate_in_background(self):
+        """保存済みの閾値を適用し、古い場合のみ環境音を測り直す"""
+        try:
+            self.device_key = self._get_device_key()
+            entry = self.threshold_store.get(self.device_key)
+            if entry:
+                self.recognizer.energy_threshold = entry['threshold']
+                self._seed_noise_tracker(entry['threshold'], override=False)
+                self.calibrated.set()
+            
+            if EnergyThresholdStore.is_stale(entry):
+                self.calibrate()
+        except Exception as e:
+            self._microphone_failed = True
+            if self.on_error:
+                self.on_error(f"マイク初期化エラー: {str(e)}")
+        finally:
+            self.calibrated.set()
+    
+    def _get_device_key(self):
+        """既定の入力デバイスを識別する文字列を取得"""
+        audio = self.microphone.pyaudio_module.PyAudio()
+        try:
+            device_info = audio.get_default_input_device_info()
+            return f"{device_info['name']}|{self.microphone.SAMPLE_RATE}"
+        finally:
+            audio.terminate()
+    
+    def calibrate(self, duration=None):
+        """
+        環境音に合わせてエネルギー閾値を調整し、結果を保存
+        
+        Args:
+            duration: 環境音を測る秒数（省略時は Config.CALIBRATION_DURATION）
+        """
+        with self._microphone_lock:
+            with self.microphone as source:
+                self.recognizer.adjust_for_ambient_noise(
+                    source, duration=duration or Config.CALIBRATION_DURATION
+                )
+        self._microphone_failed = False
+        self._seed_noise_tracker(self.recognizer.energy_threshold)
+        if self.device_key:
+            self.threshold_store.put(self.device_key, self.recognizer.energy_threshold)
+    
+    def set_noise_tracker(self, tracker):
+        """
+        録音側（VAD）の環境ノイズの推定を共有
+        
+        一回認識では録音開始時の閾値に推定中の閾値を使い、環境音の調整結果は
+        推定の初期値として渡す。
+        
+        Args:
+            tracker: NoiseFloorTracker（Noneは共有しない）
+        """
+        self.noise_tracker = tracker
+        if tracker is not None and self.calibrated.is_set() and self.microphone is not None:
+            self._seed_noise_tracker(self.recognizer.energy_threshold, override=False)
     
-    def set_callbacks(self, on_recognition_result=None, on_error=None, on_listening=None):
+    def _seed_noise_tracker(self, threshold, override=True):
+        """
+        環境音の調整結果を推定に反映
+        
+        Args:
+            threshold: 調整したエネルギー閾値
+            override: 録音中に推定を始めていても上書きするか（保存値は古いため上書きしない）
+        """
+        tracker = self.noise_tracker
+        if tracker is not None and (override or not tracker.update_count):
+            tracker.seed(threshold)
+    
+    def _save_threshold_if_drifted(self):
+        """認識中に動的調整された閾値が保存値から大きくずれていれば保存し直す"""
+        if not self.device_key:
+            return
+        entry = self.threshold_store.get(self.device_key)
+        threshold = self.recognizer.energy_threshold
+        if EnergyThresholdStore.has_drifted(entry, threshold):
+            self.threshold_store.put(self.device_key, threshold)
+    
+    def set_callbacks(self, on_recognition_result=None, on_error=None, on_listening=None,
+                      on_backend_status=None):
         """
         コールバック関数を設定
         
         Args:
             on_recognition_result: 認識結果受信時に呼ばれる関数
+                (テキスト, trace=遅延計測のトレース, kind=ResultKind, utterance_id=発話ID,
+                source=入力元の名前)（一回認識ではテキストのみ、途中結果では source なし）
             on_error: エラー発生時に呼ばれる関数
             on_listening: 音声待機開始時に呼ばれる関数
+            on_backend_status: バックエンドの状態・保留数が変わったときに呼ばれる関数
+                (BreakerState, 保留中の区間数)
         """
         self.on_recognition_result = on_recognition_result
         self.on_error = on_error
         self.on_listening = on_listening
+        self.on_backend_status = on_backend_status
     
     def recognize_from_microphone_once(self):
         """
@@ -57,22 +228,29 @@ class SpeechRecognizer:
         """
         def _recognize():
             try:
+                # 初回起動で保存済みの閾値がない場合のみ調整の完了を待つ
+                self.calibrated.wait(Config.CALIBRATION_DURATION + 1)
+                
                 if self.on_listening:
                     self.on_listening()
                 
-                with self.microphone as source:
-                    # 音声を録音
-                    audio_data = self.recognizer.listen(
-                        source, 
-                        timeout=Config.RECOGNITION_TIMEOUT,
-                        phrase_time_limit=Config.PHRASE_TIME_LIMIT
-                    )
+                if self.noise_tracker is not None and self.noise_tracker.update_count:
+                    # 連続録音で推定している現在の環境ノイズに合わせる
+                    self.recognizer.energy_threshold = self.noise_tracker.threshold
                 
-                # Google音声認識を実行
-                text = self.recognizer.recognize_google(
-                    audio_data, 
-                    language=self.language
-                )
+                with self._microphone_lock:
+                    with self.microphone as source:
+                        # 音声を録音
+                        audio_data = self.recognizer.listen(
+                            source, 
+                            timeout=Config.RECOGNITION_TIMEOUT,
+                            phrase_time_limit=Config.PHRASE_TIME_LIMIT
+                        )
+                self._save_threshold_if_drifted()
+                
+                # 音声認識を実行（再試行時は符号化結果を使い回す）
+                audio_data = EncodedAudio.wrap(audio_data)
+                text = call_with_retry(lambda: self._recognize_audio(audio_data))
                 
                 if self.on_recognition_result:
                     self.on_recognition_result(text)
@@ -95,53 +273,375 @@ class SpeechRecognizer:
         thread.daemon = True
         thread.start()
     
-    def recognize_from_audio_data(self, audio_data, sample_rate=44100):
+    def recognize_from_audio_data(self, audio_data, sample_rate=None, trace=None, utterance_id=None,
+                                  source=None, overlap=0, continued=False):
         """
         音声データから直接認識を実行
         
+        チャンクはスプールに退避してから認識スケジューラーの待機キューに投入され、
+        結果は入力元ごとに録音順で on_recognition_result へ渡される。
+        
         Args:
-            audio_data: 音声データ（バイト列）
-            sample_rate: サンプリングレート
+            audio_data: 音声データ（bytes-like。リングバッファのmemoryviewも可）
+            sample_rate: サンプリングレート（省略時は Config.SAMPLE_RATE）
+            trace: 遅延計測のトレース（計測しない場合はNone）
+            utterance_id: 発話ID（途中結果を出していた場合、確定結果で置き換える）
+            source: 入力元の名前（指定時は入力元ごとのレーンで認識し、結果に付けて返す）
+            overlap: 前の区間の末尾と重なる先頭のサンプル数（結果の重複を除く）
+            continued: 続きの区間を重ねて始めたか（続きの結果が届くまで結果を保持する）
         """
-        def _recognize():
-            try:
-                # 音声データをWAVフォーマットに変換
-                audio_io = io.BytesIO()
-                with wave.open(audio_io, 'wb') as wav_file:
-                    wav_file.setnchannels(1)  # モノラル
-                    wav_file.setsampwidth(2)  # 16bit
-                    wav_file.setframerate(sample_rate)
-                    wav_file.writeframes(audio_data)
-                
-                audio_io.seek(0)
-                
-                # AudioFileとして読み込み
-                with sr.AudioFile(audio_io) as source:
-                    audio = self.recognizer.record(source)
-                
-                # Google音声認識を実行
-                text = self.recognizer.recognize_google(
-                    audio, 
-                    language=self.language
+        sample_rate = sample_rate or Config.SAMPLE_RATE
+        if utterance_id is not None:
+            self.partial_recognizer.finish(utterance_id)
+        spool_ids = None
+        if self.spool is not None:
+            spool_id = self.spool.append(audio_data, sample_rate)
+            spool_ids = [spool_id] if spool_id is not None else None
+        merger = self.merger
+        if merger is not None and utterance_id is not None and merger.handles(source):
+            merger.register(source, utterance_id)
+        if utterance_id is not None:
+            length = memoryview(audio_data).nbytes // 2  # 16bit
+            self.stitcher.register(source, utterance_id, length, overlap, continued)
+        self.lane(source).submit(audio_data, sample_rate, trace, utterance_id, spool_ids)
+    
+    def set_merged_sources(self, sources):
+        """
+        入力元ごとのレーンの結果を録音順に合流させる
+        
+        複数チャンネル録音では、チャンネルごとに並列に認識した結果を区間の投入順
+        （発話の開始順）に並べ直して on_recognition_result へ渡す。
+        
+        Args:
+            sources: 合流させる入力元の名前のリスト（空の場合は合流しない）
+        """
+        if not sources:
+            self.merger = None
+            return
+        self.merger = ResultMerger(
+            sources,
+            lambda source, utterance_id, result: self._emit_final(*result, utterance_id, source)
+        )
+    
+    def lane(self, source=None):
+        """
+        入力元の認識スケジューラーを取得（初回に生成）
+        
+        Args:
+            source: 入力元の名前（Noneは既定の scheduler）
+        
+        Returns:
+            RecognitionScheduler
+        """
+        if source is None:
+            return self.scheduler
+        with self._lanes_lock:
+            if source not in self.lanes:
+                self.lanes[source] = RecognitionScheduler(
+                    lambda audio_data, sample_rate, spool_ids: self._recognize_chunk(
+                        audio_data, sample_rate, spool_ids, source),
+                    on_result=lambda seq, text, trace, utterance_id: self._on_scheduled_result(
+                        seq, text, trace, utterance_id, source),
+                    overflow_policy=self.overflow_policy,
+                    on_drop=self._confirm_spooled
                 )
+            return self.lanes[source]
+    
+    def lane_stats(self):
+        """
+        入力元ごとの認識待ち・破棄の件数を取得
+        
+        Returns:
+            dict: 入力元の名前 -> {'pending', 'dropped', 'coalesced'}
+        """
+        with self._lanes_lock:
+            lanes = dict(self.lanes)
+        return {
+            source: {
+                'pending': scheduler.pending_count(),
+                'dropped': scheduler.dropped_count,
+                'coalesced': scheduler.coalesced_count,
+            }
+            for source, scheduler in lanes.items()
+        }
+    
+    def drain(self, timeout=None):
+        """
+        投入済みの区間の認識と結果の通知が済むまで待つ
+        
+        音声ファイルの再生など終わりのある入力を最後まで認識してから終了する場合に使う
+        （接続の遮断中に保留された区間は待たない）。
+        
+        Args:
+            timeout: 待つ秒数の上限
+        
+        Returns:
+            bool: 済んだ場合True
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self._lanes_lock:
+                schedulers = [self.scheduler] + list(self.lanes.values())
+            if all(scheduler.is_idle() for scheduler in schedulers):
+                return True
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            time.sleep(0.02)
+    
+    def replay_spool(self):
+        """
+        前回までに認識結果が出なかったスプールの区間をバックグラウンドで再認識
+        
+        結果は後から届いた分として kind=ResultKind.FINAL（発話IDなし）で通知される。
+        録音中の区間を妨げないよう、待機キューが半分以上埋まっている間は投入を待つ。
+        """
+        if self.spool is None:
+            return
+        # 呼び出し時点の未完了区間のみ（以降に録音した区間は通常どおり認識される）
+        spool_ids = self.spool.pending_ids()
+        if not spool_ids:
+            return
+        thread = threading.Thread(target=self._replay_spool, args=(spool_ids,), name="SpoolReplay")
+        thread.daemon = True
+        thread.start()
+    
+    def _replay_spool(self, spool_ids):
+        """スプールの未完了区間を古い順に認識キューへ投入"""
+        for spool_id in spool_ids:
+            while self.scheduler.pending_count() >= self.scheduler.max_pending // 2:
+                if self._stop_event.wait(0.1):
+                    return
+            if self._stop_event.is_set():
+                return
+            segment = self.spool.read(spool_id)
+            if segment is None:
+                continue
+            audio_data, sample_rate = segment
+            self.scheduler.submit(audio_data, sample_rate, spool_ids=[spool_id])
+    
+    def recognize_partial(self, audio_data, sample_rate=None, utterance_id=None):
+        """
+        進行中の発話から途中結果を認識
+        
+        結果は kind=ResultKind.INTERIM として on_recognition_result へ渡される。
+        処理が追いつかない場合は最新の要求のみ認識する。
+        
+        Args:
+            audio_data: 発話の先頭から現在までの音声データ（bytes-like）
+            sample_rate: サンプリングレート（省略時は Config.SAMPLE_RATE）
+            utterance_id: 発話ID
+        """
+        if self.breaker.state != BreakerState.CLOSED:
+            # 障害中は確定結果の認識を優先する
+            return
+        self.partial_recognizer.submit(
+            audio_data, sample_rate or Config.SAMPLE_RATE, utterance_id,
+            self.backend, self.language
+        )
+    
+    def _recognize_chunk(self, audio_data, sample_rate, spool_ids=None, source=None):
+        """
+        1チャンクの音声データを認識（ワーカースレッドから呼ばれる）
+        
+        結果が出た（認識できないと判定された場合も含む）区間はスプールで完了とし、
+        保留した区間は保留分の認識が済むまでスプールに残す。
+        
+        Args:
+            audio_data: 音声データ（bytes-like。memoryviewも可）
+            sample_rate: サンプリングレート
+            spool_ids: チャンクを退避したスプールの区間IDのリスト
+            source: 入力元の名前（保留した場合、保留分の結果に付ける）
+            
+        Returns:
+            str: 認識結果（認識できなかった・保留した場合はNone）
+        """
+        # リングバッファのスライスをそのまま包む（WAVへの変換と再読込のコピーを省く）
+        # 符号化は最初の送信時に1回だけ行い、再試行・保留後の再送で使い回す
+        audio = EncodedAudio(audio_data, sample_rate, 2)  # 16bit モノラル
+        
+        if not self.breaker.allow():
+            # バックエンドの遮断中は呼び出さずに保留
+            self._park(audio, spool_ids, source)
+            return None
+        
+        # 回復確認の試行は1回だけ
+        retries = None if self.breaker.state == BreakerState.CLOSED else 0
+        try:
+            # 音声認識を実行
+            text = call_with_retry(lambda: self._recognize_audio(audio), retries=retries)
+            self.breaker.record_success()
+            self._confirm_spooled(spool_ids)
+            return text
                 
-                if self.on_recognition_result:
-                    self.on_recognition_result(text)
-                    
+        except sr.UnknownValueError:
+            # 認識できない音声は無視（連続認識時は正常な動作）
+            self.breaker.record_success()
+        except sr.RequestError as e:
+            self.breaker.record_failure()
+            self._park(audio, spool_ids, source)
+            if self.on_error:
+                self.on_error(f"音声認識サービスエラー: {str(e)}（{len(self.parked)}件を保留中）")
+            return None
+        except Exception as e:
+            # 回復確認の試行だった場合も、次の区間で確認できるようにする
+            self.breaker.release()
+            if self.on_error:
+                self.on_error(f"音声データ認識エラー: {str(e)}")
+        
+        # 再認識しても同じ結果になる区間は次回起動時に繰り返さない
+        self._confirm_spooled(spool_ids)
+        return None
+    
+    def _confirm_spooled(self, spool_ids):
+        """スプールの区間を認識済みにする（混雑で破棄した区間も次回起動時に再認識しない）"""
+        if self.spool is None or not spool_ids:
+            return
+        for spool_id in spool_ids:
+            self.spool.confirm(spool_id)
+    
+    def _park(self, audio, spool_ids=None, source=None):
+        """
+        認識できなかった区間を保留し、回復待ちのスレッドを開始
+        
+        保留の上限を超えて破棄した区間もスプールには残り、次回起動時に再認識される。
+        
+        Args:
+            audio: EncodedAudio（リングバッファは上書きされるためコピーして保持）
+            spool_ids: 区間を退避したスプールの区間IDのリスト
+            source: 入力元の名前
+        """
+        # 認識を試みている間にリングが一周していることがあるため、スプールに
+        # 退避済みの区間は投入時点の写しから読み直す
+        audio = audio.detach(self._read_spooled(spool_ids))
+        with self._parked_lock:
+            if len(self.parked) >= Config.PARKED_SEGMENTS_MAX:
+                self.parked.popleft()
+                self.parked_dropped_count += 1
+            self.parked.append((audio, spool_ids, source))
+            
+            if self._drain_thread is None:
+                self._drain_thread = threading.Thread(target=self._drain_parked, name="ParkedDrain")
+                self._drain_thread.daemon = True
+                self._drain_thread.start()
+        self._notify_backend_status()
+    
+    def _read_spooled(self, spool_ids):
+        """
+        スプールに退避した区間の音声を読み込み
+        
+        Args:
+            spool_ids: 区間を退避したスプールの区間IDのリスト
+        
+        Returns:
+            bytes: 連結した音声データ（スプールがない・読めない区間がある場合はNone）
+        """
+        if self.spool is None or not spool_ids:
+            return None
+        chunks = []
+        for spool_id in spool_ids:
+            entry = self.spool.read(spool_id)
+            if entry is None:
+                return None
+            chunks.append(entry[0])
+        return b''.join(chunks)
+    
+    def _drain_parked(self):
+        """バックエンドの回復を待ち、保留した区間を古い順に認識"""
+        while not self._stop_event.is_set():
+            with self._parked_lock:
+                if not self.parked:
+                    self._drain_thread = None
+                    break
+            
+            if not self.breaker.allow():
+                self._stop_event.wait(0.5)
+                continue
+            
+            # 保留を取り出すのはこのスレッドのみ（上限超過時の破棄では空にならない）
+            with self._parked_lock:
+                audio, spool_ids, source = self.parked.popleft()
+            
+            try:
+                text = self._recognize_audio(audio)
             except sr.UnknownValueError:
-                # 認識できない音声は無視（連続認識時は正常な動作）
-                pass
-            except sr.RequestError as e:
-                if self.on_error:
-                    self.on_error(f"音声認識サービスエラー: {str(e)}")
+                text = None
+            except sr.RequestError:
+                self.breaker.record_failure()
+                with self._parked_lock:
+                    self.parked.appendleft((audio, spool_ids, source))
+                self._stop_event.wait(backoff_delay(0))
+                continue
             except Exception as e:
+                # バックエンドの回復とは関係ない失敗のため、状態は変えずに試行だけ譲る。
+                # 区間はスプールに残し、次回起動時に再認識する
+                self.breaker.release()
+                self._notify_backend_status()
                 if self.on_error:
-                    self.on_error(f"音声データ認識エラー: {str(e)}")
+                    self.on_error(f"保留中の音声の認識エラー: {str(e)}（次回起動時に再認識します）")
+                continue
+            
+            self.breaker.record_success()
+            self._confirm_spooled(spool_ids)
+            self._notify_backend_status()
+            if text and self.on_recognition_result:
+                # 保留した区間の結果は後から届いた分として追記する
+                self.on_recognition_result(text, kind=ResultKind.FINAL, source=source)
         
-        # 別スレッドで実行
-        thread = threading.Thread(target=_recognize)
-        thread.daemon = True
-        thread.start()
+        self._notify_backend_status()
+    
+    def _notify_backend_status(self):
+        """バックエンドの状態と保留数を通知"""
+        if self.on_backend_status:
+            self.on_backend_status(self.breaker.state, len(self.parked))
+    
+    def _recognize_audio(self, audio):
+        """
+        キャッシュを確認してからバックエンドで認識
+        
+        Args:
+            audio: sr.AudioData
+            
+        Returns:
+            str: 認識結果
+            
+        Raises:
+            sr.UnknownValueError: 認識できなかった場合（キャッシュ済みの場合も含む）
+        """
+        if self.cache is None:
+            return self.backend.recognize(audio, self.language)
+        return self.cache.recognize_with(self.backend, audio, self.language)
+    
+    def _on_scheduled_result(self, seq, text, trace, utterance_id, source=None):
+        """スケジューラーから録音順に届いた認識結果を通知"""
+        if utterance_id is None:
+            self._emit_final(text, trace, utterance_id, source)
+            return
+        self.stitcher.complete(source, utterance_id, (text, trace))
+    
+    def _deliver_final(self, source, utterance_id, result):
+        """重複を除いた認識結果を通知（複数チャンネルの場合は録音順に合流させる）"""
+        text, trace = result
+        merger = self.merger
+        if merger is not None and utterance_id is not None and merger.handles(source):
+            merger.complete(source, utterance_id, (text, trace))
+            return
+        self._emit_final(text, trace, utterance_id, source)
+    
+    def _emit_final(self, text, trace, utterance_id, source=None):
+        """確定結果を通知"""
+        if not self.on_recognition_result:
+            return
+        if text:
+            self.on_recognition_result(text, trace=trace, kind=ResultKind.FINAL,
+                                       utterance_id=utterance_id, source=source)
+        elif utterance_id is not None:
+            # 結果がなくても途中結果を取り消せるよう空の確定結果を通知
+            self.on_recognition_result('', kind=ResultKind.FINAL, utterance_id=utterance_id, source=source)
+    
+    def _on_partial_result(self, utterance_id, text):
+        """途中結果を通知"""
+        if self.on_recognition_result:
+            self.on_recognition_result(text, kind=ResultKind.INTERIM, utterance_id=utterance_id)
     
     def set_language(self, language_code):
         """
@@ -152,20 +652,26 @@ class SpeechRecognizer:
         """
         self.language = language_code
     
+    def set_backend(self, name, **options):
+        """
+        認識バックエンドを切り替え
+        
+        Args:
+            name: バックエンド名（例: 'google', 'vosk', 'fake'）
+            **options: バックエンドのコンストラクタに渡す引数
+        """
+        self.backend = create_backend(name, **options)
+    
     def test_microphone(self):
         """
         マイクロフォンのテスト
         
+        毎回の環境音測定は行わず、初期化・キャリブレーションの結果を返す
+        
         Returns:
             bool: マイクが正常に動作する場合True
         """
-        try:
-            with self.microphone as source:
-                # 短時間で環境音をテスト
-                self.recognizer.adjust_for_ambient_noise(source, duration=0.5)
-            return True
-        except Exception:
-            return False
+        return self.microphone is not None and not self._microphone_failed
     
     def get_microphone_energy_threshold(self):
         """現在のマイクロフォンのエネルギー閾値を取得"""
@@ -178,4 +684,20 @@ class SpeechRecognizer:
         Args:
             threshold: エネルギー閾値（数値が大きいほど感度が低い）
         """
-        self.recognizer.energy_threshold = threshold
\ No newline at end of file
+        self.recognizer.energy_threshold = threshold
+    
+    def cleanup(self):
+        """リソースのクリーンアップ"""
+        self._stop_event.set()
+        self.partial_recognizer.stop()
+        self.scheduler.stop()
+        with self._lanes_lock:
+            lanes = list(self.lanes.values())
+        for scheduler in lanes:
+            scheduler.stop()
+        # 続きを待っていた結果も通知する
+        self.stitcher.flush()
+        self.backend.close()
+        if self.spool is not None:
+            # 結果の出ていない区間は次回起動時に再認識する
+            self.spool.close()
\ No newline at end of file
@@ -3,42 +3,97 @@
 音声録音機能を管理するモジュール
 """
 
-import pyaudio
+import heapq
 import threading
-import queue
 import time
+import numpy as np
 from ..utils.config import Config
+from ..utils.tracing import tracer
+from .noise_floor import NoiseFloorTracker
+from .resampler import PolyphaseResampler
+from .ring_buffer import AudioRingBuffer
+from .sources import PyAudioSource
+from .vad import VoiceActivityDetector
 
 class AudioRecorder:
     """音声録音を管理するクラス"""
     
-    def __init__(self):
-        # PyAudio設定
-        self.audio = pyaudio.PyAudio()
-        self.format = pyaudio.paInt16
-        self.channels = 1
-        self.rate = 44100
+    def __init__(self, device_index=None, audio=None, source=None, channels=None, audio_source=None):
+        """
+        Args:
+            device_index: 録音する入力デバイスの番号（省略時は既定の入力デバイス）
+            audio: 共有する pyaudio.PyAudio（audio_source を省略した場合に使う）
+            source: 通知する音声に付ける入力元の名前（複数デバイス録音時の識別用）
+            channels: 録音するチャンネル数（省略時は Config.INPUT_CHANNELS）。
+                2以上ではチャンネルごとに発話を検出し、チャンネル名を source として通知する
+            audio_source: 録音の入力元（AudioSource。音声ファイルの再生・合成音声など）。
+                audio とともに省略した場合はマイク（PyAudioSource）を生成し、cleanup で終了する
+        """
+        # 入力元の設定
+        self._owns_audio = audio_source is None and audio is None
+        self.audio_source = audio_source or PyAudioSource(audio)
+        self.device_index = device_index
+        self.source = source
+        self.channels = max(1, channels or Config.INPUT_CHANNELS)
+        self.rate = Config.SAMPLE_RATE     # 後段（VAD・認識）に渡すサンプリングレート
+        self.capture_rate = self.rate      # デバイスから実際に録音するサンプリングレート
         self.chunk = 1024
+        self.resamplers = [None] * self.channels  # デバイスが対応しない場合のみ使用
         
         # 録音状態
         self.is_recording = False
-        self.audio_queue = queue.Queue()
         self.stream = None
+        self.processing_thread = None
+        # 処理スレッドが読み終えた位置（実時間でない入力元の待ち合わせ用）
+        self._read_position = 0
+        self._consumed = threading.Condition()
+        
+        # 録音データはチャンネルごとに事前確保したリングバッファに直接書き込む
+        # （全チャンネルで通算サンプル位置は共通）
+        self.ring_buffers = [
+            AudioRingBuffer(self.rate * Config.AUDIO_RING_SECONDS) for _ in range(self.channels)
+        ]
+        self.ring_buffer = self.ring_buffers[0]
+        self.channel_sources = self._make_channel_sources()
+        # 発話とみなす閾値はチャンネルごとに環境ノイズから推定し続ける（録音をやり直しても引き継ぐ）
+        self.noise_trackers = [
+            NoiseFloorTracker() if Config.VAD_ADAPTIVE_THRESHOLD else None for _ in range(self.channels)
+        ]
+        self.noise_tracker = self.noise_trackers[0]
+        self._utterance_offset = 0  # 録音をやり直しても発話IDが重複しないよう加算する位置
+        
+        # 統計（入力元ごとの処理量の報告用）
+        self.segment_count = 0
+        self.recording_seconds = 0.0   # 停止済みの録音時間の合計
+        self._started_at = None
         
         # コールバック関数
-        self.on_audio_data = None  # 音声データ受信時のコールバック
-        self.on_error = None       # エラー発生時のコールバック
+        self.on_audio_data = None     # 音声データ受信時のコールバック
+        self.on_error = None          # エラー発生時のコールバック
+        self.on_partial_audio = None  # 発話途中の音声データ通知のコールバック
+        self.on_captured_audio = None # 録音チャンクをそのまま渡すコールバック（asyncio パイプライン用）
     
-    def set_callbacks(self, on_audio_data=None, on_error=None):
+    def set_callbacks(self, on_audio_data=None, on_error=None, on_partial_audio=None,
+                      on_captured_audio=None):
         """
         コールバック関数を設定
         
         Args:
-            on_audio_data: 音声データ受信時に呼ばれる関数
+            on_audio_data: 発話区間の確定時に呼ばれる関数
+                (音声データ, trace=遅延計測のトレース, utterance_id=発話ID, source=入力元の名前,
+                overlap=前の区間と重なる先頭のサンプル数, continued=続きの区間を重ねて始めたか)
             on_error: エラー発生時に呼ばれる関数
+            on_partial_audio: 発話中に Config.PARTIAL_INTERVAL_MS ごとに呼ばれる関数
+                (発話の先頭から現在までの音声データ, 発話ID)。途中結果の認識用
+                （複数チャンネル録音時は使わない）
+            on_captured_audio: 録音チャンクごとにコールバックのスレッドから呼ばれる関数
+                (チャンネルごとの音声データ, 入力元の名前)。設定した場合は発話区間の検出を
+                呼び出し側（RecognitionPipeline）に任せ、音声処理スレッドを開始しない
         """
         self.on_audio_data = on_audio_data
         self.on_error = on_error
+        self.on_partial_audio = on_partial_audio
+        self.on_captured_audio = on_captured_audio
     
     def start_recording(self):
         """録音開始"""
@@ -46,23 +101,37 @@ class AudioRecorder:
             return False
         
         try:
+            self._utterance_offset += self.ring_buffer.write_position
+            for ring_buffer in self.ring_buffers:
+                ring_buffer.reset()
+            self._read_position = 0
+            
+            # 目標レートで録音できない場合は録音後にリサンプリングする
+            self.capture_rate = self._select_capture_rate()
+            self.resamplers = [None] * self.channels
+            if self.capture_rate != self.rate:
+                self.resamplers = [
+                    PolyphaseResampler(self.capture_rate, self.rate) for _ in range(self.channels)
+                ]
+            
             # 音声ストリームを開く
-            self.stream = self.audio.open(
-                format=self.format,
+            self.stream = self.audio_source.open(
+                self.capture_rate,
                 channels=self.channels,
-                rate=self.rate,
-                input=True,
+                device_index=self.device_index,
                 frames_per_buffer=self.chunk,
-                stream_callback=self._audio_callback
+                callback=self._audio_callback
             )
             
+            self._started_at = time.monotonic()
             self.is_recording = True
             self.stream.start_stream()
             
-            # 音声処理スレッドを開始
-            self.processing_thread = threading.Thread(target=self._process_audio_data)
-            self.processing_thread.daemon = True
-            self.processing_thread.start()
+            # 音声処理スレッドを開始（チャンクを直接渡す場合は不要）
+            if not self.on_captured_audio:
+                self.processing_thread = threading.Thread(target=self._process_audio_data)
+                self.processing_thread.daemon = True
+                self.processing_thread.start()
             
             return True
             
@@ -78,65 +147,251 @@ class AudioRecorder:
         
         try:
             self.is_recording = False
+            self.recording_seconds += time.monotonic() - self._started_at
+            
+            with self._consumed:
+                self._consumed.notify_all()
             
             if self.stream:
                 self.stream.stop_stream()
                 self.stream.close()
                 self.stream = None
+            
+            # 話途中の発話の確定（処理スレッドの終了）を待つ
+            if self.processing_thread and self.processing_thread is not threading.current_thread():
+                self.processing_thread.join(1.0)
+            self.processing_thread = None
                 
         except Exception as e:
             if self.on_error:
                 self.on_error(f"録音停止エラー: {str(e)}")
     
-    def _audio_callback(self, in_data, frame_count, time_info, status):
+    def _audio_callback(self, in_data):
         """
-        PyAudioのコールバック関数
+        入力ストリームのコールバック関数
         音声データを受信したときに呼ばれる
         """
         if self.is_recording:
-            self.audio_queue.put(in_data)
-        return (in_data, pyaudio.paContinue)
+            if not self.audio_source.realtime and not self.on_captured_audio:
+                self._wait_for_processing()
+            if self.channels == 1:
+                channel_data = (in_data,)
+            else:
+                # 交互に並んだサンプルを転置し、1回のコピーでチャンネルごとの連続した配列にする
+                frames = np.frombuffer(in_data, dtype=np.int16).reshape(-1, self.channels)
+                channel_data = np.ascontiguousarray(frames.T)
+            for ring_buffer, resampler, data, source in zip(
+                    self.ring_buffers, self.resamplers, channel_data, self.channel_sources):
+                if resampler:
+                    data = resampler.process(data)
+                ring_buffer.write(data)
+                if self.on_captured_audio:
+                    self.on_captured_audio(data, source)
+    
+    def _wait_for_processing(self):
+        """
+        処理スレッドの遅れがリングバッファの半分を超えている間、次のチャンクを待たせる
+        
+        実時間でない入力元（ファイルの最速再生など）が処理より先に進み、
+        未処理の音声を上書きしないようにする。
+        """
+        limit = self.ring_buffer.capacity // 2
+        with self._consumed:
+            self._consumed.wait_for(
+                lambda: (not self.is_recording
+                         or self.ring_buffer.write_position - self._read_position < limit),
+                timeout=1.0
+            )
     
     def _process_audio_data(self):
         """音声データを処理するスレッド"""
-        audio_buffer = []
-        last_process_time = time.time()
+        # 無音を認識に送らないよう、チャンネルごとに発話区間を区切って通知する
+        vads = [
+            VoiceActivityDetector(self.rate, noise_tracker=tracker) for tracker in self.noise_trackers
+        ]
+        frame_size = vads[0].frame_size
+        held = []  # 通知待ちの区間のヒープ (開始位置, チャンネル, SpeechSegment)
+        read_position = 0
+        partial_interval = Config.PARTIAL_INTERVAL_MS / 1000
+        last_partial = 0.0
         
         while self.is_recording:
             try:
-                # キューから音声データを取得
-                audio_data = self.audio_queue.get(timeout=0.1)
-                audio_buffer.append(audio_data)
+                # 端数（1フレーム未満）だけでは処理できないため、1フレーム分たまるまで待つ
+                self.ring_buffer.wait_for_data(read_position + frame_size - 1, timeout=0.1)
+                # コールバックが全チャンネルを書き終えた位置まで読む
+                write_position = min(ring_buffer.write_position for ring_buffer in self.ring_buffers)
                 
-                # 一定時間ごとまたは一定量たまったら処理
-                current_time = time.time()
-                if (current_time - last_process_time >= Config.PHRASE_TIME_LIMIT or 
-                    len(audio_buffer) >= 50):  # 約1秒分
-                    
-                    if audio_buffer and self.on_audio_data:
-                        combined_data = b''.join(audio_buffer)
-                        self.on_audio_data(combined_data)
-                    
-                    audio_buffer = []
-                    last_process_time = current_time
+                # 処理が追いつかず上書きされた場合は有効な位置から再開
+                position = self.ring_buffer.check_overrun(read_position)
+                if position != read_position:
+                    for vad in vads:
+                        vad.reset(position)
+                    read_position = position
+                
+                # VADのフレーム境界に揃えて読み出す（端数はリングに残す）
+                available = write_position - read_position
+                end = read_position + available - available % frame_size
+                if end <= read_position:
+                    continue
+                
+                for channel, (ring_buffer, vad) in enumerate(zip(self.ring_buffers, vads)):
+                    for segment in vad.process(ring_buffer.view(read_position, end)):
+                        heapq.heappush(held, (segment.start, channel, segment))
+                read_position = end
+                with self._consumed:
+                    self._read_position = read_position
+                    self._consumed.notify_all()
+                
+                # 他のチャンネルでこれより前に始まる区間が出てこない区間から開始順に通知
+                self._release_segments(held, min(vad.retain_from for vad in vads))
+                
+                # 発話中は一定間隔で途中までの音声を通知
+                segment = vads[0].active_segment if self.channels == 1 else None
+                now = time.monotonic()
+                if segment and self.on_partial_audio and now - last_partial >= partial_interval:
+                    last_partial = now
+                    self._emit_partial(*segment)
                     
-            except queue.Empty:
-                # キューが空の場合は継続
-                continue
             except Exception as e:
                 if self.on_error:
                     self.on_error(f"音声処理エラー: {str(e)}")
                 break
+        
+        # 録音停止時に話途中の発話を確定
+        for channel, vad in enumerate(vads):
+            segment = vad.flush()
+            if segment:
+                heapq.heappush(held, (segment.start, channel, segment))
+        self._release_segments(held)
+        with self._consumed:
+            self._consumed.notify_all()
+    
+    def _release_segments(self, held, horizon=None):
+        """
+        通知待ちの区間を開始位置の順に通知
+        
+        Args:
+            held: 通知待ちの区間のヒープ (開始位置, チャンネル, SpeechSegment)
+            horizon: この位置より前に始まる区間のみ通知（Noneはすべて）
+        """
+        while held and (horizon is None or held[0][0] < horizon):
+            _, channel, segment = heapq.heappop(held)
+            self._emit_segment(segment, channel)
+    
+    def _emit_segment(self, segment, channel=0):
+        """
+        発話区間をリングバッファのスライスとして通知
+        
+        Args:
+            segment: 発話区間（SpeechSegment。位置は通算サンプル数）
+            channel: チャンネル番号
+        """
+        start, end = segment.start, segment.end
+        ring_buffer = self.ring_buffers[channel]
+        if not self.on_audio_data or not ring_buffer.is_intact(start):
+            return
+        
+        trace = None
+        if tracer.enabled:
+            # 起点は区間末尾のサンプルが書き込まれた時刻（現在の書き込み位置との差から推定）
+            lag = (ring_buffer.write_position - end) / self.rate
+            trace = tracer.start(timestamp=time.perf_counter() - lag)
+            trace.mark('segmented')
+        
+        # 区間の開始位置を発話IDとして途中結果と対応付ける
+        self.segment_count += 1
+        self.on_audio_data(
+            ring_buffer.view(start, end),
+            trace=trace,
+            utterance_id=self._utterance_offset + start,
+            source=self.channel_sources[channel],
+            overlap=segment.overlap,
+            continued=segment.continued
+        )
+    
+    def _emit_partial(self, start, end):
+        """
+        進行中の発話区間をリングバッファのスライスとして通知
+        
+        Args:
+            start: 区間の開始位置
+            end: 判定済みの位置
+        """
+        if self.ring_buffer.is_intact(start):
+            self.on_partial_audio(self.ring_buffer.view(start, end), self._utterance_offset + start)
+    
+    def _make_channel_sources(self):
+        """チャンネルごとの入力元の名前（モノラルでは source のまま）"""
+        if self.channels == 1:
+            return [self.source]
+        labels = list(Config.CHANNEL_LABELS)
+        labels += [f"ch{channel + 1}" for channel in range(len(labels), self.channels)]
+        return [
+            f"{self.source}/{label}" if self.source else label
+            for label in labels[:self.channels]
+        ]
+    
+    @property
+    def merged_sources(self):
+        """結果を録音順に合流させる入力元（複数チャンネル録音時のチャンネル名）"""
+        return self.channel_sources if self.channels > 1 else []
+    
+    @property
+    def overrun_count(self):
+        """リングバッファの上書き（取りこぼし）回数"""
+        return self.ring_buffer.overrun_count
+    
+    @property
+    def captured_seconds(self):
+        """これまでに録音した音声の長さ（秒）"""
+        return (self._utterance_offset + self.ring_buffer.write_position) / self.rate
+    
+    @property
+    def input_finished(self):
+        """入力元の音声（ファイルの再生など）が終わり、録音した分を処理し終えたか"""
+        if not self.is_recording or self.stream is None or self.stream.is_active():
+            return False
+        return bool(self.on_captured_audio) or self.ring_buffer.write_position - self._read_position < self.chunk
+    
+    @property
+    def elapsed_seconds(self):
+        """録音していた時間の合計（秒、録音中の分を含む）"""
+        if self.is_recording:
+            return self.recording_seconds + time.monotonic() - self._started_at
+        return self.recording_seconds
+    
+    def get_device_info(self):
+        """録音する入力デバイスの情報を取得"""
+        return self.audio_source.get_device_info(self.device_index)
+    
+    def _select_capture_rate(self):
+        """
+        録音に使うサンプリングレートを決定
+        
+        Returns:
+            int: デバイスが目標レートに対応していれば目標レート、
+                 そうでなければデバイスの既定レート
+        """
+        try:
+            device_info = self.get_device_info()
+        except Exception:
+            # 既定デバイスが取得できない場合はストリームを開く際にエラーとなる
+            return self.rate
+        
+        if self.audio_source.is_format_supported(self.rate, self.device_index, self.channels):
+            return self.rate
+        
+        return int(device_info['defaultSampleRate'])
     
     def is_microphone_available(self):
         """マイクが利用可能かチェック"""
         try:
             # 一時的にストリームを開いてテスト
-            test_stream = self.audio.open(
-                format=self.format,
+            test_stream = self.audio_source.open(
+                self._select_capture_rate(),
                 channels=self.channels,
-                rate=self.rate,
-                input=True,
+                device_index=self.device_index,
                 frames_per_buffer=self.chunk
             )
             test_stream.close()
@@ -148,14 +403,12 @@ class AudioRecorder:
         """利用可能な入力デバイス一覧を取得"""
         devices = []
         try:
-            for i in range(self.audio.get_device_count()):
-                device_info = self.audio.get_device_info_by_index(i)
-                if device_info['maxInputChannels'] > 0:
-                    devices.append({
-                        'index': i,
-                        'name': device_info['name'],
-                        'sample_rate': int(device_info['defaultSampleRate'])
-                    })
+            for device_info in self.audio_source.list_devices():
+                devices.append({
+                    'index': device_info['index'],
+                    'name': device_info['name'],
+                    'sample_rate': int(device_info['defaultSampleRate'])
+                })
         except Exception as e:
             if self.on_error:
                 self.on_error(f"デバイス取得エラー: {str(e)}")
@@ -165,5 +418,5 @@ class AudioRecorder:
     def cleanup(self):
         """リソースのクリーンアップ"""
         self.stop_recording()
-        if self.audio:
-            self.audio.terminate()
\ No newline at end of file
+        if self._owns_audio:
+            self.audio_source.terminate()
\ No newline at end of file
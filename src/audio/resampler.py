@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+"""
+サンプリングレート変換を管理するモジュール
+"""
+
+from math import gcd
+
+import numpy as np
+
+
+class PolyphaseResampler:
+    """
+    ストリーミング型のポリフェーズリサンプラー
+
+    変換比を既約分数 L/M に直し、窓付きsincのローパスフィルタを
+    L個の位相に分解して保持する。出力サンプルごとに必要な位相と
+    入力位置をまとめて求め、積和をNumPyで一括計算する。
+    チャンク間のフィルタ履歴を保持するため、録音コールバックの
+    任意長のチャンクを順に入力できる。
+    """
+
+    def __init__(self, input_rate, output_rate, taps_per_phase=32):
+        """
+        Args:
+            input_rate: 入力サンプリングレート
+            output_rate: 出力サンプリングレート
+            taps_per_phase: 位相あたりのフィルタタップ数（大きいほど高品質）
+        """
+        self.input_rate = int(input_rate)
+        self.output_rate = int(output_rate)
+
+        divisor = gcd(self.input_rate, self.output_rate)
+        self.up = self.output_rate // divisor     # L
+        self.down = self.input_rate // divisor    # M
+
+        self.taps_per_phase = int(taps_per_phase)
+        self._phases = self._design_filter()
+        self._tap_offsets = np.arange(self.taps_per_phase)
+        self.reset()
+
+    def reset(self):
+        """フィルタ履歴を初期化"""
+        history = self.taps_per_phase - 1
+        self._history = np.zeros(history, dtype=np.float32)
+        self._history_start = -history  # 履歴先頭の通算入力位置
+        self._next_output = 0           # 次に出力する通算出力位置
+
+    def _design_filter(self):
+        """ポリフェーズ分解したローパスフィルタを作成"""
+        length = self.up * self.taps_per_phase
+        cutoff = 0.5 / max(self.up, self.down)  # アップサンプル後の正規化周波数
+        n = np.arange(length) - (length - 1) / 2
+        taps = 2 * cutoff * np.sinc(2 * cutoff * n) * np.kaiser(length, 8.0)
+        taps *= self.up / taps.sum()  # 直流ゲインを1に揃える
+
+        # phases[p, k] = taps[k * L + p]
+        return taps.reshape(self.taps_per_phase, self.up).T.astype(np.float32)
+
+    def process(self, audio_data):
+        """
+        音声データを変換
+
+        Args:
+            audio_data: 16bit PCMの音声データ（bytes-like）
+
+        Returns:
+            numpy.ndarray: 変換後のint16配列
+        """
+        samples = np.frombuffer(audio_data, dtype=np.int16)
+        if self.up == self.down:
+            return samples
+
+        buffer = np.concatenate((self._history, samples.astype(np.float32)))
+        last_input = self._history_start + len(buffer) - 1
+
+        # base(n) = n*M // L が入力済み範囲に収まる出力位置まで計算する
+        last_output = (last_input * self.up + self.up - 1) // self.down
+        outputs = np.arange(self._next_output, last_output + 1, dtype=np.int64)
+
+        result = np.empty(0, dtype=np.int16)
+        if len(outputs):
+            position = outputs * self.down
+            base = position // self.up - self._history_start
+            phase = position % self.up
+
+            gathered = buffer[base[:, None] - self._tap_offsets[None, :]]
+            values = np.einsum('nk,nk->n', self._phases[phase], gathered)
+            result = np.clip(np.rint(values), -32768, 32767).astype(np.int16)
+            self._next_output = int(outputs[-1]) + 1
+
+        keep = self.taps_per_phase - 1
+        self._history = buffer[len(buffer) - keep:] if keep else buffer[:0]
+        self._history_start = last_input + 1 - keep
+        return result
+
+
+def resample(audio_data, input_rate, output_rate):
+    """
+    音声データを一括で変換
+
+    Args:
+        audio_data: 16bit PCMの音声データ（bytes-like）
+        input_rate: 入力サンプリングレート
+        output_rate: 出力サンプリングレート
+
+    Returns:
+        bytes: 変換後の16bit PCMデータ
+    """
+    if input_rate == output_rate:
+        return bytes(audio_data)
+    return PolyphaseResampler(input_rate, output_rate).process(audio_data).tobytes()
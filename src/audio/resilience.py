@@ -0,0 +1,169 @@
+# -*- coding: utf-8 -*-
+"""
+認識バックエンド呼び出しの再試行とサーキットブレーカーを管理するモジュール
+"""
+
+import random
+import threading
+import time
+
+import speech_recognition as sr
+
+from ..utils.config import Config
+
+
+class BreakerState:
+    """サーキットブレーカーの状態"""
+
+    CLOSED = 'closed'        # 正常（すべての呼び出しを通す）
+    OPEN = 'open'            # 遮断中（呼び出しを行わず区間を保留する）
+    HALF_OPEN = 'half_open'  # 回復確認中（1件だけ試行する）
+
+
+class CircuitBreaker:
+    """
+    連続して失敗したバックエンドへの呼び出しを一時的に止めるクラス
+
+    Config.CIRCUIT_FAILURE_THRESHOLD 回続けて失敗すると遮断し、
+    Config.CIRCUIT_RESET_TIMEOUT 秒後に1件だけ試行を許可する。
+    試行が成功すれば正常に戻り、失敗すれば再び遮断する。
+    """
+
+    def __init__(self, failure_threshold=None, reset_timeout=None, on_state_change=None):
+        """
+        Args:
+            failure_threshold: 遮断するまでの連続失敗回数
+            reset_timeout: 遮断から回復確認までの秒数
+            on_state_change: 状態が変わったときに呼ばれる関数 (BreakerState)
+        """
+        self.failure_threshold = failure_threshold or Config.CIRCUIT_FAILURE_THRESHOLD
+        self.reset_timeout = reset_timeout or Config.CIRCUIT_RESET_TIMEOUT
+        self.on_state_change = on_state_change
+
+        self._state = BreakerState.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        """現在の状態（遮断中で回復確認の時刻を過ぎていれば HALF_OPEN）"""
+        with self._lock:
+            if self._state == BreakerState.OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+                return BreakerState.HALF_OPEN
+            return self._state
+
+    def allow(self):
+        """
+        呼び出してよいか
+
+        Returns:
+            bool: 正常時、または回復確認の1件目の場合True
+        """
+        with self._lock:
+            if self._state == BreakerState.CLOSED:
+                return True
+            if self._probing or time.monotonic() - self._opened_at < self.reset_timeout:
+                return False
+            self._probing = True
+            new_state = self._state = BreakerState.HALF_OPEN
+        self._notify(new_state)
+        return True
+
+    def record_success(self):
+        """呼び出しの成功を記録"""
+        with self._lock:
+            changed = self._state != BreakerState.CLOSED
+            self._state = BreakerState.CLOSED
+            self._failures = 0
+            self._probing = False
+        if changed:
+            self._notify(BreakerState.CLOSED)
+
+    def record_failure(self):
+        """
+        呼び出しの失敗を記録
+
+        遮断中に届いた失敗（遮断前に始めた呼び出しなど）では回復確認の時刻を延ばさない。
+        """
+        with self._lock:
+            self._failures += 1
+            self._probing = False
+            if self._state == BreakerState.OPEN:
+                return
+            if self._state == BreakerState.CLOSED and self._failures < self.failure_threshold:
+                return
+            self._state = BreakerState.OPEN
+            self._opened_at = time.monotonic()
+        self._notify(BreakerState.OPEN)
+
+    def release(self):
+        """
+        成功とも失敗とも言えない終わり方をした呼び出しを記録
+
+        バックエンド以外の原因（音声データの不備や中断など）で呼び出しが終わった場合に呼ぶ。
+        状態は変えず、回復確認の試行中であれば次の呼び出しに試行を譲る。
+        """
+        with self._lock:
+            self._probing = False
+
+    def _notify(self, state):
+        """状態の変更を通知"""
+        if self.on_state_change:
+            self.on_state_change(state)
+
+
+def backoff_delay(attempt, base_delay=None, max_delay=None):
+    """
+    再試行までの待ち時間（指数バックオフ + フルジッター）
+
+    Args:
+        attempt: 何回目の再試行か（0始まり）
+        base_delay: 初回の待ち時間の上限（秒）
+        max_delay: 待ち時間の上限（秒）
+
+    Returns:
+        float: 0 から min(max_delay, base_delay * 2**attempt) までの乱数（秒）
+    """
+    base_delay = Config.BACKEND_RETRY_BASE_DELAY if base_delay is None else base_delay
+    max_delay = Config.BACKEND_RETRY_MAX_DELAY if max_delay is None else max_delay
+    return random.uniform(0, min(max_delay, base_delay * (2 ** attempt)))
+
+
+def call_with_retry(func, retries=None, deadline=None, base_delay=None, max_delay=None):
+    """
+    sr.RequestError の場合に再試行しながら関数を呼び出す
+
+    認識できなかった（sr.UnknownValueError）場合は再試行しない。
+
+    Args:
+        func: 引数なしで呼び出す関数
+        retries: 最大再試行回数
+        deadline: 再試行を打ち切る時刻（time.monotonic() 基準、省略時は
+            Config.BACKEND_DEADLINE 秒後）
+        base_delay: バックオフの初回の待ち時間の上限（秒）
+        max_delay: バックオフの待ち時間の上限（秒）
+
+    Returns:
+        func の戻り値
+
+    Raises:
+        sr.RequestError: 再試行しても失敗した場合（最後のエラー）
+    """
+    retries = Config.BACKEND_RETRIES if retries is None else retries
+    if deadline is None:
+        deadline = time.monotonic() + Config.BACKEND_DEADLINE
+
+    attempt = 0
+    while True:
+        try:
+            return func()
+        except sr.RequestError:
+            if attempt >= retries:
+                raise
+            delay = backoff_delay(attempt, base_delay, max_delay)
+            if time.monotonic() + delay >= deadline:
+                raise
+            time.sleep(delay)
+            attempt += 1
@@ -0,0 +1,138 @@
+# -*- coding: utf-8 -*-
+"""
+録音データ用のリングバッファを管理するモジュール
+"""
+
+import threading
+
+
+class AudioRingBuffer:
+    """
+    16bit PCM用の固定長リングバッファ
+
+    録音開始前に一度だけ確保した bytearray に、PyAudioのコールバックから
+    直接書き込む。領域は容量の2倍を確保して各サンプルを両側に書き込む
+    （ミラーリング）ため、容量以下の任意の区間は折り返しを含めても
+    1つの連続した memoryview スライスとしてコピーなしで取り出せる。
+
+    位置はすべて録音開始からの通算サンプル数で表す。
+    """
+
+    SAMPLE_WIDTH = 2  # 16bit
+
+    def __init__(self, capacity):
+        """
+        Args:
+            capacity: 保持するサンプル数
+        """
+        self.capacity = int(capacity)
+        if self.capacity <= 0:
+            raise ValueError("リングバッファの容量は1以上にしてください")
+
+        self._buffer = bytearray(self.capacity * 2 * self.SAMPLE_WIDTH)
+        self._view = memoryview(self._buffer)
+        self._condition = threading.Condition()
+
+        self.write_position = 0   # 通算書き込みサンプル数
+        self.overrun_count = 0    # 読み出し前に上書きされた回数
+
+    def reset(self):
+        """書き込み位置と統計を初期化"""
+        with self._condition:
+            self.write_position = 0
+            self.overrun_count = 0
+
+    def write(self, data):
+        """
+        音声データを書き込み（録音コールバックから呼ばれる）
+
+        Args:
+            data: 16bit PCMの音声データ（bytes-like）
+        """
+        source = memoryview(data).cast('B')
+        samples = len(source) // self.SAMPLE_WIDTH
+        if samples > self.capacity:
+            # 容量を超える分は書き込む前に失われる
+            source = source[(samples - self.capacity) * self.SAMPLE_WIDTH:]
+            self.overrun_count += 1
+
+        size = len(source)
+        offset = (self.write_position % self.capacity) * self.SAMPLE_WIDTH
+        mirror = self.capacity * self.SAMPLE_WIDTH
+
+        first = min(size, mirror - offset)
+        self._view[offset:offset + first] = source[:first]
+        self._view[offset + mirror:offset + mirror + first] = source[:first]
+
+        rest = size - first
+        if rest:
+            self._view[0:rest] = source[first:]
+            self._view[mirror:mirror + rest] = source[first:]
+
+        with self._condition:
+            self.write_position += size // self.SAMPLE_WIDTH
+            self._condition.notify_all()
+
+    def wait_for_data(self, position, timeout=None):
+        """
+        指定位置より先のデータが書き込まれるまで待機
+
+        Args:
+            position: 読み出し済みの位置
+            timeout: 最大待機秒数
+
+        Returns:
+            int: 現在の書き込み位置
+        """
+        with self._condition:
+            if self.write_position <= position:
+                self._condition.wait(timeout)
+            return self.write_position
+
+    def check_overrun(self, position):
+        """
+        読み出し位置が上書きされていないかを確認
+
+        Args:
+            position: これから読み出す位置
+
+        Returns:
+            int: 読み出し可能な位置（上書きされていた場合は最も古い有効位置）
+        """
+        oldest = self.write_position - self.capacity
+        if position < oldest:
+            self.overrun_count += 1
+            return oldest
+        return position
+
+    def is_intact(self, start):
+        """
+        指定位置以降のデータがまだ上書きされていないか
+
+        Args:
+            start: 区間の開始位置
+
+        Returns:
+            bool: 有効な場合True
+        """
+        return self.write_position - start <= self.capacity
+
+    def view(self, start, end):
+        """
+        区間のデータをコピーせずに取得
+
+        返されるスライスはリングが一周して上書きされるまで有効。
+
+        Args:
+            start: 区間の開始位置
+            end: 区間の終了位置（この位置は含まない）
+
+        Returns:
+            memoryview: 区間の16bit PCMデータ（バイト単位）
+        """
+        length = end - start
+        if length < 0 or length > self.capacity:
+            raise ValueError(f"無効な区間です: {start}-{end}")
+
+        offset = (start % self.capacity) * self.SAMPLE_WIDTH
+        return self._view[offset:offset + length * self.SAMPLE_WIDTH]
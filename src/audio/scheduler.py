@@ -0,0 +1,228 @@
+# -*- coding: utf-8 -*-
+"""
+音声認識ジョブのスケジューリングを管理するモジュール
+"""
+
+import threading
+from collections import deque
+from ..utils.config import Config
+
+
+class OverflowPolicy:
+    """待機キューが満杯のときの動作"""
+
+    DROP_OLDEST = 'drop_oldest'  # 最も古い待機チャンクを破棄
+    BLOCK = 'block'              # 空きが出るまで投入側を待たせる
+    COALESCE = 'coalesce'        # 最新の待機チャンクに連結
+
+    ALL = (DROP_OLDEST, BLOCK, COALESCE)
+
+
+class RecognitionScheduler:
+    """
+    固定数のワーカースレッドで音声チャンクを認識するスケジューラー
+
+    各チャンクには投入順の連番が付与され、認識結果は並列に処理されても
+    必ず投入（録音）順にコールバックへ渡される。
+    """
+
+    def __init__(self, recognize_func, on_result=None,
+                 worker_count=None, max_pending=None, overflow_policy=None, on_drop=None):
+        """
+        Args:
+            recognize_func: 1チャンクを認識する関数 (audio_data, sample_rate, spool_ids) -> str または None
+            on_result: 認識結果を順番どおりに受け取る関数 (seq, text, trace, utterance_id)。
+                結果がないチャンク（認識できない・破棄された）も text=None で通知される
+            worker_count: ワーカースレッド数
+            max_pending: 待機キューの最大長
+            overflow_policy: 待機キュー満杯時の動作（OverflowPolicy）
+            on_drop: 待機キュー満杯で破棄したチャンクのスプールの区間IDのリストを受け取る関数 (spool_ids)。
+                停止時に未処理だったチャンクは渡さない（次回起動時に再認識される）
+        """
+        self.recognize_func = recognize_func
+        self.on_result = on_result
+        self.on_drop = on_drop
+
+        self.worker_count = max(1, worker_count or Config.RECOGNITION_WORKERS)
+        self.max_pending = max(1, max_pending or Config.RECOGNITION_QUEUE_SIZE)
+        self.overflow_policy = overflow_policy or Config.RECOGNITION_OVERFLOW_POLICY
+        if self.overflow_policy not in OverflowPolicy.ALL:
+            raise ValueError(f"不明なオーバーフローポリシー: {self.overflow_policy}")
+
+        # 待機キュー（[seq, audio_data, sample_rate, trace, utterance_id, spool_ids] のリスト）
+        self._pending = deque()
+        self._condition = threading.Condition()
+        self._workers = []
+        self._running = False
+        self._idle_workers = 0
+
+        # 連番と順序どおりの結果配信
+        self._next_seq = 0
+        self._next_emit_seq = 0
+        self._completed = {}
+        self._emit_lock = threading.Lock()
+
+        # 統計
+        self.dropped_count = 0
+        self.coalesced_count = 0
+
+    def start(self):
+        """ワーカースレッドを開始"""
+        with self._condition:
+            if self._running:
+                return
+            self._running = True
+
+        self._workers = []
+        for i in range(self.worker_count):
+            worker = threading.Thread(
+                target=self._worker_loop,
+                name=f"RecognitionWorker-{i}"
+            )
+            worker.daemon = True
+            worker.start()
+            self._workers.append(worker)
+
+    def stop(self, timeout=1.0):
+        """
+        ワーカースレッドを停止
+
+        Args:
+            timeout: 各スレッドの終了を待つ最大秒数
+        """
+        with self._condition:
+            if not self._running:
+                return
+            self._running = False
+            # 未処理のチャンクは破棄済みとして扱い、順序待ちを解消する
+            discarded = [(item[0], item[4]) for item in self._pending]
+            self._pending.clear()
+            self._condition.notify_all()
+
+        for seq, utterance_id in discarded:
+            self._complete(seq, None, utterance_id=utterance_id)
+
+        for worker in self._workers:
+            worker.join(timeout)
+        self._workers = []
+
+    def submit(self, audio_data, sample_rate, trace=None, utterance_id=None, spool_ids=None):
+        """
+        音声チャンクを認識キューに投入
+
+        Args:
+            audio_data: 音声データ（バイト列。リングバッファのmemoryviewは
+                空いているワーカーがすぐ受け取る場合のみそのまま渡し、待機キューに
+                並ぶ場合は上書きされる前にコピーして保持する）
+            sample_rate: サンプリングレート
+            trace: 遅延計測のトレース（計測しない場合はNone）
+            utterance_id: 発話ID（結果とともに on_result へ渡される）
+            spool_ids: チャンクを退避したスプールの区間IDのリスト（recognize_func へ渡される）
+
+        Returns:
+            int: 割り当てられた連番（連結された場合は連結先の連番。BLOCKポリシーで
+                空きを待つ間に停止した場合は投入せずNone）
+        """
+        if not self._running:
+            self.start()
+
+        dropped = None
+        with self._condition:
+            if len(self._pending) >= self.max_pending:
+                if self.overflow_policy == OverflowPolicy.BLOCK:
+                    while self._running and len(self._pending) >= self.max_pending:
+                        self._condition.wait(0.1)
+                    if not self._running:
+                        # 待っている間に停止した（投入しても認識されない）
+                        return None
+
+                elif self.overflow_policy == OverflowPolicy.COALESCE:
+                    newest = self._pending[-1]
+                    if newest[2] == sample_rate:
+                        newest[1] = bytes(newest[1]) + bytes(audio_data)
+                        if utterance_id is not None:
+                            # 連結後の結果は後の発話のものとして扱う
+                            newest[4] = utterance_id
+                        newest[5].extend(spool_ids or ())
+                        self.coalesced_count += 1
+                        return newest[0]
+                    dropped = self._pending.popleft()
+                    self.dropped_count += 1
+
+                else:
+                    dropped = self._pending.popleft()
+                    self.dropped_count += 1
+
+            if isinstance(audio_data, memoryview) and len(self._pending) >= self._idle_workers:
+                # 認識中のチャンクの後ろで待つ間にリングが一周しうる
+                audio_data = bytes(audio_data)
+
+            seq = self._next_seq
+            self._next_seq += 1
+            self._pending.append([seq, audio_data, sample_rate, trace, utterance_id, list(spool_ids or ())])
+            self._condition.notify()
+
+        if dropped is not None:
+            if dropped[5] and self.on_drop:
+                self.on_drop(dropped[5])
+            self._complete(dropped[0], None, utterance_id=dropped[4])
+
+        return seq
+
+    def pending_count(self):
+        """待機中のチャンク数を取得"""
+        with self._condition:
+            return len(self._pending)
+
+    def is_idle(self):
+        """投入したチャンクの結果をすべて配信し終えたか"""
+        with self._condition:
+            submitted = self._next_seq
+        with self._emit_lock:
+            return self._next_emit_seq >= submitted
+
+    def _worker_loop(self):
+        """ワーカースレッドのメインループ"""
+        while True:
+            with self._condition:
+                self._idle_workers += 1
+                while self._running and not self._pending:
+                    self._condition.wait()
+                self._idle_workers -= 1
+                if not self._running:
+                    return
+                seq, audio_data, sample_rate, trace, utterance_id, spool_ids = self._pending.popleft()
+                # BLOCKポリシーで待っている投入側を起こす
+                self._condition.notify_all()
+
+            if trace is not None:
+                trace.mark('dequeued')
+            try:
+                text = self.recognize_func(audio_data, sample_rate, spool_ids)
+            except Exception:
+                # エラー通知は recognize_func 側の責務。ワーカーは止めない
+                text = None
+            if trace is not None:
+                trace.mark('recognized')
+            self._complete(seq, text, trace, utterance_id)
+
+    def _complete(self, seq, text, trace=None, utterance_id=None):
+        """
+        チャンクの処理完了を記録し、順番が来た結果を配信
+
+        Args:
+            seq: チャンクの連番
+            text: 認識結果（結果なしの場合はNone）
+            trace: 遅延計測のトレース
+            utterance_id: 発話ID
+        """
+        with self._emit_lock:
+            self._completed[seq] = (text, trace, utterance_id)
+            while self._next_emit_seq in self._completed:
+                result, result_trace, result_utterance = self._completed.pop(self._next_emit_seq)
+                emit_seq = self._next_emit_seq
+                self._next_emit_seq += 1
+                if self.on_result:
+                    if result and result_trace is not None:
+                        result_trace.mark('ordered')
+                    self.on_result(emit_seq, result, result_trace, result_utterance)
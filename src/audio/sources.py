@@ -0,0 +1,362 @@
+# -*- coding: utf-8 -*-
+"""
+録音の入力元（マイク・音声ファイルの再生・合成音声）を管理するモジュール
+
+AudioRecorder は AudioSource を通して録音するため、マイクのない環境でも
+同じ録音・発話区間の検出・認識の経路を音声ファイルや合成音声で動かせる。
+再生は実時間・speed 倍速・録音側の処理に合わせた最速のいずれかで行う。
+"""
+
+import os
+import threading
+import time
+import wave
+
+import numpy as np
+
+from ..utils.config import Config
+
+SAMPLE_WIDTH = 2  # 16bit PCM
+
+
+class AudioSource:
+    """
+    録音の入力元の基底クラス
+
+    デバイス情報は PyAudio と同じキー（index, name, maxInputChannels, defaultSampleRate）の
+    辞書で表す。open が返すストリームは start_stream / stop_stream / is_active / close を持ち、
+    チャンクごとに callback(インターリーブされた16bit PCMのバイト列) を呼ぶ。
+    """
+
+    # 音声が実時間で届くか（False の入力元では録音側が処理に合わせて次のチャンクを待たせる）
+    realtime = True
+
+    def list_devices(self):
+        """
+        入力デバイスの一覧を取得
+
+        Returns:
+            list: デバイス情報の辞書のリスト
+        """
+        raise NotImplementedError
+
+    def get_device_info(self, device_index=None):
+        """
+        入力デバイスの情報を取得
+
+        Args:
+            device_index: デバイス番号（Noneは既定のデバイス）
+
+        Returns:
+            dict: デバイス情報
+        """
+        raise NotImplementedError
+
+    def is_format_supported(self, rate, device_index=None, channels=1):
+        """指定のサンプリングレート・チャンネル数で録音できるか"""
+        raise NotImplementedError
+
+    def open(self, rate, channels=1, device_index=None, frames_per_buffer=1024, callback=None):
+        """
+        入力ストリームを開く（開始は stream.start_stream()）
+
+        Args:
+            rate: サンプリングレート
+            channels: チャンネル数
+            device_index: デバイス番号（Noneは既定のデバイス）
+            frames_per_buffer: 1チャンクのフレーム数
+            callback: チャンクごとに呼ばれる関数 (音声データ)。
+                None の場合はマイクが使えるかの確認用に開くだけ
+
+        Returns:
+            入力ストリーム
+        """
+        raise NotImplementedError
+
+    def terminate(self):
+        """入力元を終了"""
+
+
+class PyAudioSource(AudioSource):
+    """PyAudio（実際のマイク）の入力元"""
+
+    def __init__(self, audio=None):
+        """
+        Args:
+            audio: 使う pyaudio.PyAudio（省略時は生成し、terminate で終了する。
+                同じ操作ができるオブジェクトでもよい）
+        """
+        # マイクを使わない入力元だけで動かす環境では pyaudio を読み込まない
+        import pyaudio
+        self._pyaudio = pyaudio
+        self._owns_audio = audio is None
+        self.audio = audio or pyaudio.PyAudio()
+
+    def list_devices(self):
+        devices = []
+        for index in range(self.audio.get_device_count()):
+            device_info = self.audio.get_device_info_by_index(index)
+            if device_info['maxInputChannels'] > 0:
+                devices.append(device_info)
+        return devices
+
+    def get_device_info(self, device_index=None):
+        if device_index is None:
+            return self.audio.get_default_input_device_info()
+        return self.audio.get_device_info_by_index(device_index)
+
+    def is_format_supported(self, rate, device_index=None, channels=1):
+        try:
+            return bool(self.audio.is_format_supported(
+                rate,
+                input_device=self.get_device_info(device_index)['index'],
+                input_channels=channels,
+                input_format=self._pyaudio.paInt16
+            ))
+        except ValueError:
+            # 非対応の場合 is_format_supported は ValueError を送出する
+            return False
+
+    def open(self, rate, channels=1, device_index=None, frames_per_buffer=1024, callback=None):
+        stream_callback = None
+        if callback is not None:
+            def stream_callback(in_data, frame_count, time_info, status):
+                callback(in_data)
+                return (in_data, self._pyaudio.paContinue)
+
+        return self.audio.open(
+            format=self._pyaudio.paInt16,
+            channels=channels,
+            rate=rate,
+            input=True,
+            input_device_index=device_index,
+            frames_per_buffer=frames_per_buffer,
+            stream_callback=stream_callback
+        )
+
+    def terminate(self):
+        if self._owns_audio:
+            self.audio.terminate()
+
+
+class ReplayStream:
+    """メモリ上の音声をチャンクごとにコールバックへ流す入力ストリーム"""
+
+    def __init__(self, pcm, rate, channels, frames_per_buffer, callback, speed=1.0, loop=False):
+        """
+        Args:
+            pcm: インターリーブされた16bit PCMのバイト列
+            rate: サンプリングレート
+            channels: チャンネル数
+            frames_per_buffer: 1チャンクのフレーム数
+            callback: チャンクごとに呼ばれる関数 (音声データ)
+            speed: 再生速度（1.0で実時間、Noneは待たずに流す）
+            loop: 終わりまで流したら先頭から繰り返すか
+        """
+        self.pcm = pcm
+        self.rate = rate
+        self.channels = channels
+        self.frames_per_buffer = frames_per_buffer
+        self.callback = callback
+        self.speed = speed
+        self.loop = loop
+        self.frames_played = 0
+        self._active = threading.Event()
+        self._thread = None
+
+    def start_stream(self):
+        if self.callback is None or self._active.is_set():
+            return
+        self._active.set()
+        self._thread = threading.Thread(target=self._run, name="ReplayStream")
+        self._thread.daemon = True
+        self._thread.start()
+
+    def _run(self):
+        chunk_bytes = self.frames_per_buffer * SAMPLE_WIDTH * self.channels
+        interval = self.frames_per_buffer / self.rate / self.speed if self.speed else 0.0
+        next_at = time.perf_counter()
+        position = 0
+        while self._active.is_set() and self.pcm:
+            if position >= len(self.pcm):
+                if not self.loop:
+                    break
+                position = 0
+            chunk = self.pcm[position:position + chunk_bytes]
+            position += len(chunk)
+            self.callback(chunk)
+            self.frames_played += len(chunk) // (SAMPLE_WIDTH * self.channels)
+            if interval:
+                # 遅れた分は待たずに取り戻す（平均の速度を保つ）
+                next_at += interval
+                delay = next_at - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+        self._active.clear()
+
+    def is_active(self):
+        return self._active.is_set()
+
+    def stop_stream(self):
+        self._active.clear()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(1.0)
+
+    def close(self):
+        self.stop_stream()
+
+
+class ReplaySource(AudioSource):
+    """
+    メモリ上の音声を仮想の入力デバイスとして流す入力元の基底クラス
+
+    デバイスごとに1つの音声を持ち、デバイス番号は0から順に割り当てる。
+    音声のサンプリングレート以外では録音できないものとして扱う（録音側で変換される）。
+    モノラルで開いた場合、複数チャンネルの音声はチャンネルの平均にする。
+    """
+
+    def __init__(self, speed=1.0, loop=False):
+        """
+        Args:
+            speed: 再生速度（1.0で実時間、Noneまたは0は録音側の処理に合わせて最速で流す）
+            loop: 終わりまで流したら先頭から繰り返すか
+        """
+        self.speed = speed or None
+        self.realtime = self.speed is not None
+        self.loop = loop
+        self.devices = []   # デバイス情報（'pcm' にインターリーブされた音声を持つ）
+        self.streams = []
+
+    def _add_device(self, name, pcm, rate, channels):
+        """仮想の入力デバイスを追加"""
+        self.devices.append({
+            'index': len(self.devices),
+            'name': name,
+            'maxInputChannels': channels,
+            'defaultSampleRate': float(rate),
+            'pcm': pcm,
+        })
+
+    def list_devices(self):
+        return [self.get_device_info(index) for index in range(len(self.devices))]
+
+    def get_device_info(self, device_index=None):
+        device = self.devices[device_index or 0]
+        return {key: value for key, value in device.items() if key != 'pcm'}
+
+    def is_format_supported(self, rate, device_index=None, channels=1):
+        device = self.devices[device_index or 0]
+        return rate == device['defaultSampleRate'] and channels in (1, device['maxInputChannels'])
+
+    def open(self, rate, channels=1, device_index=None, frames_per_buffer=1024, callback=None):
+        device = self.devices[device_index or 0]
+        if rate != device['defaultSampleRate']:
+            raise ValueError(f"{device['name']}: サンプリングレート {rate} Hz には対応していません")
+        pcm = device['pcm']
+        if channels != device['maxInputChannels']:
+            if channels != 1:
+                raise ValueError(f"{device['name']}: {channels} チャンネルでは開けません")
+            frames = np.frombuffer(pcm, dtype=np.int16).reshape(-1, device['maxInputChannels'])
+            pcm = frames.mean(axis=1).astype(np.int16).tobytes()
+
+        stream = ReplayStream(pcm, rate, channels, frames_per_buffer, callback, self.speed, self.loop)
+        if callback is not None:
+            self.streams.append(stream)
+        return stream
+
+    def terminate(self):
+        for stream in self.streams:
+            stream.close()
+        self.streams = []
+
+
+class FileSource(ReplaySource):
+    """WAVファイルを再生する入力元（ファイルごとに1つの仮想デバイス）"""
+
+    def __init__(self, paths, speed=1.0, loop=False):
+        """
+        Args:
+            paths: WAVファイル（16bit PCM）のパス、またはそのリスト
+            speed: 再生速度（1.0で実時間、Noneまたは0は録音側の処理に合わせて最速で流す）
+            loop: 終わりまで流したら先頭から繰り返すか
+
+        Raises:
+            OSError: ファイルを開けない場合
+            ValueError: WAVファイルでない、または 16bit PCM 以外の場合
+        """
+        super().__init__(speed, loop)
+        for path in [paths] if isinstance(paths, (str, os.PathLike)) else paths:
+            try:
+                with wave.open(os.fspath(path), 'rb') as wav_file:
+                    if wav_file.getsampwidth() != SAMPLE_WIDTH:
+                        raise ValueError(f"16bit PCM のWAVファイルのみ再生できます: {path}")
+                    self._add_device(
+                        os.path.basename(path),
+                        wav_file.readframes(wav_file.getnframes()),
+                        wav_file.getframerate(),
+                        wav_file.getnchannels()
+                    )
+            except (wave.Error, EOFError) as e:
+                raise ValueError(f"WAVファイルとして読み込めません: {path}（{e}）") from e
+
+
+class SyntheticSource(ReplaySource):
+    """発話らしい合成音声を流す入力元（デバイス・チャンネルごとに異なる音声）"""
+
+    def __init__(self, device_count=1, seconds=30.0, rate=None, channels=1, speed=1.0, loop=False, seed=0):
+        """
+        Args:
+            device_count: 仮想の入力デバイスの数
+            seconds: 各デバイスが流す音声の長さ（秒）
+            rate: サンプリングレート（省略時は Config.SAMPLE_RATE）
+            channels: 各デバイスのチャンネル数
+            speed: 再生速度（1.0で実時間、Noneまたは0は録音側の処理に合わせて最速で流す）
+            loop: 終わりまで流したら先頭から繰り返すか
+            seed: 乱数シード（同じ値なら同じ音声）
+        """
+        super().__init__(speed, loop)
+        rate = rate or Config.SAMPLE_RATE
+        for index in range(device_count):
+            channel_pcm = [
+                synthesize_speech(rate, seconds, seed=seed + index * channels + channel)
+                for channel in range(channels)
+            ]
+            # チャンネルごとの音声をサンプル単位で交互に並べる
+            pcm = np.column_stack(channel_pcm).astype(np.int16).tobytes()
+            self._add_device(f"合成音声{index}", pcm, rate, channels)
+
+
+def synthesize_speech(sample_rate, duration_sec, seed=0):
+    """
+    発話らしい音声を合成
+
+    基本周波数の揺らぐ倍音列に音節程度（約4Hz）の振幅変調をかけた発話と、
+    低レベルのノイズだけの無音区間を交互に並べる。
+
+    Args:
+        sample_rate: サンプリングレート
+        duration_sec: 全体の長さ（秒）
+        seed: 乱数シード
+
+    Returns:
+        numpy.ndarray: int16のモノラル音声
+    """
+    rng = np.random.default_rng(seed)
+    total = int(sample_rate * duration_sec)
+    audio = rng.normal(0, 30, total)  # 環境ノイズ
+
+    position = int(sample_rate * rng.uniform(0.3, 1.0))
+    while position < total:
+        length = int(sample_rate * rng.uniform(0.6, 2.5))
+        end = min(total, position + length)
+        t = np.arange(end - position) / sample_rate
+
+        f0 = rng.uniform(100, 220) * (1 + 0.05 * np.sin(2 * np.pi * 3 * t))
+        phase = 2 * np.pi * np.cumsum(f0) / sample_rate
+        voiced = sum(np.sin(k * phase) / k for k in range(1, 8))
+        envelope = 0.55 + 0.45 * np.sin(2 * np.pi * rng.uniform(3, 5) * t)
+        audio[position:end] += 3000 * voiced * envelope
+
+        position = end + int(sample_rate * rng.uniform(0.4, 1.5))
+
+    return np.clip(audio, -32768, 32767).astype(np.int16)
@@ -0,0 +1,314 @@
+# -*- coding: utf-8 -*-
+"""
+録音した発話区間のディスクへの退避（スプール）を管理するモジュール
+"""
+
+import os
+import struct
+import sys
+import threading
+import zlib
+
+from ..utils.config import Config
+
+if os.name == 'nt':
+    import msvcrt
+else:
+    import fcntl
+
+# レコードヘッダー: マジック, 種類, 区間ID, サンプリングレート, データ長, CRC32
+_HEADER = struct.Struct('<4sBQIII')
+_MAGIC = b'SPL1'
+_AUDIO = 1  # 発話区間の音声
+_DONE = 2   # 区間の認識完了（データなし）
+
+
+def _lock_exclusive(file):
+    """
+    ファイルを排他ロック（待たない）
+
+    ロックはファイルを閉じると解除される。
+
+    Raises:
+        OSError: 別のプロセスがロックしている場合
+    """
+    if os.name == 'nt':
+        file.seek(0)
+        msvcrt.locking(file.fileno(), msvcrt.LK_NBLCK, 1)
+    else:
+        fcntl.flock(file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+
+
+class AudioSpool:
+    """
+    発話区間を追記専用ファイルに退避するクラス
+
+    認識に送る区間をまず Config.SPOOL_FILE に追記し、結果が出たら完了レコードを
+    追記する。書き込みはバッファ経由の順次書き込みで、fsync は
+    Config.SPOOL_FSYNC_INTERVAL 秒ごとにまとめて行う（0以下なら書き込みごと）。起動時に完了していない
+    区間を読み戻して再認識でき、完了済みの領域が増えたら未完了の区間だけを
+    書き直して縮める。
+
+    スプールは同時に1つのプロセスだけが使う。開いている間はロックファイル
+    （スプールファイル名 + '.lock'）を排他ロックし、ほかのプロセスは開けない。
+    """
+
+    def __init__(self, path=None, fsync_interval=None, compact_bytes=None):
+        """
+        Args:
+            path: スプールファイルのパス
+            fsync_interval: fsync の間隔（秒、0以下なら書き込みごとに fsync）
+            compact_bytes: 完了済みの領域がこのサイズを超えたら縮める（バイト）
+        """
+        self.path = path or Config.SPOOL_FILE
+        self.fsync_interval = Config.SPOOL_FSYNC_INTERVAL if fsync_interval is None else fsync_interval
+        self.compact_bytes = compact_bytes or Config.SPOOL_COMPACT_BYTES
+
+        self._pending = {}       # 区間ID -> (データの位置, データ長, サンプリングレート)
+        self._next_id = 1
+        self._dead_bytes = 0     # 完了済みの区間と完了レコードが占めるバイト数
+        self._file = None
+        self._lock_file = None   # 開いている間ロックしているロックファイル
+        self._dirty = False
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._flusher = None
+
+    def open(self):
+        """
+        スプールファイルを開き、未完了の区間の索引を作る
+
+        途中で書き込みが途切れたレコード（異常終了時）は切り捨てる。
+
+        Raises:
+            OSError: 開けない場合、または別のプロセスが使用中の場合（未完了の区間は読み込まない）
+        """
+        with self._lock:
+            if self._file is not None:
+                return
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            lock_file = open(f"{self.path}.lock", 'a+b')
+            try:
+                _lock_exclusive(lock_file)
+            except OSError:
+                lock_file.close()
+                raise OSError(f"別のプロセスが使用中です: {self.path}") from None
+            try:
+                valid_size = self._scan()
+                self._file = open(self.path, 'ab')
+            except OSError:
+                lock_file.close()
+                raise
+            self._lock_file = lock_file
+            if self._file.tell() != valid_size:
+                self._file.truncate(valid_size)
+                self._file.seek(valid_size)
+
+        if self.fsync_interval <= 0:
+            return
+        self._stop_event.clear()
+        self._flusher = threading.Thread(target=self._flush_loop, name="AudioSpoolFlusher")
+        self._flusher.daemon = True
+        self._flusher.start()
+
+    def append(self, audio_data, sample_rate):
+        """
+        発話区間を追記
+
+        Args:
+            audio_data: 16bit PCMの音声データ（bytes-like）
+            sample_rate: サンプリングレート
+
+        Returns:
+            int: 区間ID（スプールを開いていない場合はNone）
+        """
+        with self._lock:
+            if self._file is None:
+                return None
+            segment_id = self._next_id
+            self._next_id += 1
+            offset = self._write_record(_AUDIO, segment_id, sample_rate, audio_data)
+            self._pending[segment_id] = (offset, len(audio_data), sample_rate)
+            if self.fsync_interval <= 0:
+                self._sync()
+            return segment_id
+
+    def confirm(self, segment_id):
+        """
+        区間の認識完了を記録（以降は読み戻し対象外）
+
+        Args:
+            segment_id: append() の戻り値（Noneの場合は何もしない）
+        """
+        if segment_id is None:
+            return
+        with self._lock:
+            entry = self._pending.pop(segment_id, None)
+            if entry is None or self._file is None:
+                return
+            self._write_record(_DONE, segment_id, 0, b'')
+            self._dead_bytes += _HEADER.size * 2 + entry[1]
+            if self.fsync_interval <= 0:
+                self._sync()
+                if self._dead_bytes > self.compact_bytes:
+                    self._compact()
+
+    def pending_count(self):
+        """未完了の区間数"""
+        with self._lock:
+            return len(self._pending)
+
+    def pending_ids(self):
+        """未完了の区間IDの一覧（古い順）"""
+        with self._lock:
+            return sorted(self._pending)
+
+    def read(self, segment_id):
+        """
+        未完了の区間の音声を読み込み
+
+        Args:
+            segment_id: 区間ID
+
+        Returns:
+            tuple: (音声データ, サンプリングレート)（完了済み・閉じた後はNone）
+        """
+        with self._lock:
+            entry = self._pending.get(segment_id)
+            if entry is None or self._file is None:
+                return None
+            offset, length, sample_rate = entry
+            # 圧縮でファイルが差し替わらないようロックしたまま読む
+            self._file.flush()
+            with open(self.path, 'rb') as file:
+                file.seek(offset)
+                return file.read(length), sample_rate
+
+    def close(self):
+        """
+        書き込みを確定してファイルを閉じる
+
+        未完了の区間がなければスプールファイルを削除する。
+        """
+        self._stop_event.set()
+        if self._flusher is not None:
+            self._flusher.join(2.0)
+            self._flusher = None
+
+        with self._lock:
+            if self._file is None:
+                return
+            self._sync()
+            self._file.close()
+            self._file = None
+            if not self._pending:
+                try:
+                    os.remove(self.path)
+                except OSError:
+                    pass
+                self._dead_bytes = 0
+            # ロックファイルは削除しない（削除すると別のプロセスが別のファイルをロックできてしまう）
+            self._lock_file.close()
+            self._lock_file = None
+
+    def _write_record(self, kind, segment_id, sample_rate, data):
+        """
+        レコードを追記（ロック取得済みで呼ぶ）
+
+        Returns:
+            int: データ部分のファイル内の位置
+        """
+        header = _HEADER.pack(_MAGIC, kind, segment_id, sample_rate, len(data), zlib.crc32(data))
+        self._file.write(header)
+        offset = self._file.tell()
+        self._file.write(data)
+        self._dirty = True
+        return offset
+
+    def _scan(self):
+        """
+        既存のスプールファイルから未完了の区間の索引を作る（ロック取得済みで呼ぶ）
+
+        Returns:
+            int: 正しく読めた末尾の位置
+        """
+        self._pending.clear()
+        self._dead_bytes = 0
+        if not os.path.exists(self.path):
+            return 0
+
+        valid_size = 0
+        with open(self.path, 'rb') as file:
+            while True:
+                header = file.read(_HEADER.size)
+                if len(header) < _HEADER.size:
+                    break
+                magic, kind, segment_id, sample_rate, length, crc = _HEADER.unpack(header)
+                if magic != _MAGIC:
+                    break
+                offset = file.tell()
+                data = file.read(length)
+                if len(data) < length or zlib.crc32(data) != crc:
+                    break
+
+                if kind == _AUDIO:
+                    self._pending[segment_id] = (offset, length, sample_rate)
+                elif kind == _DONE:
+                    entry = self._pending.pop(segment_id, None)
+                    self._dead_bytes += _HEADER.size * 2 + (entry[1] if entry else 0)
+                self._next_id = max(self._next_id, segment_id + 1)
+                valid_size = file.tell()
+
+        if valid_size:
+            print(f"スプールから未認識の区間を {len(self._pending)} 件読み込みました", file=sys.stderr)
+        return valid_size
+
+    def _flush_loop(self):
+        """一定間隔で fsync し、必要なら縮める"""
+        while not self._stop_event.wait(self.fsync_interval):
+            with self._lock:
+                if self._file is None:
+                    return
+                if self._dirty:
+                    self._sync()
+                if self._dead_bytes > self.compact_bytes:
+                    self._compact()
+
+    def _sync(self):
+        """バッファを書き出して fsync（ロック取得済みで呼ぶ）"""
+        try:
+            self._file.flush()
+            os.fsync(self._file.fileno())
+        except OSError as e:
+            print(f"スプール書き込みエラー: {e}", file=sys.stderr)
+        self._dirty = False
+
+    def _compact(self):
+        """未完了の区間だけを新しいファイルに書き直す（ロック取得済みで呼ぶ）"""
+        temp_path = f"{self.path}.compact"
+        self._file.flush()
+        try:
+            pending = {}
+            with open(self.path, 'rb') as source, open(temp_path, 'wb') as target:
+                for segment_id in sorted(self._pending):
+                    offset, length, sample_rate = self._pending[segment_id]
+                    source.seek(offset)
+                    data = source.read(length)
+                    target.write(_HEADER.pack(_MAGIC, _AUDIO, segment_id, sample_rate, length, zlib.crc32(data)))
+                    pending[segment_id] = (target.tell(), length, sample_rate)
+                    target.write(data)
+                target.flush()
+                os.fsync(target.fileno())
+
+            self._file.close()
+            os.replace(temp_path, self.path)
+        except OSError as e:
+            print(f"スプール圧縮エラー: {e}", file=sys.stderr)
+            return
+        finally:
+            if self._file.closed:
+                self._file = open(self.path, 'ab')
+
+        self._pending = pending
+        self._dead_bytes = 0
+        self._dirty = False
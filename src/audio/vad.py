@@ -0,0 +1,228 @@
+# -*- coding: utf-8 -*-
+"""
+音声区間検出（VAD）を管理するモジュール
+"""
+
+from collections import namedtuple
+
+import numpy as np
+
+from ..utils.config import Config
+
+# 発話区間（通算サンプル位置）。overlap は前の区間と重なる先頭のサンプル数、
+# continued は強制的に区切り、続きの区間を重ねて始めたか
+SpeechSegment = namedtuple('SpeechSegment', ['start', 'end', 'overlap', 'continued'])
+
+
+class VoiceActivityDetector:
+    """
+    ストリーミング型の音声区間検出クラス
+
+    16bit PCMを固定長フレームに分割し、フレームごとの短時間エネルギー（RMS）と
+    ゼロ交差率をNumPyでまとめて計算する。発話の開始前にプリロール分の音声を付け、
+    無音がハングオーバー時間続いた時点で1発話として切り出す。
+    最大長を超えた発話は強制的に区切り、境界をまたぐ単語が欠けないよう
+    次の区間を overlap_ms だけ前から始める（重なった部分の重複は OverlapStitcher で除く）。
+    noise_tracker を渡した場合は、計算した RMS で環境ノイズの推定を更新し、
+    その閾値で判定する（閾値は同じ推定器を参照する認識側と共有される）。
+    音声データ自体は保持せず、区間の通算サンプル位置だけを管理する。
+    """
+
+    def __init__(self, sample_rate, frame_ms=None, energy_threshold=None,
+                 zcr_max=None, hangover_ms=None, preroll_ms=None,
+                 min_speech_ms=None, max_segment_sec=None, overlap_ms=None, noise_tracker=None):
+        """
+        Args:
+            sample_rate: サンプリングレート
+            frame_ms: 判定フレーム長（ミリ秒）
+            energy_threshold: 発話とみなすRMSの下限
+            zcr_max: 発話とみなすゼロ交差率の上限（広帯域ノイズの除外用）
+            hangover_ms: 発話終了と判定するまでの無音時間（ミリ秒）
+            preroll_ms: 発話開始前に付け足す音声の長さ（ミリ秒）
+            min_speech_ms: 発話として出力する最小の有音時間（ミリ秒）
+            max_segment_sec: 1発話の最大長（秒）。超えた場合は強制的に区切る
+            overlap_ms: 強制的に区切った次の区間に重ねる長さ（ミリ秒、0は重ねない）
+            noise_tracker: 閾値を更新する NoiseFloorTracker（省略時は energy_threshold で固定）
+        """
+        self.sample_rate = sample_rate
+        frame_ms = frame_ms or Config.VAD_FRAME_MS
+        self.frame_size = max(1, int(sample_rate * frame_ms / 1000))
+
+        self.energy_threshold = energy_threshold if energy_threshold is not None else Config.VAD_ENERGY_THRESHOLD
+        self.zcr_max = zcr_max if zcr_max is not None else Config.VAD_ZCR_MAX
+        self.noise_tracker = noise_tracker
+        if noise_tracker is not None:
+            self.energy_threshold = noise_tracker.threshold
+
+        hangover_ms = hangover_ms if hangover_ms is not None else Config.VAD_HANGOVER_MS
+        preroll_ms = preroll_ms if preroll_ms is not None else Config.VAD_PREROLL_MS
+        min_speech_ms = min_speech_ms if min_speech_ms is not None else Config.VAD_MIN_SPEECH_MS
+        max_segment_sec = max_segment_sec or Config.PHRASE_TIME_LIMIT
+        overlap_ms = overlap_ms if overlap_ms is not None else Config.VAD_OVERLAP_MS
+
+        self.hangover_frames = int(hangover_ms / frame_ms)
+        self.min_speech_frames = max(1, int(min_speech_ms / frame_ms))
+        self.max_segment_frames = max(1, int(max_segment_sec * 1000 / frame_ms))
+
+        self.preroll_samples = max(0, int(preroll_ms / frame_ms)) * self.frame_size
+        # 重なりは区間の半分まで（区切りのたびに区間が進むように）
+        overlap_frames = min(max(0, int(overlap_ms / frame_ms)), self.max_segment_frames // 2)
+        self.overlap_samples = overlap_frames * self.frame_size
+        self.reset()
+
+    def reset(self, position=0):
+        """
+        検出状態を初期化
+
+        Args:
+            position: 次に入力される音声の通算サンプル位置
+        """
+        self._remainder = np.empty(0, dtype=np.int16)
+        self._position = position   # 次に判定するフレームの開始位置
+        self._floor = position      # プリロールで遡れる最も古い位置
+        self._in_speech = False
+        self._segment_start = 0
+        self._segment_frames = 0
+        self._speech_frames = 0
+        self._silence_run = 0
+        self._overlap = 0           # 進行中の区間の先頭が前の区間と重なるサンプル数
+
+    @property
+    def retain_from(self):
+        """
+        今後の発話区間に含まれうる最も古い通算サンプル位置
+
+        これより前の音声は呼び出し側で破棄してよい。
+        """
+        if self._in_speech:
+            return self._segment_start
+        return max(self._floor, self._position - self.preroll_samples)
+
+    @property
+    def active_segment(self):
+        """
+        進行中の発話区間（途中結果の認識用）
+
+        Returns:
+            tuple: (開始位置, 判定済みの位置)。発話中でない、または有音時間が
+                   最小長に満たない場合はNone
+        """
+        if not self._in_speech or self._speech_frames < self.min_speech_frames:
+            return None
+        return self._segment_start, self._position
+
+    def classify_frames(self, frames):
+        """
+        フレームごとに発話かどうかを判定
+
+        Args:
+            frames: (フレーム数, frame_size) のint16配列
+
+        Returns:
+            numpy.ndarray: フレームごとの判定結果（bool配列）
+        """
+        if len(frames) == 0:
+            return np.zeros(0, dtype=bool)
+
+        samples = frames.astype(np.float32)
+        rms = np.sqrt(np.mean(samples * samples, axis=1))
+        threshold = self.energy_threshold
+        if self.noise_tracker is not None:
+            threshold = self.noise_tracker.update(rms, frames.shape[1] / self.sample_rate)
+            self.energy_threshold = float(threshold[-1])
+
+        signs = np.signbit(frames)
+        crossings = np.count_nonzero(signs[:, 1:] != signs[:, :-1], axis=1)
+        zcr = crossings / max(1, frames.shape[1] - 1)
+
+        return (rms >= threshold) & (zcr <= self.zcr_max)
+
+    def process(self, audio_data):
+        """
+        音声データを追加し、確定した発話区間を取得
+
+        区間は音声そのものではなく通算サンプル位置で返すため、
+        呼び出し側はリングバッファなどから該当部分をコピーせずに参照できる。
+
+        Args:
+            audio_data: 16bit PCMの音声データ（bytes-like）
+
+        Returns:
+            list: 確定した発話区間（SpeechSegment）のリスト
+        """
+        samples = np.frombuffer(audio_data, dtype=np.int16)
+        if len(self._remainder):
+            samples = np.concatenate((self._remainder, samples))
+
+        frame_count = len(samples) // self.frame_size
+        used = frame_count * self.frame_size
+        frames = samples[:used].reshape(frame_count, self.frame_size)
+        self._remainder = samples[used:].copy()
+
+        segments = []
+        for is_speech in self.classify_frames(frames):
+            segment = self._update(is_speech)
+            if segment is not None:
+                segments.append(segment)
+
+        return segments
+
+    def flush(self):
+        """
+        進行中の発話区間を確定して取得（録音停止時に呼ぶ）
+
+        Returns:
+            SpeechSegment: 発話区間（発話がない場合はNone）
+        """
+        segment = None
+        if self._in_speech and (self._speech_frames >= self.min_speech_frames or self._overlap):
+            segment = SpeechSegment(self._segment_start, self._position, self._overlap, False)
+        self.reset(self._position + len(self._remainder))
+        return segment
+
+    def _update(self, is_speech):
+        """1フレーム分の状態遷移を行い、確定した発話区間を返す"""
+        frame_start = self._position
+        self._position += self.frame_size
+
+        if not self._in_speech:
+            if is_speech:
+                self._segment_start = max(self._floor, frame_start - self.preroll_samples)
+                self._segment_frames = (frame_start - self._segment_start) // self.frame_size + 1
+                self._in_speech = True
+                self._speech_frames = 1
+                self._silence_run = 0
+                self._overlap = 0
+            return None
+
+        self._segment_frames += 1
+        if is_speech:
+            self._speech_frames += 1
+            self._silence_run = 0
+        else:
+            self._silence_run += 1
+
+        if self._silence_run > self.hangover_frames:
+            # 自然な区切り（無音）で発話を確定
+            # （強制的に区切った続きは短くても出し、前の区間の結果を待たせない）
+            segment = None
+            if self._speech_frames >= self.min_speech_frames or self._overlap:
+                segment = SpeechSegment(self._segment_start, self._position, self._overlap, False)
+            self._floor = self._position
+            self._in_speech = False
+            self._speech_frames = 0
+            self._silence_run = 0
+            return segment
+
+        if self._segment_frames >= self.max_segment_frames:
+            # 長すぎる発話は強制的に区切り、次の区間を重ねて発話状態のまま継続
+            segment = SpeechSegment(self._segment_start, self._position, self._overlap,
+                                    self.overlap_samples > 0)
+            self._overlap = self.overlap_samples
+            self._segment_start = self._position - self._overlap
+            self._floor = self._segment_start
+            self._segment_frames = self._overlap // self.frame_size
+            self._speech_frames = 0
+            return segment
+
+        return None
@@ -0,0 +1,11 @@
+# src/cli/__init__.py
+# -*- coding: utf-8 -*-
+"""
+コマンドライン（GUIなし）実行関連モジュール
+"""
+
+from .batch import BatchTranscriber, run_batch
+from .headless import HeadlessTranscriber, run_headless
+from .search import run_search
+
+__all__ = ['BatchTranscriber', 'run_batch', 'HeadlessTranscriber', 'run_headless', 'run_search']
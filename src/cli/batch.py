@@ -0,0 +1,407 @@
+# -*- coding: utf-8 -*-
+"""
+録音済み音声ファイルの一括文字起こしを管理するモジュール
+"""
+
+import glob
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import speech_recognition as sr
+
+from ..audio.backends import create_backend
+from ..audio.cache import RecognitionCache
+from ..audio.codec import EncodedAudio
+from ..audio.overlap import stitch_overlap
+from ..audio.resampler import PolyphaseResampler
+from ..audio.resilience import call_with_retry
+from ..audio.vad import VoiceActivityDetector
+from ..utils.config import Config
+from ..utils.file_handler import FileHandler
+
+AUDIO_EXTENSIONS = ('.wav', '.aif', '.aiff', '.flac')
+
+# ワーカープロセスごとのバックエンドとキャッシュ
+_worker_backend = None
+_worker_cache = None
+
+
+def expand_inputs(inputs):
+    """
+    ディレクトリ・globパターン・ファイルパスを音声ファイルの一覧に展開
+
+    Args:
+        inputs: パスまたはパターンのリスト
+
+    Returns:
+        list: 音声ファイルのパス（重複なし、指定順）
+    """
+    paths = []
+    for item in inputs:
+        if os.path.isdir(item):
+            pattern = os.path.join(item, '**', '*')
+            candidates = sorted(glob.glob(pattern, recursive=True))
+        elif glob.has_magic(item):
+            candidates = sorted(glob.glob(item, recursive=True))
+        else:
+            candidates = [item]
+
+        for path in candidates:
+            if os.path.isfile(path) and path.lower().endswith(AUDIO_EXTENSIONS) and path not in paths:
+                paths.append(path)
+    return paths
+
+
+def output_stems(paths):
+    """
+    音声ファイルごとの出力ファイル名（拡張子なし）を決める
+
+    通常は音声ファイル名のまま。別のディレクトリにある同名のファイルは
+    共通の親ディレクトリからの相対パス（区切りは '_'）にし、それでも重なる
+    場合は連番を付けて、互いに上書きしないようにする。
+
+    Args:
+        paths: 音声ファイルのパスのリスト
+
+    Returns:
+        list: paths と同じ順の出力ファイル名
+    """
+    stems = [os.path.splitext(os.path.basename(path))[0] for path in paths]
+    counts = {}
+    for stem in stems:
+        counts[stem] = counts.get(stem, 0) + 1
+
+    duplicated = [index for index, stem in enumerate(stems) if counts[stem] > 1]
+    if duplicated:
+        root = os.path.commonpath([os.path.dirname(os.path.abspath(paths[index])) for index in duplicated])
+        for index in duplicated:
+            relative = os.path.relpath(os.path.splitext(os.path.abspath(paths[index]))[0], root)
+            stems[index] = relative.replace(os.sep, '_')
+
+    used = set()
+    for index, stem in enumerate(stems):
+        candidate = stem
+        number = 2
+        while candidate in used:
+            candidate = f"{stem}_{number}"
+            number += 1
+        stems[index] = candidate
+        used.add(candidate)
+    return stems
+
+
+def iter_file_segments(path, sample_rate=None, info=None):
+    """
+    音声ファイルを少しずつ読み込み、発話区間ごとに切り出す
+
+    ファイル全体をメモリに載せず、VADが参照しうる範囲だけを保持する。
+
+    Args:
+        path: 音声ファイルのパス
+        sample_rate: 認識に渡すサンプリングレート（省略時は Config.SAMPLE_RATE）
+        info: 指定した場合、読み込み終了時に 'duration'（秒）を格納する辞書
+
+    Yields:
+        tuple: (開始秒, 終了秒, 16bit PCMデータ)（長い発話を区切った区間は前の区間と重なる）
+    """
+    sample_rate = sample_rate or Config.SAMPLE_RATE
+
+    with sr.AudioFile(path) as source:
+        file_rate = source.SAMPLE_RATE
+        file_width = source.SAMPLE_WIDTH
+        resampler = PolyphaseResampler(file_rate, sample_rate) if file_rate != sample_rate else None
+
+        vad = VoiceActivityDetector(sample_rate)
+        pending = bytearray()
+        pending_start = 0  # pending 先頭の通算サンプル位置
+
+        def take(start, end):
+            data = bytes(pending[(start - pending_start) * 2:(end - pending_start) * 2])
+            return start / sample_rate, end / sample_rate, data
+
+        while True:
+            data = source.stream.read(file_rate)  # 約1秒ずつ（モノラルに変換済み）
+            if not data:
+                break
+            if file_width != 2:
+                data = sr.AudioData(data, file_rate, file_width).get_raw_data(convert_width=2)
+            if resampler:
+                data = resampler.process(data).tobytes()
+
+            pending += data
+            for segment in vad.process(data):
+                yield take(segment.start, segment.end)
+
+            # 今後の区間に含まれない古い音声を破棄
+            drop = vad.retain_from - pending_start
+            if drop > 0:
+                del pending[:drop * 2]
+                pending_start += drop
+
+        total = pending_start + len(pending) // 2
+        tail = vad.flush()
+        if tail:
+            yield take(tail.start, tail.end)
+
+        if info is not None:
+            info['duration'] = total / sample_rate
+
+
+def _init_worker(backend_name, use_cache):
+    """ワーカープロセスの初期化"""
+    global _worker_backend, _worker_cache
+    _worker_backend = create_backend(backend_name)
+    _worker_cache = RecognitionCache() if use_cache else None
+
+
+def _recognize_segment(audio_data, sample_rate, language):
+    """
+    1区間を認識（ワーカープロセスで実行）
+
+    Returns:
+        tuple: (認識結果またはNone, エラーメッセージまたはNone)
+    """
+    # 再試行時は符号化結果を使い回す
+    audio = EncodedAudio(audio_data, sample_rate, 2)
+
+    def recognize():
+        if _worker_cache is not None:
+            return _worker_cache.recognize_with(_worker_backend, audio, language)
+        return _worker_backend.recognize(audio, language)
+
+    try:
+        return call_with_retry(recognize), None
+    except sr.UnknownValueError:
+        return None, None
+    except sr.RequestError as e:
+        return None, f"音声認識サービスエラー: {str(e)}"
+    except Exception as e:
+        return None, f"音声データ認識エラー: {str(e)}"
+
+
+def format_offset(seconds):
+    """音声先頭からの経過時間を [HH:MM:SS] 形式に変換"""
+    seconds = int(seconds)
+    return f"{seconds // 3600:02d}:{seconds % 3600 // 60:02d}:{seconds % 60:02d}"
+
+
+class BatchTranscriber:
+    """
+    音声ファイルを一括で文字起こしするクラス
+
+    ファイルを発話区間に分割し、プロセスプールで並列に認識する。
+    投入済みで未完了の区間数に上限を設け、認識が追いつかない場合は
+    ファイルの読み込みを待たせる（バックプレッシャー）。
+    """
+
+    def __init__(self, output_dir=None, workers=None, backend_name=None,
+                 language=None, use_cache=None, max_in_flight=None):
+        """
+        Args:
+            output_dir: 文字起こし結果の出力先（省略時は Config.OUTPUT_DIR）
+            workers: ワーカープロセス数
+            backend_name: 認識バックエンド名
+            language: 認識言語
+            use_cache: 認識結果キャッシュを使うか
+            max_in_flight: 同時に投入しておく区間数の上限
+        """
+        self.output_dir = output_dir or Config.OUTPUT_DIR
+        self.workers = workers or Config.BATCH_WORKERS
+        self.backend_name = backend_name or Config.RECOGNITION_BACKEND
+        self.language = language or Config.RECOGNITION_LANGUAGE
+        self.use_cache = Config.RECOGNITION_CACHE_ENABLED if use_cache is None else use_cache
+        self.max_in_flight = max_in_flight or self.workers * Config.BATCH_IN_FLIGHT_PER_WORKER
+
+        # コールバック関数
+        self.on_progress = None    # 進捗更新時のコールバック
+        self.on_file_done = None   # 1ファイル完了時のコールバック
+        self.on_error = None       # エラー発生時のコールバック
+
+    def set_callbacks(self, on_progress=None, on_file_done=None, on_error=None):
+        """
+        コールバック関数を設定
+
+        Args:
+            on_progress: 進捗更新時に呼ばれる関数 (stats)
+            on_file_done: 1ファイル完了時に呼ばれる関数 (音声ファイルパス, 出力パス)
+            on_error: エラー発生時に呼ばれる関数 (メッセージ)
+        """
+        self.on_progress = on_progress
+        self.on_file_done = on_file_done
+        self.on_error = on_error
+
+    def run(self, paths):
+        """
+        一括文字起こしを実行
+
+        Args:
+            paths: 音声ファイルのパスのリスト
+
+        Returns:
+            dict: 処理統計（ファイル数、区間数、エラー数、音声秒数、経過秒数、
+                  処理速度 = 音声秒数 / 経過秒数）
+        """
+        stats = {
+            'files': len(paths),
+            'files_done': 0,
+            'segments_submitted': 0,
+            'segments_done': 0,
+            'errors': 0,             # 認識・読み込み・書き出しに失敗した数
+            'speech_seconds': 0.0,   # 認識に送った区間の合計秒数
+            'audio_seconds': 0.0,    # 完了したファイルの合計秒数
+            'elapsed': 0.0,
+            'throughput': 0.0,
+        }
+        # ファイル番号 -> {'total': 区間数（確定前はNone）, 'results': {区間番号: (開始秒, 終了秒, テキスト)}}
+        files = {}
+        in_flight = {}
+        stems = output_stems(paths)
+        started = time.perf_counter()
+
+        def handle(done):
+            for future in done:
+                file_index, segment_index, start_sec, end_sec = in_flight.pop(future)
+                try:
+                    text, error = future.result()
+                except Exception as e:
+                    text, error = None, f"ワーカーエラー: {str(e)}"
+                if error:
+                    stats['errors'] += 1
+                    if self.on_error:
+                        self.on_error(f"{paths[file_index]}: {error}")
+
+                files[file_index]['results'][segment_index] = (start_sec, end_sec, text)
+                stats['segments_done'] += 1
+                stats['speech_seconds'] += end_sec - start_sec
+                self._finish_if_complete(paths, stems, files, file_index, stats)
+
+            stats['elapsed'] = time.perf_counter() - started
+            stats['throughput'] = stats['audio_seconds'] / stats['elapsed'] if stats['elapsed'] else 0.0
+            if self.on_progress:
+                self.on_progress(dict(stats))
+
+        with ProcessPoolExecutor(
+            max_workers=self.workers,
+            initializer=_init_worker,
+            initargs=(self.backend_name, self.use_cache)
+        ) as executor:
+            for file_index, path in enumerate(paths):
+                files[file_index] = {'total': None, 'results': {}, 'duration': 0.0}
+                segment_count = 0
+                try:
+                    for start_sec, end_sec, data in iter_file_segments(path, info=files[file_index]):
+                        # 上限に達したら完了を待ってから次を投入
+                        while len(in_flight) >= self.max_in_flight:
+                            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                            handle(done)
+
+                        future = executor.submit(_recognize_segment, data, Config.SAMPLE_RATE, self.language)
+                        in_flight[future] = (file_index, segment_count, start_sec, end_sec)
+                        segment_count += 1
+                        stats['segments_submitted'] += 1
+                except Exception as e:
+                    stats['errors'] += 1
+                    if self.on_error:
+                        self.on_error(f"{path}: 読み込みエラー: {str(e)}")
+
+                files[file_index]['total'] = segment_count
+                self._finish_if_complete(paths, stems, files, file_index, stats)
+
+            while in_flight:
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                handle(done)
+
+        stats['elapsed'] = time.perf_counter() - started
+        stats['throughput'] = stats['audio_seconds'] / stats['elapsed'] if stats['elapsed'] else 0.0
+        return stats
+
+    def _finish_if_complete(self, paths, stems, files, file_index, stats):
+        """ファイルの全区間が揃っていれば文字起こし結果を書き出す"""
+        state = files[file_index]
+        if state['total'] is None or len(state['results']) < state['total'] or state.get('written'):
+            return
+
+        # 長い発話を重ねて区切った区間は、前の区間の結果との重複を除く
+        entries = []
+        previous_end = None
+        for segment_index in range(state['total']):
+            start_sec, end_sec, text = state['results'][segment_index]
+            if entries and start_sec < previous_end:
+                overlap = previous_end - start_sec
+                entries[-1][1], text = stitch_overlap(
+                    entries[-1][1], text,
+                    overlap / (previous_end - entries[-1][0]), overlap / (end_sec - start_sec)
+                )
+            entries.append([start_sec, text])
+            previous_end = end_sec
+
+        lines = [f"[{format_offset(start_sec)}] {text}" for start_sec, text in entries if text]
+
+        output_path = FileHandler.save_transcript(
+            "\n".join(lines), paths[file_index], self.output_dir, stems[file_index]
+        )
+        if output_path is None:
+            stats['errors'] += 1
+            if self.on_error:
+                self.on_error(f"{paths[file_index]}: 文字起こし結果を書き出せませんでした")
+        state['written'] = True
+        state['results'].clear()
+        stats['files_done'] += 1
+        stats['audio_seconds'] += state['duration']
+        if output_path is not None and self.on_file_done:
+            self.on_file_done(paths[file_index], output_path)
+
+
+def run_batch(args):
+    """
+    batch サブコマンドを実行
+
+    Args:
+        args: argparse の解析結果
+
+    Returns:
+        int: 終了コード
+    """
+    paths = expand_inputs(args.inputs)
+    if not paths:
+        print("対象の音声ファイルが見つかりません。")
+        return 1
+
+    Config.ensure_directories()
+    transcriber = BatchTranscriber(
+        output_dir=args.output_dir,
+        workers=args.workers,
+        backend_name=args.backend,
+        language=args.language,
+        use_cache=not args.no_cache
+    )
+
+    for path, stem in zip(paths, output_stems(paths)):
+        if stem != os.path.splitext(os.path.basename(path))[0]:
+            print(f"同名のファイルがあるため出力名を変更します: {path} -> {stem}{Config.DEFAULT_SAVE_FORMAT}")
+
+    def on_progress(stats):
+        print(f"\r区間 {stats['segments_done']}/{stats['segments_submitted']} "
+              f"ファイル {stats['files_done']}/{stats['files']} "
+              f"({stats['throughput']:.1f} 音声秒/秒)", end="", flush=True)
+
+    def on_file_done(path, output_path):
+        print(f"\n完了: {path} -> {output_path}")
+
+    def on_error(message):
+        print(f"\nエラー: {message}")
+
+    transcriber.set_callbacks(on_progress, on_file_done, on_error)
+
+    print(f"{len(paths)} ファイルを {transcriber.workers} プロセスで文字起こしします"
+          f"（バックエンド: {transcriber.backend_name}）")
+    stats = transcriber.run(paths)
+
+    print()
+    print(f"音声 {stats['audio_seconds']:.1f} 秒 / 経過 {stats['elapsed']:.1f} 秒 "
+          f"（{stats['throughput']:.1f} 音声秒/秒）")
+    if stats['errors']:
+        print(f"エラーが {stats['errors']} 件ありました。")
+        return 1
+    return 0
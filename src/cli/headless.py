@@ -0,0 +1,270 @@
+# -*- coding: utf-8 -*-
+"""
+GUIなしの連続音声認識を管理するモジュール
+
+tkinter を読み込まず、録音から認識までGUIと同じ AudioRecorder /
+SpeechRecognizer の処理経路を使って認識結果を逐次出力する。
+"""
+
+import json
+import sys
+import threading
+import time
+from datetime import datetime
+from functools import partial
+
+from ..audio.http_pool import format_connection_stats
+from ..audio.multi_device import MultiDeviceRecorder, create_recorder
+from ..audio.pipeline import RecognitionPipeline
+from ..audio.recognizer import ResultKind, SpeechRecognizer
+from ..audio.scheduler import OverflowPolicy
+from ..audio.sources import FileSource
+from ..utils.config import Config
+from ..utils.tracing import tracer
+from ..utils.transcript_store import open_transcript_store
+
+
+class HeadlessTranscriber:
+    """認識結果を標準出力（テキストまたはJSONL）に流すクラス"""
+
+    def __init__(self, output=None, output_format='text', backend_name=None, language=None,
+                 device_indexes=None, channels=None, pipeline=None, audio_source=None):
+        """
+        Args:
+            output: 出力先のファイルオブジェクト（省略時は標準出力）
+            output_format: 'text'（[時刻] テキスト）または 'jsonl'
+            backend_name: 認識バックエンド名
+            language: 認識言語
+            device_indexes: 録音する入力デバイスの番号のリスト（省略時は Config.INPUT_DEVICES）
+            channels: 録音するチャンネル数（省略時は Config.INPUT_CHANNELS）
+            pipeline: 連続認識の処理方式 'threads' / 'asyncio'（省略時は Config.RECOGNITION_PIPELINE）
+            audio_source: 録音の入力元（AudioSource。省略時はマイク）。音声ファイルの再生など
+                終わりのある入力元では、最後まで認識したら終了する
+        """
+        self.output = output or sys.stdout
+        self.output_format = output_format
+        self._write_lock = threading.Lock()
+        self._stop_event = threading.Event()
+
+        # 実時間でない入力元（最速再生）では区間を破棄せず、認識が空くまで録音側を待たせる
+        realtime = audio_source is None or audio_source.realtime
+        overflow_policy = None if realtime else OverflowPolicy.BLOCK
+
+        # 連続認識には一回認識用のマイク（と環境音の調整）は不要
+        self.audio_recorder = create_recorder(device_indexes, channels, audio_source)
+        self.speech_recognizer = SpeechRecognizer(use_microphone=False, overflow_policy=overflow_policy)
+        self.speech_recognizer.set_merged_sources(self.audio_recorder.merged_sources)
+        # 発話とみなす閾値は録音側の環境ノイズの推定と共有する
+        self.speech_recognizer.set_noise_tracker(self.audio_recorder.noise_tracker)
+        self.transcript_store = open_transcript_store()
+        if backend_name:
+            self.speech_recognizer.set_backend(backend_name)
+        if language:
+            self.speech_recognizer.set_language(language)
+
+        self.speech_recognizer.set_callbacks(
+            on_recognition_result=self._on_recognition_result,
+            on_error=self._on_error,
+            on_backend_status=self._on_backend_status
+        )
+        self._last_backend_state = None
+
+        # asyncio パイプラインでは録音チャンクをそのまま渡し、確定結果を購読する
+        self.pipeline = None
+        if (pipeline or Config.RECOGNITION_PIPELINE) == 'asyncio':
+            # 言語は区間ごとに読む（認識中に set_language で切り替えられる）
+            self.pipeline = RecognitionPipeline(
+                self.speech_recognizer.backend, lambda: self.speech_recognizer.language,
+                self.audio_recorder.rate
+            )
+            self.pipeline.set_callbacks(on_error=self._on_error, on_backend_status=self._on_backend_status)
+            self.pipeline.subscribe(self._on_recognition_result)
+            self.audio_recorder.set_callbacks(
+                on_error=self._on_error,
+                on_captured_audio=self.pipeline.feed if realtime else partial(self.pipeline.feed, block=True)
+            )
+        else:
+            self.audio_recorder.set_callbacks(
+                on_audio_data=self._on_audio_data,
+                on_error=self._on_error
+            )
+
+    def run(self):
+        """
+        録音を開始し、停止されるまで認識結果を出力
+
+        Returns:
+            int: 終了コード
+        """
+        # 前回結果が出なかった録音を再認識
+        self.speech_recognizer.replay_spool()
+        if self.pipeline is not None:
+            self.pipeline.start()
+        if not self.audio_recorder.start_recording():
+            return 1
+
+        try:
+            while not self._stop_event.wait(0.5):
+                if self.audio_recorder.input_finished:
+                    self._finish_input()
+                    break
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.cleanup()
+        return 0
+
+    def stop(self):
+        """実行を停止"""
+        self._stop_event.set()
+
+    def _finish_input(self):
+        """入力元の音声が終わったら、話途中の発話を確定させて認識が済むのを待つ"""
+        print("入力の音声が終わりました。認識が済むのを待っています", file=sys.stderr, flush=True)
+        self.audio_recorder.stop_recording()
+        if self.pipeline is not None:
+            self.pipeline.end_streams()
+            drained = self.pipeline.drain(Config.HEADLESS_DRAIN_TIMEOUT)
+        else:
+            drained = self.speech_recognizer.drain(Config.HEADLESS_DRAIN_TIMEOUT)
+        if not drained:
+            self._on_error(f"{Config.HEADLESS_DRAIN_TIMEOUT} 秒以内に認識が済みませんでした")
+
+    def cleanup(self):
+        """リソースのクリーンアップ"""
+        self.audio_recorder.cleanup()
+        if self.pipeline is not None:
+            # 録音を止めてから進行中の発話を確定させ、配信が済むのを待つ
+            self.pipeline.stop()
+        self.speech_recognizer.cleanup()
+        if self.transcript_store is not None:
+            self.transcript_store.close()
+        tracer.close()
+
+    def format_result(self, text, timestamp=None, source=None):
+        """
+        認識結果を出力形式の1行に変換
+
+        Args:
+            text: 認識結果
+            timestamp: 認識時刻（省略時は現在時刻）
+            source: 入力元の名前（複数デバイス録音時）
+
+        Returns:
+            str: 出力する1行（改行なし）
+        """
+        timestamp = timestamp or datetime.now()
+        if self.output_format == 'jsonl':
+            record = {
+                'time': timestamp.isoformat(timespec='milliseconds'),
+                'text': text,
+                'language': self.speech_recognizer.language,
+            }
+            if source:
+                record['source'] = source
+            return json.dumps(record, ensure_ascii=False)
+        if source:
+            return f"[{timestamp.strftime('%H:%M:%S')}] [{source}] {text}"
+        return f"[{timestamp.strftime('%H:%M:%S')}] {text}"
+
+    # コールバック関数
+    def _on_audio_data(self, audio_data, trace=None, utterance_id=None, source=None,
+                       overlap=0, continued=False):
+        """音声データ受信時の処理"""
+        # 発話IDは複数チャンネルの合流と重ねた区間のつなぎ合わせに使う
+        self.speech_recognizer.recognize_from_audio_data(
+            audio_data, self.audio_recorder.rate, trace, utterance_id, source,
+            overlap=overlap, continued=continued
+        )
+
+    def _on_recognition_result(self, text, trace=None, kind=ResultKind.FINAL, utterance_id=None,
+                               source=None):
+        """音声認識結果受信時の処理（出力は確定結果のみ）"""
+        if kind != ResultKind.FINAL or not text.strip():
+            return
+        if trace is not None:
+            trace.mark('queued_ui')
+        with self._write_lock:
+            self.output.write(self.format_result(text, source=source) + "\n")
+            self.output.flush()
+        if self.transcript_store is not None:
+            self.transcript_store.add(
+                text, source=source, language=self.speech_recognizer.language,
+                audio_offset=utterance_id,
+                sample_rate=self.audio_recorder.rate if utterance_id is not None else None
+            )
+        if trace is not None:
+            trace.mark('displayed')
+            tracer.finish(trace)
+
+    def _on_backend_status(self, state, parked_count):
+        """バックエンドの状態が変わったときだけ標準エラーへ表示"""
+        if state == self._last_backend_state:
+            return
+        self._last_backend_state = state
+        print(f"バックエンド: {state}（保留 {parked_count} 件）", file=sys.stderr, flush=True)
+
+    def _on_error(self, error_message):
+        """エラー発生時の処理（結果の出力を汚さないよう標準エラーへ）"""
+        print(f"エラー: {error_message}", file=sys.stderr, flush=True)
+
+
+def run_headless(args, process_started_at=None):
+    """
+    ヘッドレスモードを実行
+
+    Args:
+        args: argparse の解析結果
+        process_started_at: プロセス起動時の time.perf_counter() の値
+
+    Returns:
+        int: 終了コード
+    """
+    process_started_at = process_started_at or time.perf_counter()
+
+    # マイクの代わりに音声ファイルを再生して認識する（--replay-speed 0 は処理に合わせて最速）
+    audio_source = None
+    if args.replay:
+        try:
+            audio_source = FileSource(args.replay, speed=args.replay_speed)
+        except (OSError, ValueError) as e:
+            print(f"エラー: 再生する音声ファイルを読み込めません: {e}", file=sys.stderr, flush=True)
+            return 1
+
+    transcriber = HeadlessTranscriber(
+        output_format=args.format,
+        backend_name=args.backend,
+        language=args.language,
+        device_indexes=args.devices,
+        channels=args.channels,
+        pipeline=args.pipeline,
+        audio_source=audio_source
+    )
+
+    startup = time.perf_counter() - process_started_at
+    within_budget = startup <= Config.HEADLESS_STARTUP_BUDGET
+    print(f"起動時間: {startup * 1000:.0f} ms（予算 {Config.HEADLESS_STARTUP_BUDGET * 1000:.0f} ms"
+          f"{'' if within_budget else '、超過'}）", file=sys.stderr, flush=True)
+
+    if args.check_startup:
+        transcriber.cleanup()
+        return 0 if within_budget else 1
+
+    print("認識を開始しました（Ctrl+C で終了）", file=sys.stderr, flush=True)
+    started = time.perf_counter()
+    exit_code = transcriber.run()
+    if audio_source is not None:
+        seconds = transcriber.audio_recorder.captured_seconds
+        elapsed = time.perf_counter() - started
+        print(f"再生: 音声 {seconds:.1f} 秒を {elapsed:.1f} 秒で処理（{seconds / max(elapsed, 1e-9):.1f} 倍速）",
+              file=sys.stderr, flush=True)
+        audio_source.terminate()
+    if isinstance(transcriber.audio_recorder, MultiDeviceRecorder):
+        print(transcriber.audio_recorder.format_report(transcriber.speech_recognizer),
+              file=sys.stderr, flush=True)
+    stats = transcriber.speech_recognizer.backend.connection_stats()
+    if stats and stats['requests']:
+        print(format_connection_stats(stats), file=sys.stderr, flush=True)
+    if tracer.enabled:
+        print(tracer.format_summary(), file=sys.stderr, flush=True)
+    return exit_code
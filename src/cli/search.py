@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+"""
+蓄積した認識結果を検索するコマンド
+
+認識結果データベース（TranscriptStore）を全文検索し、該当する区間を新しい順に表示する。
+--import で保存済みのテキストファイル（output/*.txt）を取り込んでから検索できる。
+"""
+
+import sys
+import time
+from datetime import datetime
+
+from ..utils.config import Config
+from ..utils.transcript_store import TranscriptStore
+
+
+def format_segment(segment):
+    """
+    検索結果の区間を表示用の1行に変換
+
+    Args:
+        segment: TranscriptStore.search が返す区間の辞書
+
+    Returns:
+        str: [日時] [入力元] テキスト
+    """
+    timestamp = datetime.fromtimestamp(segment['recorded_at']).strftime("%Y-%m-%d %H:%M:%S")
+    if segment['source']:
+        return f"[{timestamp}] [{segment['source']}] {segment['text']}"
+    return f"[{timestamp}] {segment['text']}"
+
+
+def run_search(args):
+    """
+    search サブコマンドを実行
+
+    Args:
+        args: argparse の解析結果
+
+    Returns:
+        int: 終了コード
+    """
+    Config.ensure_directories()
+    store = TranscriptStore()
+    try:
+        if args.import_files is not None:
+            start = time.perf_counter()
+            imported = store.import_text_files(args.import_files or None)
+            print(f"{imported} 区間を取り込みました（{time.perf_counter() - start:.1f} 秒）",
+                  file=sys.stderr)
+
+        query = " ".join(args.query)
+        if not query and args.import_files is not None:
+            return 0
+
+        # --since は main.py の parse_date でUNIX時刻に変換済み
+        start = time.perf_counter()
+        segments = store.search(query, limit=args.limit, source=args.source, since=args.since)
+        elapsed = time.perf_counter() - start
+
+        for segment in segments:
+            print(format_segment(segment))
+        print(f"{len(segments)} 件（全 {store.count()} 区間、{elapsed * 1000:.1f} ms）", file=sys.stderr)
+        return 0 if segments else 1
+    finally:
+        store.close()
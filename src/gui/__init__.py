@@ -4,7 +4,11 @@
 GUI関連モジュール
 """
 
+from .file_task import BackgroundFileTask
 from .main_window import MainWindow
 from .styles import AppStyles
+from .text_appender import BatchedTextAppender
+from .transcript_model import TranscriptModel
+from .transcript_view import TranscriptView
 
-__all__ = ['MainWindow', 'AppStyles']
\ No newline at end of file
+__all__ = ['MainWindow', 'BackgroundFileTask', 'AppStyles', 'BatchedTextAppender', 'TranscriptModel', 'TranscriptView']
\ No newline at end of file
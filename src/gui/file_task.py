@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+"""
+ファイルの保存・読み込みをバックグラウンドで行うモジュール
+"""
+
+import queue
+import threading
+import time
+
+from ..utils.config import Config
+
+
+class BackgroundFileTask:
+    """
+    ファイルの読み書きをワーカースレッドで行い、結果をUIスレッドへ少しずつ渡すクラス
+
+    work はワーカースレッドで (emit, progress, cancel_event) を受け取って実行される。
+    emit で渡したまとまりは、UIスレッドで Config.FILE_TASK_POLL_MS ごとに
+    Config.FILE_TASK_BUDGET_MS の範囲で on_chunk に渡される（取り込みが追いつかない間は
+    ワーカー側の emit が待つ）。進捗（0.0〜1.0）は最新の値だけを on_progress に渡す。
+    """
+
+    def __init__(self, root, work, on_chunk=None, on_progress=None, on_done=None, max_chunks=4):
+        """
+        Args:
+            root: Tkのルートウィンドウ
+            work: ワーカースレッドで実行する関数 (emit, progress, cancel_event) -> 結果
+            on_chunk: emit で渡したまとまりを受け取る関数（UIスレッド）
+            on_progress: 進捗を受け取る関数 (0.0〜1.0)（UIスレッド）
+            on_done: 終了時に呼ばれる関数 (結果, 例外またはNone)（UIスレッド）
+            max_chunks: UIスレッドへ渡す前にためておくまとまりの最大数
+        """
+        self.root = root
+        self.work = work
+        self.on_chunk = on_chunk
+        self.on_progress = on_progress
+        self.on_done = on_done
+
+        self.cancel_event = threading.Event()
+        self._chunks = queue.Queue(maxsize=max_chunks)
+        self._progress = None
+        self._outcome = None   # (結果, 例外)
+        self._thread = None
+
+    @property
+    def running(self):
+        """実行中か（終了の通知が済むまで）"""
+        return self._thread is not None
+
+    def start(self):
+        """ワーカースレッドを開始し、UIスレッドでの取り込みを予約"""
+        self._thread = threading.Thread(target=self._run, name="FileTask")
+        self._thread.daemon = True
+        self._thread.start()
+        self.root.after(Config.FILE_TASK_POLL_MS, self._poll)
+
+    def cancel(self):
+        """中止を要求（ワーカーは次のまとまりの区切りで止まる）"""
+        self.cancel_event.set()
+
+    def join(self, timeout=None):
+        """ワーカースレッドの終了を待つ"""
+        thread = self._thread
+        if thread is not None:
+            thread.join(timeout)
+
+    def _run(self):
+        """ワーカースレッドの処理"""
+        try:
+            result = self.work(self._emit, self._set_progress, self.cancel_event)
+            self._outcome = (result, None)
+        except Exception as e:
+            self._outcome = (None, e)
+
+    def _emit(self, chunk):
+        """まとまりをUIスレッドへ渡す（ためすぎないよう空くまで待つ）"""
+        while not self.cancel_event.is_set():
+            try:
+                self._chunks.put(chunk, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+
+    def _set_progress(self, fraction):
+        """進捗を記録（UIスレッドは最新の値だけを表示する）"""
+        self._progress = fraction
+
+    def _poll(self):
+        """ためたまとまりを時間の目安の範囲で取り込み、進捗と終了を通知（UIスレッド）"""
+        deadline = time.perf_counter() + Config.FILE_TASK_BUDGET_MS / 1000
+        finished = not self._thread.is_alive()
+        while time.perf_counter() < deadline:
+            try:
+                chunk = self._chunks.get_nowait()
+            except queue.Empty:
+                break
+            if self.on_chunk and not self.cancel_event.is_set():
+                self.on_chunk(chunk)
+
+        progress, self._progress = self._progress, None
+        if progress is not None and self.on_progress:
+            self.on_progress(progress)
+
+        if finished and self._chunks.empty():
+            self._thread = None
+            result, error = self._outcome or (None, None)
+            if self.on_done:
+                self.on_done(result, error)
+            return
+        self.root.after(Config.FILE_TASK_POLL_MS, self._poll)
@@ -4,16 +4,23 @@
 """
 
 import tkinter as tk
-from tkinter import scrolledtext, messagebox, ttk
-import threading
+from tkinter import messagebox, ttk
 import time
-from datetime import datetime
 
 from ..utils.config import Config
 from ..utils.file_handler import FileHandler
-from ..audio.recorder import AudioRecorder
-from ..audio.recognizer import SpeechRecognizer
+from ..utils.tracing import tracer
+from ..utils.transcript_store import open_transcript_store
+from ..audio.http_pool import format_connection_stats
+from ..audio.multi_device import create_recorder
+from ..audio.pipeline import RecognitionPipeline
+from ..audio.recognizer import ResultKind, SpeechRecognizer
+from ..audio.resilience import BreakerState
 from .styles import AppStyles
+from .file_task import BackgroundFileTask
+from .text_appender import BatchedTextAppender
+from .transcript_model import TranscriptModel
+from .transcript_view import TranscriptView
 
 class MainWindow:
     """メインウィンドウクラス"""
@@ -27,14 +34,29 @@ class MainWindow:
         
         # ファイルハンドラー
         self.file_handler = FileHandler()
+        self.transcript_store = open_transcript_store()
         
         # 音声録音・認識の初期化
-        self.audio_recorder = AudioRecorder()
+        self.audio_recorder = create_recorder()
         self.speech_recognizer = SpeechRecognizer()
+        # 複数チャンネル録音ではチャンネルごとの結果を発話の開始順に並べる
+        self.speech_recognizer.set_merged_sources(self.audio_recorder.merged_sources)
+        # 発話とみなす閾値は録音側の環境ノイズの推定と共有する
+        self.speech_recognizer.set_noise_tracker(self.audio_recorder.noise_tracker)
+        # asyncio パイプラインでは区間の検出から認識・配信までを1つのイベントループで行う
+        self.pipeline = None
+        if Config.RECOGNITION_PIPELINE == 'asyncio':
+            # 言語は区間ごとに読む（認識中に set_language で切り替えられる）
+            self.pipeline = RecognitionPipeline(
+                self.speech_recognizer.backend, lambda: self.speech_recognizer.language,
+                self.audio_recorder.rate
+            )
         
         # 状態変数
         self.is_recording = False
         self.start_time = None
+        self.file_task = None  # 実行中のファイルの保存・読み込み
+        self.is_closed = False  # 終了処理が済んだか（ウィンドウを閉じた後 run() からも呼ばれる）
         
         # コールバック設定
         self._setup_callbacks()
@@ -45,22 +67,40 @@ class MainWindow:
         # ディレクトリ作成
         Config.ensure_directories()
         
+        # 前回結果が出なかった録音を再認識
+        self.speech_recognizer.replay_spool()
+        
         # 終了時の処理を設定
         self.root.protocol("WM_DELETE_WINDOW", self._on_closing)
     
     def _setup_callbacks(self):
         """音声処理のコールバック関数を設定"""
-        # 録音コールバック
-        self.audio_recorder.set_callbacks(
-            on_audio_data=self._on_audio_data,
-            on_error=self._on_audio_error
-        )
+        if self.pipeline is not None:
+            # 録音チャンクをそのままパイプラインへ渡し、結果を購読する（途中結果は出さない）
+            self.audio_recorder.set_callbacks(
+                on_error=self._on_audio_error,
+                on_captured_audio=self.pipeline.feed
+            )
+            self.pipeline.set_callbacks(
+                on_error=self._on_recognition_error,
+                on_backend_status=self._on_backend_status
+            )
+            self.pipeline.subscribe(self._on_recognition_result)
+            self.pipeline.start()
+        else:
+            # 録音コールバック
+            self.audio_recorder.set_callbacks(
+                on_audio_data=self._on_audio_data,
+                on_error=self._on_audio_error,
+                on_partial_audio=self._on_partial_audio if Config.PARTIAL_RESULTS_ENABLED else None
+            )
         
         # 認識コールバック
         self.speech_recognizer.set_callbacks(
             on_recognition_result=self._on_recognition_result,
             on_error=self._on_recognition_error,
-            on_listening=self._on_listening_start
+            on_listening=self._on_listening_start,
+            on_backend_status=self._on_backend_status
         )
     
     def _setup_ui(self):
@@ -84,6 +124,10 @@ class MainWindow:
         
         # 情報フレーム
         self._create_info_frame(main_frame)
+        
+        # 遅延計測のデバッグパネル（計測が有効な場合のみ）
+        if tracer.enabled:
+            self._create_latency_frame(main_frame)
     
     def _create_control_frame(self, parent):
         """コントロール部分のUI作成"""
@@ -163,6 +207,15 @@ class MainWindow:
             **AppStyles.LABEL_STYLES['normal']
         )
         self.time_label.pack(side=tk.RIGHT)
+        
+        # ファイルの保存・読み込みの進捗（実行中のみ表示）
+        self.file_cancel_button = tk.Button(
+            status_frame,
+            text="中止",
+            command=self._cancel_file_task,
+            **AppStyles.BUTTON_STYLES['warning']
+        )
+        self.file_progress = ttk.Progressbar(status_frame, length=150, mode='determinate', maximum=1.0)
     
     def _create_text_area_frame(self, parent):
         """テキスト表示エリアのUI作成"""
@@ -174,13 +227,6 @@ class MainWindow:
         )
         text_frame.pack(expand=True, fill="both", pady=(10, 0))
         
-        # テキストエリア
-        self.text_area = scrolledtext.ScrolledText(
-            text_frame,
-            **AppStyles.TEXT_AREA_STYLE
-        )
-        self.text_area.pack(expand=True, fill="both", padx=5, pady=5)
-        
         # プレースホルダーテキスト
         placeholder_text = (
             "音声認識結果がここに表示されます。\n\n"
@@ -190,8 +236,26 @@ class MainWindow:
             "• 認識結果は自動的にここに追加されます\n"
             "• 「保存」ボタンでテキストファイルとして保存できます"
         )
-        self.text_area.insert("1.0", placeholder_text)
-        self.text_area.config(fg=Config.COLORS['secondary'])
+        
+        # 認識結果は行のモデルに保持し、見えている範囲の行だけを描画する
+        # （長時間のセッションでもウィジェットの内容とメモリが増えない）
+        self.transcript_model = TranscriptModel()
+        self.transcript_view = TranscriptView(
+            text_frame,
+            self.transcript_model,
+            placeholder=placeholder_text,
+            **AppStyles.TEXT_AREA_STYLE
+        )
+        self.transcript_view.pack(expand=True, fill="both", padx=5, pady=5)
+        self.placeholder_active = True
+        
+        # 認識結果はまとめて追加し、文字数は差分で更新する
+        self.text_appender = BatchedTextAppender(
+            self.root,
+            self.transcript_model,
+            self.transcript_view,
+            on_char_count=self._show_char_count
+        )
     
     def _create_info_frame(self, parent):
         """情報表示部分のUI作成"""
@@ -206,6 +270,14 @@ class MainWindow:
         )
         self.char_count_label.pack(side=tk.LEFT)
         
+        # 認識バックエンドの状態表示
+        self.backend_status_label = tk.Label(
+            info_frame,
+            text="🔌 接続: 正常",
+            **AppStyles.LABEL_STYLES['normal']
+        )
+        self.backend_status_label.pack(side=tk.LEFT, padx=(20, 0))
+        
         # バージョン表示
         version_label = tk.Label(
             info_frame,
@@ -214,6 +286,32 @@ class MainWindow:
         )
         version_label.pack(side=tk.RIGHT)
     
+    def _create_latency_frame(self, parent):
+        """遅延計測のデバッグパネル作成"""
+        latency_frame = tk.LabelFrame(parent, text="⏱ 遅延（ミリ秒）", bg=parent['bg'])
+        latency_frame.pack(fill="x", pady=(10, 0))
+        
+        self.latency_label = tk.Label(
+            latency_frame,
+            text="計測待ち...",
+            font=("Courier", 9),
+            justify=tk.LEFT,
+            anchor="w",
+            bg=parent['bg']
+        )
+        self.latency_label.pack(fill="x", padx=5, pady=2)
+        
+        self._update_latency_panel()
+    
+    def _update_latency_panel(self):
+        """デバッグパネルの表示を更新"""
+        text = tracer.format_summary()
+        stats = self.speech_recognizer.backend.connection_stats()
+        if stats and stats['requests']:
+            text += "\n" + format_connection_stats(stats)
+        self.latency_label.config(text=text)
+        self.root.after(Config.LATENCY_PANEL_REFRESH_MS, self._update_latency_panel)
+    
     def _toggle_recording(self):
         """録音の開始/停止を切り替え"""
         if not self.is_recording:
@@ -250,6 +348,8 @@ class MainWindow:
     def _stop_recording(self):
         """録音停止"""
         self.audio_recorder.stop_recording()
+        if self.pipeline is not None:
+            self.pipeline.end_streams()
         self.is_recording = False
         
         # UI更新
@@ -286,67 +386,174 @@ class MainWindow:
     
     def _clear_placeholder_text(self):
         """プレースホルダーテキストをクリア"""
-        current_text = self.text_area.get("1.0", tk.END).strip()
-        if "音声認識結果がここに表示されます" in current_text:
-            self.text_area.delete("1.0", tk.END)
-            self.text_area.config(fg=Config.COLORS['dark'])
-    
-    def _add_recognized_text(self, text):
-        """認識されたテキストを追加"""
-        if text.strip():
-            # タイムスタンプ付きで追加
-            timestamp = datetime.now().strftime("%H:%M:%S")
-            
-            current_text = self.text_area.get("1.0", tk.END).strip()
-            if current_text:
-                self.text_area.insert(tk.END, f"\n[{timestamp}] {text}")
-            else:
-                self.text_area.insert(tk.END, f"[{timestamp}] {text}")
-            
-            # 自動スクロール
-            self.text_area.see(tk.END)
-            
-            # 文字数更新
+        if self.placeholder_active:
+            self.transcript_view.placeholder = None
+            self.transcript_view.refresh()
+            self.placeholder_active = False
             self._update_char_count()
     
     def _update_char_count(self):
-        """文字数を更新"""
-        text_content = self.text_area.get("1.0", tk.END).strip()
-        char_count = len(text_content)
+        """文字数を数え直して更新"""
+        self.text_appender.recount()
+    
+    def _show_char_count(self, char_count):
+        """文字数を表示"""
         self.char_count_label.config(text=f"📊 文字数: {char_count}")
     
     def _clear_text(self):
         """テキストエリアをクリア"""
+        if self._file_task_busy():
+            return
         if messagebox.askyesno("確認", "テキストをクリアしますか？"):
-            self.text_area.delete("1.0", tk.END)
+            self.transcript_model.clear()
+            self.text_appender.forget_interims()
+            self.transcript_view.placeholder = None
+            self.transcript_view.refresh()
+            self.placeholder_active = False
             self._update_char_count()
     
     def _open_file(self):
-        """ファイルを開く"""
-        text_content = self.file_handler.load_text_from_file(self.root)
-        if text_content:
-            self.text_area.delete("1.0", tk.END)
-            self.text_area.insert("1.0", text_content)
-            self.text_area.config(fg=Config.COLORS['dark'])
-            self._update_char_count()
+        """ファイルを開く（バックグラウンドで少しずつ読み、読んだ分から表示する）"""
+        if self._file_task_busy():
+            return
+        file_path = self.file_handler.ask_open_path(self.root)
+        if not file_path:
+            return
+        
+        self.transcript_model.clear()
+        self.text_appender.forget_interims()
+        self.transcript_view.placeholder = None
+        self.transcript_view.following = False  # 読み込み中は先頭を表示したままにする
+        self.transcript_view.refresh()
+        self.placeholder_active = False
+        self._update_char_count()
+        
+        def on_done(completed, error):
+            self._finish_file_task()
+            if error is not None:
+                messagebox.showerror("エラー", f"ファイルの読み込みに失敗しました:\n{str(error)}")
+            elif not completed:
+                self._show_status(f"⏹ 読み込みを中止しました（{self.transcript_model.final_count} 行）")
+            else:
+                self._show_status(f"📂 読み込み完了（{self.transcript_model.final_count} 行）")
+        
+        self._start_file_task(
+            "📂 読み込み中...",
+            lambda emit, progress, cancel_event: self.file_handler.read_lines_chunked(
+                file_path, emit, progress, cancel_event),
+            on_chunk=self.transcript_model.append_lines,
+            on_done=on_done
+        )
     
     def _save_file(self):
-        """ファイルに保存"""
-        text_content = self.text_area.get("1.0", tk.END).strip()
-        self.file_handler.save_text_as_file(text_content, self.root)
+        """ファイルに保存（確定した行をバックグラウンドで少しずつ書き出す）"""
+        if self._file_task_busy():
+            return
+        line_count = self.transcript_model.final_count
+        if line_count == 0:
+            messagebox.showwarning("警告", "保存するテキストがありません。")
+            return
+        file_path = self.file_handler.ask_save_path(self.root)
+        if not file_path:
+            return
+        
+        # 保存を始めた時点までの行を書き出す（保存中に認識された行は含めない）
+        lines = self.transcript_model.iter_lines()
+        
+        def on_done(saved, error):
+            self._finish_file_task()
+            if error is not None:
+                messagebox.showerror("エラー", f"ファイルの保存に失敗しました:\n{str(error)}")
+            elif not saved:
+                self._show_status("⏹ 保存を中止しました（既存のファイルは変更していません）")
+            else:
+                messagebox.showinfo("完了", f"ファイルを保存しました:\n{file_path}")
+        
+        self._start_file_task(
+            "💾 保存中...",
+            lambda emit, progress, cancel_event: self.file_handler.write_lines_atomic(
+                lines, file_path, lambda written: progress(written / line_count), cancel_event),
+            on_done=on_done
+        )
+    
+    def _start_file_task(self, status_text, work, on_chunk=None, on_done=None):
+        """ファイルの保存・読み込みを開始し、進捗と中止ボタンを表示"""
+        def on_progress(fraction):
+            self.file_progress['value'] = fraction
+            if on_chunk:
+                # 読み込んだ分を表示に反映
+                self.transcript_view.refresh()
+                self._update_char_count()
+        
+        self.file_task = BackgroundFileTask(
+            self.root, work, on_chunk=on_chunk, on_progress=on_progress, on_done=on_done
+        )
+        self.file_progress['value'] = 0.0
+        self.file_cancel_button.pack(side=tk.RIGHT, padx=(0, 10))
+        self.file_progress.pack(side=tk.RIGHT, padx=(0, 5))
+        self.status_label.config(text=status_text, **AppStyles.LABEL_STYLES['status_processing'])
+        self.file_task.start()
+    
+    def _finish_file_task(self):
+        """進捗と中止ボタンを隠し、表示を更新"""
+        self.file_task = None
+        self.file_progress.pack_forget()
+        self.file_cancel_button.pack_forget()
+        self.transcript_view.refresh()
+        self._update_char_count()
+    
+    def _cancel_file_task(self):
+        """実行中のファイルの保存・読み込みを中止"""
+        if self.file_task is not None:
+            self.file_task.cancel()
+    
+    def _file_task_busy(self):
+        """ファイルの保存・読み込み中なら知らせる"""
+        if self.file_task is None:
+            return False
+        messagebox.showinfo("お知らせ", "ファイルの保存・読み込み中です。完了するか中止してから操作してください。")
+        return True
+    
+    def _show_status(self, text):
+        """状態を一時的に表示し、5秒後に元に戻す"""
+        self.status_label.config(text=text, **AppStyles.LABEL_STYLES['status_ready'])
+        self.root.after(5000, lambda: self.status_label.config(
+            text="🔴 録音中..." if self.is_recording else "🟢 準備完了",
+            **AppStyles.LABEL_STYLES['status_recording' if self.is_recording else 'status_ready']
+        ))
     
     # コールバック関数
-    def _on_audio_data(self, audio_data):
+    def _on_audio_data(self, audio_data, trace=None, utterance_id=None, source=None,
+                       overlap=0, continued=False):
         """音声データ受信時の処理"""
-        self.speech_recognizer.recognize_from_audio_data(audio_data)
+        self.speech_recognizer.recognize_from_audio_data(
+            audio_data, self.audio_recorder.rate, trace, utterance_id, source,
+            overlap=overlap, continued=continued
+        )
+    
+    def _on_partial_audio(self, audio_data, utterance_id):
+        """発話途中の音声データ受信時の処理"""
+        self.speech_recognizer.recognize_partial(audio_data, self.audio_recorder.rate, utterance_id)
     
     def _on_audio_error(self, error_message):
         """音声録音エラー時の処理"""
         self.root.after(0, lambda: self._show_error(error_message))
     
-    def _on_recognition_result(self, text):
-        """音声認識結果受信時の処理"""
-        self.root.after(0, lambda: self._add_recognized_text(text))
+    def _on_recognition_result(self, text, trace=None, kind=ResultKind.FINAL, utterance_id=None,
+                               source=None):
+        """音声認識結果受信時の処理（反映は一定間隔でまとめて行う）"""
+        if kind == ResultKind.INTERIM:
+            self.text_appender.set_interim(utterance_id, text)
+            return
+        if trace is not None:
+            trace.mark('queued_ui')
+        self.text_appender.add(text, trace, utterance_id, source)
+        if self.transcript_store is not None and text:
+            self.transcript_store.add(
+                text, source=source, language=self.speech_recognizer.language,
+                audio_offset=utterance_id,
+                sample_rate=self.audio_recorder.rate if utterance_id is not None else None
+            )
     
     def _on_recognition_error(self, error_message):
         """音声認識エラー時の処理"""
@@ -359,6 +566,22 @@ class MainWindow:
             **AppStyles.LABEL_STYLES['status_processing']
         ))
     
+    def _on_backend_status(self, state, parked_count):
+        """認識バックエンドの状態変化時の処理"""
+        self.root.after(0, lambda: self._show_backend_status(state, parked_count))
+    
+    def _show_backend_status(self, state, parked_count):
+        """認識バックエンドの状態と保留中の区間数を表示"""
+        labels = {
+            BreakerState.CLOSED: "正常",
+            BreakerState.OPEN: "遮断中",
+            BreakerState.HALF_OPEN: "回復確認中",
+        }
+        text = f"🔌 接続: {labels.get(state, state)}"
+        if parked_count:
+            text += f"（保留 {parked_count} 件）"
+        self.backend_status_label.config(text=text)
+    
     def _show_error(self, error_message):
         """エラーメッセージを表示"""
         self.status_label.config(
@@ -372,13 +595,29 @@ class MainWindow:
         ))
     
     def _on_closing(self):
-        """アプリケーション終了時の処理"""
+        """アプリケーション終了時の処理（2回目以降の呼び出しは何もしない）"""
+        if self.is_closed:
+            return
+        self.is_closed = True
+        
         if self.is_recording:
             self._stop_recording()
         
+        # 保存・読み込み中なら中止する（保存中の既存ファイルは変更されない）
+        if self.file_task is not None:
+            self.file_task.cancel()
+            self.file_task.join(2.0)
+        
         # リソースのクリーンアップ
         self.audio_recorder.cleanup()
+        if self.pipeline is not None:
+            self.pipeline.stop()
+        self.speech_recognizer.cleanup()
+        self.transcript_model.close()
         self.file_handler.cleanup_temp_files()
+        if self.transcript_store is not None:
+            self.transcript_store.close()
+        tracer.close()
         
         # ウィンドウを閉じる
         self.root.destroy()
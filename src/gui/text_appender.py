@@ -0,0 +1,145 @@
+# -*- coding: utf-8 -*-
+"""
+認識結果の表示への追加を管理するモジュール
+"""
+
+import threading
+from datetime import datetime
+
+from ..utils.config import Config
+from ..utils.tracing import tracer
+
+
+class BatchedTextAppender:
+    """
+    認識結果をまとめて表示に追加するクラス
+
+    認識スレッドから届いた結果は一旦ためておき、UIスレッドで
+    Config.UI_FLUSH_INTERVAL_MS ごとにモデル（TranscriptModel）へまとめて反映し、
+    ビュー（TranscriptView）を1回だけ描画し直す。文字数はモデルが差分で数える。
+
+    途中結果は発話IDごとにモデルの末尾に表示し、同じ発話の確定結果が
+    届いたら途中結果を消して確定した行を追加する。
+    """
+
+    def __init__(self, root, model, view, on_char_count=None, interval_ms=None):
+        """
+        Args:
+            root: Tkのルートウィンドウ
+            model: 追加先の TranscriptModel
+            view: 反映後に描画し直す TranscriptView
+            on_char_count: 文字数が変わったときに呼ばれる関数 (文字数)
+            interval_ms: まとめて反映する間隔（ミリ秒）
+        """
+        self.root = root
+        self.model = model
+        self.view = view
+        self.on_char_count = on_char_count
+        self.interval_ms = interval_ms or Config.UI_FLUSH_INTERVAL_MS
+
+        self._pending = []             # (発話ID, 確定結果の行, トレース)
+        self._pending_interims = {}    # 発話ID -> 最新の途中結果
+        self._lock = threading.Lock()
+        self._flush_scheduled = False
+
+        self._finalized_through = None # この発話ID以前は確定済み
+
+    @property
+    def char_count(self):
+        """表示中のテキストの文字数"""
+        return self.model.char_count
+
+    def add(self, text, trace=None, utterance_id=None, source=None):
+        """
+        確定した認識結果を追加（任意のスレッドから呼び出し可）
+
+        Args:
+            text: 認識結果（空の場合は同じ発話の途中結果を消すだけ）
+            trace: 遅延計測のトレース（反映時に完了させる）
+            utterance_id: 発話ID（途中結果を表示していれば消して確定結果を追加する）
+            source: 入力元の名前（複数デバイス録音時に行頭へ付ける）
+        """
+        line = None
+        if text.strip():
+            timestamp = datetime.now().strftime("%H:%M:%S")
+            line = f"[{timestamp}] [{source}] {text}" if source else f"[{timestamp}] {text}"
+        elif utterance_id is None:
+            return
+
+        with self._lock:
+            self._pending.append((utterance_id, line, trace))
+            self._pending_interims.pop(utterance_id, None)
+        self._schedule_flush()
+
+    def set_interim(self, utterance_id, text):
+        """
+        発話途中の認識結果を表示（任意のスレッドから呼び出し可）
+
+        Args:
+            utterance_id: 発話ID
+            text: 途中結果
+        """
+        with self._lock:
+            self._pending_interims[utterance_id] = text
+        self._schedule_flush()
+
+    def flush(self):
+        """ためている認識結果を表示に反映（UIスレッドで呼ぶ）"""
+        with self._lock:
+            finals = self._pending
+            interims = self._pending_interims
+            self._pending = []
+            self._pending_interims = {}
+            self._flush_scheduled = False
+
+        if not finals and not interims:
+            return
+
+        for utterance_id, line, trace in finals:
+            if utterance_id is not None:
+                self._finalized_through = utterance_id
+            self.model.finalize(utterance_id, line)
+
+        for utterance_id, text in sorted(interims.items()):
+            if self._finalized_through is not None and utterance_id <= self._finalized_through:
+                continue
+            self.model.set_interim(utterance_id, text)
+
+        self.view.refresh()
+        self._notify_char_count()
+
+        for _, _, trace in finals:
+            if trace is not None:
+                trace.mark('displayed')
+                tracer.finish(trace)
+
+    def forget_interims(self):
+        """途中結果を破棄（クリア・ファイル読み込み時に呼ぶ）"""
+        self.model.clear_interims()
+        with self._lock:
+            self._pending_interims.clear()
+
+    def is_empty(self):
+        """表示する行がないか"""
+        return len(self.model) == 0
+
+    def recount(self):
+        """
+        文字数を通知し直す
+
+        クリア・ファイル読み込みなど、追加以外で内容が変わったときに使う。
+        """
+        self._notify_char_count()
+
+    def _schedule_flush(self):
+        """反映を予約（予約済みなら何もしない）"""
+        with self._lock:
+            if self._flush_scheduled:
+                return
+            self._flush_scheduled = True
+        self.root.after(self.interval_ms, self.flush)
+
+    def _notify_char_count(self):
+        """文字数の変更を通知"""
+        if self.on_char_count:
+            self.on_char_count(self.model.char_count)
@@ -0,0 +1,220 @@
+# -*- coding: utf-8 -*-
+"""
+表示する認識結果（行）を保持するモジュール
+
+確定した行はセッションごとの退避ファイルに追記し、メモリには書き込み中の
+最新ページと、最近表示したページだけを持つ。何時間録音しても使用メモリは
+ページの位置の索引（ページ数分の整数）しか増えない。
+"""
+
+import os
+import tempfile
+from array import array
+from collections import OrderedDict
+
+from ..utils.config import Config
+
+
+class TranscriptModel:
+    """
+    認識結果の行のモデル
+
+    行は page_lines 行ごとのページに分け、退避ファイル上の各ページの開始位置を
+    索引として持つ。表示範囲の行は get_lines でページ単位に読み出す（最近読んだ
+    ページは cached_pages 個までメモリに残す）。途中結果は確定するまで末尾に表示する。
+    """
+
+    def __init__(self, page_lines=None, cached_pages=None, directory=None):
+        """
+        Args:
+            page_lines: 1ページの行数（省略時は Config.TRANSCRIPT_PAGE_LINES）
+            cached_pages: メモリに残す読み出し済みページ数（省略時は Config.TRANSCRIPT_CACHED_PAGES）
+            directory: 退避ファイルを作るディレクトリ（省略時は Config.TEMP_DIR）
+        """
+        self.page_lines = page_lines or Config.TRANSCRIPT_PAGE_LINES
+        self.cached_pages = cached_pages or Config.TRANSCRIPT_CACHED_PAGES
+
+        directory = directory or Config.TEMP_DIR
+        os.makedirs(directory, exist_ok=True)
+        fd, self.path = tempfile.mkstemp(prefix="transcript_", suffix=".txt", dir=directory)
+        self._file = os.fdopen(fd, 'w+b')
+
+        self._page_offsets = array('q')  # 退避ファイル上の各ページの開始位置
+        self._tail = []                  # 書き込み中の最新ページの行
+        self._cache = OrderedDict()      # ページ番号 -> 行のリスト（最近読んだ順）
+        self._final_count = 0
+        self._final_chars = 0            # 確定した行を改行で連結した文字数
+        self._interims = {}              # 発話ID -> 途中結果
+        self._interim_chars = 0
+
+    @property
+    def final_count(self):
+        """確定した行数"""
+        return self._final_count
+
+    def __len__(self):
+        """表示する行数（確定した行と途中結果）"""
+        return self._final_count + len(self._interims)
+
+    @property
+    def char_count(self):
+        """表示するテキスト全体（行を改行で連結）の文字数"""
+        count = self._final_chars + self._interim_chars
+        lines = len(self)
+        return count + lines - 1 if lines else 0
+
+    def append_lines(self, lines):
+        """
+        確定した行を末尾に追加
+
+        Args:
+            lines: 行のイテラブル（改行を含む文字列は複数行に分ける）
+        """
+        # ページの読み出しで位置が動いているため末尾に戻す
+        position = self._file.seek(0, os.SEEK_END)
+        chunks = []
+        for text in lines:
+            for line in text.split("\n"):
+                if not self._tail:
+                    self._page_offsets.append(position)
+                data = line.encode('utf-8') + b"\n"
+                chunks.append(data)
+                position += len(data)
+                self._tail.append(line)
+                self._final_count += 1
+                self._final_chars += len(line)
+                if len(self._tail) >= self.page_lines:
+                    self._tail = []
+        self._file.write(b"".join(chunks))
+
+    def finalize(self, utterance_id, line):
+        """
+        発話の確定結果を追加し、その発話以前の途中結果を消す
+
+        Args:
+            utterance_id: 発話ID（Noneは途中結果と対応しない結果）
+            line: 確定した行（Noneの場合は途中結果を消すだけ）
+        """
+        if utterance_id is not None:
+            for older in [key for key in self._interims if key <= utterance_id]:
+                self._interim_chars -= len(self._interims.pop(older))
+        if line is not None:
+            self.append_lines([line])
+
+    def set_interim(self, utterance_id, text):
+        """
+        発話途中の認識結果を設定
+
+        Args:
+            utterance_id: 発話ID
+            text: 途中結果
+        """
+        text = text.replace("\n", " ")
+        self._interim_chars += len(text) - len(self._interims.get(utterance_id, ""))
+        self._interims[utterance_id] = text
+
+    def clear_interims(self):
+        """途中結果をすべて消す"""
+        self._interims.clear()
+        self._interim_chars = 0
+
+    def get_lines(self, start, stop):
+        """
+        表示する行を取得
+
+        Args:
+            start: 先頭の行番号
+            stop: 末尾の行番号（この行は含まない）
+
+        Returns:
+            list: (行, 途中結果か) のリスト
+        """
+        start = max(0, start)
+        stop = min(stop, len(self))
+        result = []
+        index = start
+        while index < min(stop, self._final_count):
+            page, offset = divmod(index, self.page_lines)
+            lines = self._page(page)
+            taken = lines[offset:offset + min(stop, self._final_count) - index]
+            result.extend((line, False) for line in taken)
+            index += len(taken)
+        if stop > self._final_count:
+            interims = [self._interims[key] for key in sorted(self._interims)]
+            first = max(0, start - self._final_count)
+            result.extend((line, True) for line in interims[first:stop - self._final_count])
+        return result
+
+    def _page(self, page):
+        """ページの行を取得（最新ページはメモリ、それ以外は退避ファイルから）"""
+        if page == len(self._page_offsets) - 1 and self._tail:
+            return self._tail
+        lines = self._cache.get(page)
+        if lines is not None:
+            self._cache.move_to_end(page)
+            return lines
+
+        self._file.flush()
+        start = self._page_offsets[page]
+        self._file.seek(start)
+        if page + 1 < len(self._page_offsets):
+            data = self._file.read(self._page_offsets[page + 1] - start)
+        else:
+            data = self._file.read()
+        lines = data.decode('utf-8').split("\n")[:self.page_lines]
+
+        self._cache[page] = lines
+        if len(self._cache) > self.cached_pages:
+            self._cache.popitem(last=False)
+        return lines
+
+    def iter_lines(self, chunk_size=1024 * 1024):
+        """
+        確定した行を先頭から順に取得（退避ファイルを少しずつ読む）
+
+        保存時に全文を1つの文字列にしないために使う。
+
+        Args:
+            chunk_size: 一度に読むバイト数
+
+        Returns:
+            iterator: 行（改行なし）のイテレーター
+        """
+        # 呼び出し時点の内容まで（読んでいる間に追加された行は含めない）
+        self._file.flush()
+        end = os.fstat(self._file.fileno()).st_size
+        return self._read_lines(end, chunk_size)
+
+    def _read_lines(self, end, chunk_size):
+        """退避ファイルの先頭から end バイトまでの行を順に返す"""
+        with open(self.path, 'rb') as file:
+            rest = b""
+            remaining = end
+            while remaining > 0:
+                chunk = file.read(min(chunk_size, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                lines = (rest + chunk).split(b"\n")
+                rest = lines.pop()
+                for line in lines:
+                    yield line.decode('utf-8')
+
+    def clear(self):
+        """すべての行を消す"""
+        self._file.seek(0)
+        self._file.truncate()
+        self._page_offsets = array('q')
+        self._tail = []
+        self._cache.clear()
+        self._final_count = 0
+        self._final_chars = 0
+        self.clear_interims()
+
+    def close(self):
+        """退避ファイルを閉じて削除"""
+        try:
+            self._file.close()
+            os.remove(self.path)
+        except OSError:
+            pass
@@ -0,0 +1,120 @@
+# -*- coding: utf-8 -*-
+"""
+認識結果を仮想スクロールで表示するモジュール
+"""
+
+import tkinter as tk
+import tkinter.font as tkfont
+
+from ..utils.config import Config
+
+INTERIM_TAG = 'interim'
+
+
+class TranscriptView(tk.Frame):
+    """
+    TranscriptModel の見えている範囲の行だけを描画するビュー
+
+    テキストウィジェットには画面に収まる行数分だけを入れ、スクロールバーの位置は
+    モデル全体の行数に対する割合で表す。スクロールのたびに表示範囲の行を
+    モデルから読み直して描画し直すため、セッションが長くなってもウィジェットの
+    内容は増えない。末尾を表示している間は新しい行に追従する。
+    """
+
+    def __init__(self, parent, model, placeholder=None, **text_options):
+        """
+        Args:
+            parent: 親ウィジェット
+            model: 表示する TranscriptModel
+            placeholder: モデルが空の間に表示する案内文（Noneは表示しない）
+            **text_options: テキストウィジェットのオプション
+        """
+        super().__init__(parent)
+        self.model = model
+        self.placeholder = placeholder
+        self.first = 0        # 表示している先頭の行番号
+        self.following = True  # 末尾に追従しているか
+        self._rows = 1
+
+        self.text = tk.Text(self, **text_options)
+        self.scrollbar = tk.Scrollbar(self, orient=tk.VERTICAL, command=self._on_scrollbar)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.text.pack(side=tk.LEFT, expand=True, fill="both")
+        self.text.tag_configure(INTERIM_TAG, foreground=Config.COLORS['secondary'])
+        self._foreground = self.text.cget('fg')
+        self._line_height = max(1, tkfont.Font(font=self.text.cget('font')).metrics('linespace'))
+
+        self.text.bind("<Configure>", self._on_configure)
+        self.text.bind("<MouseWheel>", self._on_mouse_wheel)
+        self.text.bind("<Button-4>", lambda event: self._scroll_by(-3))
+        self.text.bind("<Button-5>", lambda event: self._scroll_by(3))
+        for sequence, delta in (("<Prior>", -1), ("<Next>", 1)):
+            self.text.bind(sequence, lambda event, delta=delta: self._scroll_by(delta * self._rows))
+        self.text.bind("<Home>", lambda event: self.scroll_to(0))
+        self.text.bind("<End>", lambda event: self.scroll_to(len(self.model)))
+        self.refresh()
+
+    def refresh(self):
+        """表示範囲の行をモデルから描画し直す"""
+        total = len(self.model)
+        last_first = max(0, total - self._rows)
+        self.first = last_first if self.following else min(self.first, last_first)
+
+        self.text.config(state=tk.NORMAL)
+        self.text.delete("1.0", tk.END)
+        if total == 0 and self.placeholder:
+            self.text.insert("1.0", self.placeholder)
+            self.text.config(fg=Config.COLORS['secondary'])
+        else:
+            self.text.config(fg=self._foreground)
+            chunks = []
+            for index, (line, interim) in enumerate(self.model.get_lines(self.first, self.first + self._rows)):
+                chunks.extend(("\n" + line if index else line, INTERIM_TAG if interim else ()))
+            if chunks:
+                self.text.insert("1.0", *chunks)
+        self.text.config(state=tk.DISABLED)
+        if self.following:
+            # 折り返しで画面に収まらない場合も最新の行を見せる
+            self.text.see(tk.END)
+
+        if total:
+            self.scrollbar.set(self.first / total, min(1.0, (self.first + self._rows) / total))
+        else:
+            self.scrollbar.set(0.0, 1.0)
+
+    def scroll_to(self, line):
+        """
+        指定した行が先頭になるように表示
+
+        Args:
+            line: 行番号（末尾を超える場合は末尾に追従する）
+        """
+        total = len(self.model)
+        self.first = max(0, min(int(line), total - self._rows))
+        self.following = self.first >= total - self._rows
+        self.refresh()
+        return "break"
+
+    def _scroll_by(self, lines):
+        """表示位置を行単位で動かす"""
+        return self.scroll_to(self.first + lines)
+
+    def _on_scrollbar(self, action, *args):
+        """スクロールバーの操作（moveto 割合 / scroll 量 units|pages）"""
+        if action == tk.MOVETO:
+            self.scroll_to(float(args[0]) * len(self.model))
+        elif action == tk.SCROLL:
+            amount = int(args[0])
+            self._scroll_by(amount * self._rows if args[1] == tk.PAGES else amount)
+
+    def _on_mouse_wheel(self, event):
+        """マウスホイール（Windows は120単位、macOS は小さな値）"""
+        steps = event.delta // 120 if abs(event.delta) >= 120 else event.delta
+        return self._scroll_by(-steps * 3)
+
+    def _on_configure(self, event):
+        """大きさが変わったら表示する行数を計算し直す"""
+        rows = max(1, event.height // self._line_height)
+        if rows != self._rows:
+            self._rows = rows
+            self.refresh()
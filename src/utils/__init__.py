@@ -6,5 +6,7 @@
 
 from .config import Config
 from .file_handler import FileHandler
+from .tracing import LatencyTracer, tracer
+from .transcript_store import TranscriptStore
 
-__all__ = ['Config', 'FileHandler']
\ No newline at end of file
+__all__ = ['Config', 'FileHandler', 'LatencyTracer', 'tracer', 'TranscriptStore']
\ No newline at end of file
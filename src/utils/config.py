@@ -17,19 +17,129 @@ class Config:
     WINDOW_HEIGHT = 550
     WINDOW_MIN_WIDTH = 600
     WINDOW_MIN_HEIGHT = 450
+    UI_FLUSH_INTERVAL_MS = 50  # 認識結果をまとめてテキストエリアに反映する間隔（ミリ秒）
+    TRANSCRIPT_PAGE_LINES   = 256  # 認識結果の表示モデルで1ページにまとめる行数
+    TRANSCRIPT_CACHED_PAGES = 8    # 表示のためにメモリに残す過去のページ数（それ以外は一時ファイルから読む）
 
     # 音声認識設定
     RECOGNITION_LANGUAGE = 'ja-JP' # 日本語
     RECOGNITION_TIMEOUT  = 1       # 音声待機タイムアウト（秒）
     PHRASE_TIME_LIMIT    = 5       # フレーズ時間制限（秒）
+    RECOGNITION_BACKEND  = 'google' # 認識エンジン: 'google' / 'vosk'（オフライン） / 'http'（自前サーバー） / 'fake'（テスト用）
+
+    # 認識バックエンドの障害対策設定
+    BACKEND_TIMEOUT           = 10     # 1回の呼び出しの制限時間（秒）
+    BACKEND_DEADLINE          = 30     # 再試行を含めた1区間の制限時間（秒）
+    BACKEND_RETRIES           = 3      # 通信エラー時の最大再試行回数
+    BACKEND_RETRY_BASE_DELAY  = 0.5    # 再試行の待ち時間の初期上限（秒、回数ごとに倍）
+    BACKEND_RETRY_MAX_DELAY   = 8      # 再試行の待ち時間の上限（秒）
+    CIRCUIT_FAILURE_THRESHOLD = 5      # 連続失敗でバックエンドを遮断する回数
+    CIRCUIT_RESET_TIMEOUT     = 15     # 遮断から回復確認までの秒数
+    PARKED_SEGMENTS_MAX       = 200    # 遮断中に保留する区間の最大数（超えたら古いものから破棄）
+    HTTP_BACKEND_URL          = 'http://127.0.0.1:8765/recognize'  # 'http' バックエンドの接続先
+    GOOGLE_API_KEY            = None   # 'google' バックエンドのAPIキー（None なら speech_recognition の既定キー）
+    HTTP_POOL_ENABLED         = True   # 認識サービスへの接続を使い回す（キープアライブ）
+    HTTP_POOL_SIZE            = 16     # 認識サービスへ同時に使う接続数の上限
+    HTTP_POOL_IDLE_TIMEOUT    = 30     # 空いている接続を保持する秒数（超えたら閉じて新しく接続する）
+
+    # 送信音声の符号化設定（区間ごとに1回だけ符号化し、再試行・保留後の再送で使い回す）
+    UPLOAD_CODEC      = 'flac'  # 'http' バックエンドの送信形式: 'flac' / 'wav'
+    UPLOAD_FLAC_LEVEL = 5       # FLACの圧縮レベル 0〜8（大きいほど小さく、符号化が遅い）
+
+    # 認識スケジューラー設定
+    RECOGNITION_WORKERS         = 2             # 認識ワーカースレッド数
+    RECOGNITION_QUEUE_SIZE      = 8             # 認識待ちチャンクの最大数
+    RECOGNITION_OVERFLOW_POLICY = 'drop_oldest' # 満杯時の動作: 'drop_oldest' / 'block' / 'coalesce'
+
+    # 連続認識の処理方式
+    RECOGNITION_PIPELINE   = 'threads'  # 'threads'（録音処理スレッド＋ワーカープール） / 'asyncio'（1つのイベントループで並行処理）
+    PIPELINE_CAPTURE_QUEUE = 256        # asyncio パイプラインの録音チャンクの受け口（満杯時は破棄して数える）
+    PIPELINE_QUEUE_SIZE    = 32         # asyncio パイプラインの段の間のキューの最大長（満杯時は前の段が待つ）
+    PIPELINE_MAX_IN_FLIGHT = 64         # asyncio パイプラインで同時に認識する区間数の上限
+    PIPELINE_ENCODERS      = 2          # asyncio パイプラインで並行して符号化する数（符号化はスレッドプールで実行）
+
+    # 途中結果設定（連続認識中に発話の途中経過を表示）
+    PARTIAL_RESULTS_ENABLED = True
+    PARTIAL_INTERVAL_MS     = 300   # 途中結果を更新する間隔（ミリ秒）
+    PARTIAL_WINDOW_SEC      = 3     # 逐次認識に対応しないバックエンドで認識し直す発話末尾の長さ（秒）
+
+    # 録音設定
+    INPUT_DEVICES = []  # 録音する入力デバイスの番号（空は既定のデバイス、2台以上で同時録音）
+    SAMPLE_RATE = 16000  # 認識に送るサンプリングレート（Hz）。非対応デバイスでは変換する
+    INPUT_CHANNELS = 1   # 録音するチャンネル数（2以上でチャンネルごとに発話を検出・認識）
+    CHANNEL_LABELS = []  # チャンネルの表示名（例: ['L', 'R']。空は ch1, ch2, ...）
+
+    # 録音バッファ設定
+    AUDIO_RING_SECONDS = 60  # リングバッファに保持する秒数（認識待ちの区間もこの範囲を参照する）
+
+    # 音声区間検出（VAD）設定
+    VAD_FRAME_MS         = 30      # 判定フレーム長（ミリ秒）
+    VAD_ENERGY_THRESHOLD = 300     # 発話とみなすRMSの下限（16bit振幅）。適応時は初期値
+    VAD_ADAPTIVE_THRESHOLD   = True  # 録音中の環境ノイズに合わせて閾値を更新し続ける
+    VAD_ENERGY_THRESHOLD_MIN = 150   # 適応時の閾値の下限
+    VAD_ENERGY_THRESHOLD_MAX = 4000  # 適応時の閾値の上限
+    NOISE_FLOOR_WINDOW_SEC   = 2.0   # 環境ノイズとみなす最小値を取る区間（秒、発話の合間を含む長さ）
+    NOISE_FLOOR_RISE_SEC     = 3.0   # 環境音が大きくなった場合に閾値が追従する時定数（秒）
+    NOISE_FLOOR_FALL_SEC     = 0.5   # 環境音が小さくなった場合に閾値が追従する時定数（秒）
+    NOISE_THRESHOLD_RATIO    = 2.5   # 閾値とする環境ノイズ（RMS）の倍率
+    VAD_ZCR_MAX          = 0.5     # 発話とみなすゼロ交差率の上限
+    VAD_HANGOVER_MS      = 300     # 発話終了と判定するまでの無音時間（ミリ秒）
+    VAD_PREROLL_MS       = 200     # 発話開始前に付け足す音声（ミリ秒）
+    VAD_MIN_SPEECH_MS    = 150     # 発話として扱う最小の有音時間（ミリ秒）
+    VAD_OVERLAP_MS       = 1000    # 長い発話を強制的に区切る際に次の区間へ重ねる音声（ミリ秒、0で重ねない）
+    OVERLAP_SEARCH_TOKENS    = 16  # 重ねた区間の結果で重複を探す範囲の上限（単語、日本語は文字）
+    OVERLAP_TOKEN_MARGIN     = 2   # 重なりの長さから見積もった範囲に足す単位数（区切りで欠けた単語の分）
+    OVERLAP_MIN_MATCH_TOKENS = 1   # 重複とみなす最小の一致長（単語、日本語は文字）
+
+    # ヘッドレスモード設定
+    HEADLESS_STARTUP_BUDGET = 0.5  # 起動から録音開始可能になるまでの目標時間（秒）
+    HEADLESS_DRAIN_TIMEOUT  = 60   # 音声ファイルの再生が終わった後、認識が済むのを待つ上限（秒）
+
+    # 一括文字起こし設定
+    BATCH_WORKERS              = os.cpu_count() or 2  # 認識ワーカープロセス数
+    BATCH_IN_FLIGHT_PER_WORKER = 4                    # ワーカーあたりの投入済み区間数の上限
 
     # ディレクトリ設定
     BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
     OUTPUT_DIR = os.path.join(BASE_DIR, 'output')
     TEMP_DIR = os.path.join(BASE_DIR, 'temp')
+    VOSK_MODEL_PATH = os.path.join(BASE_DIR, 'models', 'vosk-model-small-ja-0.22')  # オフライン認識用モデル
+
+    # 遅延計測設定（--trace-latency で有効化）
+    LATENCY_TRACING_ENABLED   = False
+    LATENCY_TRACE_FILE        = os.path.join(TEMP_DIR, 'latency', 'latency_trace.jsonl')  # 発話ごとの計測結果（JSONL）
+    LATENCY_HISTORY_SIZE      = 1000   # 百分位数の計算に使う直近の発話数
+    LATENCY_PANEL_REFRESH_MS  = 1000   # デバッグパネルの更新間隔（ミリ秒）
+
+    # 音声スプール設定（認識前の区間をディスクに退避し、次回起動時に再認識）
+    SPOOL_ENABLED        = True
+    SPOOL_FILE           = os.path.join(TEMP_DIR, 'audio_spool.bin')
+    SPOOL_FSYNC_INTERVAL = 1.0                # fsync の間隔（秒、0以下なら書き込みごと）
+    SPOOL_COMPACT_BYTES  = 16 * 1024 * 1024   # 認識済みの領域がこのサイズを超えたら縮める（バイト）
+
+    # 認識結果データベース設定（確定した区間を蓄積し、全文検索する）
+    TRANSCRIPT_DB_ENABLED        = True
+    TRANSCRIPT_DB_FILE           = os.path.join(OUTPUT_DIR, 'transcripts.db')
+    TRANSCRIPT_DB_BATCH_SIZE     = 64    # まとめて書き込む件数
+    TRANSCRIPT_DB_FLUSH_INTERVAL = 2.0   # 書き込みの最大待ち時間（秒）
+
+    # 環境音キャリブレーション設定
+    CALIBRATION_CACHE_FILE  = os.path.join(TEMP_DIR, 'calibration', 'energy_thresholds.json')
+    CALIBRATION_DURATION    = 1            # 環境音を測る秒数
+    CALIBRATION_MAX_AGE     = 24 * 3600    # 保存した閾値を測り直さずに使う期間（秒）
+    CALIBRATION_DRIFT_RATIO = 0.5          # 保存値からこの割合以上ずれたら保存し直す
+
+    # 認識結果キャッシュ設定
+    RECOGNITION_CACHE_ENABLED        = True
+    RECOGNITION_CACHE_DIR            = os.path.join(TEMP_DIR, 'recognition_cache')
+    RECOGNITION_CACHE_MEMORY_ENTRIES = 512                # メモリに保持する件数
+    RECOGNITION_CACHE_DISK_BYTES     = 20 * 1024 * 1024   # ディスクストアの上限（バイト）
 
     # ファイル設定
     DEFAULT_SAVE_FORMAT = '.txt'
+    FILE_CHUNK_CHARS     = 256 * 1024  # 保存・読み込みで一度に書く文字数・読むバイト数
+    FILE_TASK_POLL_MS    = 30          # バックグラウンドの保存・読み込みの結果を画面に反映する間隔（ミリ秒）
+    FILE_TASK_BUDGET_MS  = 15          # 1回の反映でUIスレッドを使う時間の目安（ミリ秒）
     SUPPORTED_FORMATS = [
         ("テキストファイル", "*.txt"),
         ("すべてのファイル", "*.*")
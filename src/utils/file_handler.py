@@ -3,57 +3,183 @@
 ファイル操作を管理するモジュール
 """
 
+import codecs
 import os
+import stat
+import sys
+import tempfile
 from datetime import datetime
-from tkinter import filedialog, messagebox
 from .config import Config
 
+
+def _read_umask():
+    """プロセスの umask を読む（一瞬書き換えるため、他のスレッドがファイルを作る前に1回だけ呼ぶ）"""
+    umask = os.umask(0)
+    os.umask(umask)
+    return umask
+
+
+# 新しく保存するファイルの権限（通常の open で作る場合と同じ）
+_NEW_FILE_MODE = 0o666 & ~_read_umask()
+
 class FileHandler:
     """ファイル操作を管理するクラス"""
     
     @staticmethod
-    def save_text_as_file(text_content, parent_window=None):
+    def ask_save_path(parent_window=None):
         """
-        テキストをファイルに保存
+        保存先をダイアログで選択
         
         Args:
-            text_content (str): 保存するテキスト内容
             parent_window: 親ウィンドウ（ダイアログの親）
             
         Returns:
-            bool: 保存成功の場合True
+            str: 保存先のパス（キャンセル時は空文字）
         """
-        if not text_content.strip():
-            messagebox.showwarning("警告", "保存するテキストがありません。")
-            return False
+        from tkinter import filedialog  # GUI使用時のみ読み込む
         
-        # デフォルトファイル名を生成
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        default_filename = f"音声認識結果_{timestamp}.txt"
+        return filedialog.asksaveasfilename(
+            parent=parent_window,
+            title="テキストファイルを保存",
+            defaultextension=Config.DEFAULT_SAVE_FORMAT,
+            initialdir=Config.OUTPUT_DIR,
+            initialfile=f"音声認識結果_{timestamp}.txt",
+            filetypes=Config.SUPPORTED_FORMATS
+        )
+    
+    @staticmethod
+    def ask_open_path(parent_window=None):
+        """
+        開くファイルをダイアログで選択
+        
+        Args:
+            parent_window: 親ウィンドウ（ダイアログの親）
+            
+        Returns:
+            str: ファイルのパス（キャンセル時は空文字）
+        """
+        from tkinter import filedialog  # GUI使用時のみ読み込む
+        
+        return filedialog.askopenfilename(
+            parent=parent_window,
+            title="テキストファイルを開く",
+            initialdir=Config.OUTPUT_DIR,
+            filetypes=Config.SUPPORTED_FORMATS
+        )
+    
+    @staticmethod
+    def write_lines_atomic(lines, file_path, on_progress=None, cancel_event=None):
+        """
+        行を少しずつ書き出し、書き終えてから保存先に置き換える
+        
+        同じディレクトリの一時ファイルに書き、fsync してから os.replace で差し替えるため、
+        途中で失敗・中止しても保存先の既存ファイルは壊れない。先頭の空行は書き出さない。
         
+        Args:
+            lines: 行（改行なし）のイテラブル
+            file_path: 保存先のパス
+            on_progress: 書き出すたびに呼ばれる関数 (書き出した行数)
+            cancel_event: セットされたら中止する threading.Event
+            
+        Returns:
+            bool: 保存した場合True（中止した場合False）
+        """
+        directory = os.path.dirname(os.path.abspath(file_path))
+        fd, temp_path = tempfile.mkstemp(
+            prefix=f".{os.path.basename(file_path)}.", suffix=".tmp", dir=directory
+        )
         try:
-            # ファイル保存ダイアログを表示
-            file_path = filedialog.asksaveasfilename(
-                parent=parent_window,
-                title="テキストファイルを保存",
-                defaultextension=Config.DEFAULT_SAVE_FORMAT,
-                initialdir=Config.OUTPUT_DIR,
-                initialfile=default_filename,
-                filetypes=Config.SUPPORTED_FORMATS
-            )
-            
-            if file_path:
-                # ファイルに書き込み
-                with open(file_path, 'w', encoding='utf-8') as file:
-                    file.write(text_content)
+            with os.fdopen(fd, 'w', encoding='utf-8', newline='') as file:
+                buffer = []
+                buffered = 0
+                written = 0
+                started = False
+                for line in lines:
+                    if not started:
+                        if not line.strip():
+                            continue
+                        started = True
+                    else:
+                        buffer.append("\n")
+                    buffer.append(line)
+                    buffered += len(line) + 1
+                    written += 1
+                    if buffered >= Config.FILE_CHUNK_CHARS:
+                        if cancel_event is not None and cancel_event.is_set():
+                            break
+                        file.write("".join(buffer))
+                        buffer = []
+                        buffered = 0
+                        if on_progress:
+                            on_progress(written)
                 
-                messagebox.showinfo("完了", f"ファイルを保存しました:\n{file_path}")
-                return True
+                if cancel_event is not None and cancel_event.is_set():
+                    file.close()
+                    os.remove(temp_path)
+                    return False
+                file.write("".join(buffer))
+                file.flush()
+                os.fsync(file.fileno())
             
-        except Exception as e:
-            messagebox.showerror("エラー", f"ファイルの保存に失敗しました:\n{str(e)}")
+            # mkstemp の一時ファイルは本人のみ読み書きできる（0600）ため、
+            # 既存ファイルの権限を引き継ぐ（新規なら通常の open と同じく umask に従う）
+            try:
+                mode = stat.S_IMODE(os.stat(file_path).st_mode)
+            except FileNotFoundError:
+                mode = _NEW_FILE_MODE
+            os.chmod(temp_path, mode)
+            os.replace(temp_path, file_path)
+            if on_progress:
+                on_progress(written)
+            return True
+            
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+    
+    @staticmethod
+    def read_lines_chunked(file_path, on_lines, on_progress=None, cancel_event=None):
+        """
+        テキストファイルを少しずつ読み、行のまとまりごとに渡す
+        
+        Args:
+            file_path: ファイルのパス
+            on_lines: 読んだ行（改行なし）のリストごとに呼ばれる関数
+            on_progress: 読むたびに呼ばれる関数 (読んだ割合 0.0〜1.0)
+            cancel_event: セットされたら中止する threading.Event
+            
+        Returns:
+            bool: 最後まで読んだ場合True（中止した場合False）
+        """
+        total = os.path.getsize(file_path) or 1
+        decoder = codecs.getincrementaldecoder('utf-8-sig')()
+        rest = ""
+        with open(file_path, 'rb') as file:
+            while True:
+                if cancel_event is not None and cancel_event.is_set():
+                    return False
+                data = file.read(Config.FILE_CHUNK_CHARS)
+                text = rest + decoder.decode(data, final=not data)
+                if not data:
+                    break
+                
+                # 行の途中で区切れた分は次のまとまりに回す
+                cut = text.rfind("\n")
+                if cut < 0:
+                    rest = text
+                    continue
+                rest = text[cut + 1:]
+                on_lines([line[:-1] if line.endswith("\r") else line for line in text[:cut].split("\n")])
+                if on_progress:
+                    on_progress(file.tell() / total)
         
-        return False
+        if text:
+            on_lines([text[:-1] if text.endswith("\r") else text])
+        if on_progress:
+            on_progress(1.0)
+        return True
     
     @staticmethod
     def auto_save_text(text_content, prefix="auto_save"):
@@ -81,36 +207,38 @@ class FileHandler:
             return file_path
             
         except Exception as e:
-            print(f"自動保存エラー: {e}")
+            print(f"自動保存エラー: {e}", file=sys.stderr)
             return None
     
     @staticmethod
-    def load_text_from_file(parent_window=None):
+    def save_transcript(text_content, source_path, output_dir=None, stem=None):
         """
-        テキストファイルを読み込み
+        音声ファイルの文字起こし結果を保存
         
         Args:
-            parent_window: 親ウィンドウ
+            text_content (str): 保存するテキスト内容
+            source_path (str): 元の音声ファイルのパス
+            output_dir (str): 出力先ディレクトリ（省略時は Config.OUTPUT_DIR）
+            stem (str): 出力ファイル名（拡張子なし。省略時は音声ファイル名）
             
         Returns:
-            str: ファイルの内容（失敗時は空文字）
+            str: 保存されたファイルのパス（失敗時はNone）
         """
+        output_dir = output_dir or Config.OUTPUT_DIR
+        
         try:
-            file_path = filedialog.askopenfilename(
-                parent=parent_window,
-                title="テキストファイルを開く",
-                initialdir=Config.OUTPUT_DIR,
-                filetypes=Config.SUPPORTED_FORMATS
-            )
+            os.makedirs(output_dir, exist_ok=True)
+            stem = stem or os.path.splitext(os.path.basename(source_path))[0]
+            file_path = os.path.join(output_dir, f"{stem}{Config.DEFAULT_SAVE_FORMAT}")
+            
+            with open(file_path, 'w', encoding='utf-8') as file:
+                file.write(text_content)
             
-            if file_path:
-                with open(file_path, 'r', encoding='utf-8') as file:
-                    return file.read()
+            return file_path
             
         except Exception as e:
-            messagebox.showerror("エラー", f"ファイルの読み込みに失敗しました:\n{str(e)}")
-        
-        return ""
+            print(f"文字起こし結果の保存エラー: {e}", file=sys.stderr)
+            return None
     
     @staticmethod
     def get_output_files_list():
@@ -124,26 +252,32 @@ class FileHandler:
             if not os.path.exists(Config.OUTPUT_DIR):
                 return []
             
-            files = []
-            for filename in os.listdir(Config.OUTPUT_DIR):
-                if filename.endswith('.txt'):
-                    file_path = os.path.join(Config.OUTPUT_DIR, filename)
-                    files.append(file_path)
-            
-            return sorted(files, key=os.path.getmtime, reverse=True)  # 更新日時順
+            # scandir のエントリは更新日時を保持するため、ファイルごとに stat し直さない
+            entries = [
+                entry for entry in os.scandir(Config.OUTPUT_DIR)
+                if entry.name.endswith('.txt') and entry.is_file()
+            ]
+            entries.sort(key=lambda entry: entry.stat().st_mtime, reverse=True)  # 更新日時順
+            return [entry.path for entry in entries]
             
         except Exception as e:
-            print(f"ファイル一覧取得エラー: {e}")
+            print(f"ファイル一覧取得エラー: {e}", file=sys.stderr)
             return []
     
     @staticmethod
     def cleanup_temp_files():
-        """一時ファイルをクリーンアップ"""
+        """
+        一時ファイルをクリーンアップ
+        
+        音声スプール（Config.SPOOL_FILE とそのロックファイル）は残す。未認識の区間があれば次回起動時に
+        再認識し、すべて認識済みならスプール自身が閉じるときに削除する。
+        """
+        spool_files = {Config.SPOOL_FILE, f"{Config.SPOOL_FILE}.compact", f"{Config.SPOOL_FILE}.lock"}
         try:
             if os.path.exists(Config.TEMP_DIR):
                 for filename in os.listdir(Config.TEMP_DIR):
                     file_path = os.path.join(Config.TEMP_DIR, filename)
-                    if os.path.isfile(file_path):
+                    if os.path.isfile(file_path) and file_path not in spool_files:
                         os.remove(file_path)
         except Exception as e:
-            print(f"一時ファイル削除エラー: {e}")
\ No newline at end of file
+            print(f"一時ファイル削除エラー: {e}", file=sys.stderr)
\ No newline at end of file
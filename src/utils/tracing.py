@@ -0,0 +1,232 @@
+# -*- coding: utf-8 -*-
+"""
+発話ごとの処理遅延の計測を管理するモジュール
+
+発話区間1つにつき LatencyTrace を1つ作り、録音・認識・表示の各段階で
+mark() により時刻（time.perf_counter()）を記録する。計測が無効な場合は
+tracer.start() が None を返し、各段階では None チェックのみを行う。
+"""
+
+import json
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict, deque
+
+from .config import Config
+
+# 段階名（記録される順）。各段階の値は直前の段階からの経過時間
+STAGES = (
+    'captured',    # 発話区間の最後のサンプルがリングバッファに書き込まれた時刻（起点）
+    'segmented',   # VADが発話終了を確定した（無音の継続待ち・処理スレッドの遅れ）
+    'dequeued',    # 認識ワーカーが取り出した（待機キューでの待ち）
+    'recognized',  # バックエンドから結果が返った（音声の変換と認識）
+    'ordered',     # 録音順の配信待ちが解けた（先行チャンクの完了待ち）
+    'queued_ui',   # 表示側が結果を受け取った
+    'displayed',   # テキストエリアに反映された（after による反映待ち）
+)
+
+
+class LatencyTrace:
+    """1発話分の段階ごとの時刻"""
+
+    __slots__ = ('marks',)
+
+    def __init__(self, stage, timestamp=None):
+        """
+        Args:
+            stage: 起点となる段階名
+            timestamp: 起点の時刻（省略時は現在時刻）
+        """
+        self.marks = [(stage, time.perf_counter() if timestamp is None else timestamp)]
+
+    def mark(self, stage):
+        """
+        段階の到達時刻を記録
+
+        Args:
+            stage: 段階名
+        """
+        self.marks.append((stage, time.perf_counter()))
+
+    def spans(self):
+        """
+        段階ごとの所要時間を取得
+
+        Returns:
+            OrderedDict: 段階名 -> 直前の段階からの秒数（'total' は起点からの合計）
+        """
+        spans = OrderedDict()
+        for (_, previous), (stage, current) in zip(self.marks, self.marks[1:]):
+            spans[stage] = current - previous
+        spans['total'] = self.marks[-1][1] - self.marks[0][1]
+        return spans
+
+
+class LatencyHistogram:
+    """直近の計測値から百分位数を求めるヒストグラム"""
+
+    def __init__(self, max_samples=None):
+        """
+        Args:
+            max_samples: 保持する計測値の最大数（古いものから捨てる）
+        """
+        self._samples = deque(maxlen=max_samples or Config.LATENCY_HISTORY_SIZE)
+
+    def add(self, value):
+        """計測値（秒）を追加"""
+        self._samples.append(value)
+
+    def percentiles(self):
+        """
+        百分位数を取得
+
+        Returns:
+            dict: count, p50, p95, p99, max（秒）。計測値がない場合は count のみ
+        """
+        samples = sorted(self._samples)
+        if not samples:
+            return {'count': 0}
+
+        def at(ratio):
+            return samples[min(len(samples) - 1, int(ratio * len(samples)))]
+
+        return {
+            'count': len(samples),
+            'p50': at(0.50),
+            'p95': at(0.95),
+            'p99': at(0.99),
+            'max': samples[-1],
+        }
+
+
+class LatencyTracer:
+    """発話ごとの遅延を集計し、JSONLに書き出すクラス"""
+
+    def __init__(self, enabled=None, export_path=None):
+        """
+        Args:
+            enabled: 計測を有効にするか（省略時は Config.LATENCY_TRACING_ENABLED）
+            export_path: 発話ごとの計測結果を追記するJSONLファイル（省略時は書き出さない）
+        """
+        self.enabled = Config.LATENCY_TRACING_ENABLED if enabled is None else enabled
+        self.export_path = export_path
+        self._histograms = OrderedDict((stage, LatencyHistogram()) for stage in STAGES[1:] + ('total',))
+        self._export_file = None
+        self._lock = threading.Lock()
+
+    def enable(self, export_path=None):
+        """
+        計測を有効化
+
+        Args:
+            export_path: 発話ごとの計測結果を追記するJSONLファイル
+        """
+        with self._lock:
+            if export_path and export_path != self.export_path:
+                self._close_export()
+                self.export_path = export_path
+            self.enabled = True
+
+    def disable(self):
+        """計測を無効化（計測中のトレースはそのまま記録される）"""
+        self.enabled = False
+
+    def start(self, stage=STAGES[0], timestamp=None):
+        """
+        発話のトレースを開始
+
+        Args:
+            stage: 起点となる段階名
+            timestamp: 起点の時刻（time.perf_counter() 基準）
+
+        Returns:
+            LatencyTrace: トレース（計測が無効な場合はNone）
+        """
+        if not self.enabled:
+            return None
+        return LatencyTrace(stage, timestamp)
+
+    def finish(self, trace):
+        """
+        トレースを完了してヒストグラムに集計し、JSONLに書き出す
+
+        Args:
+            trace: start() の戻り値（Noneの場合は何もしない）
+        """
+        if trace is None:
+            return
+
+        spans = trace.spans()
+        with self._lock:
+            for stage, seconds in spans.items():
+                histogram = self._histograms.get(stage)
+                if histogram is None:
+                    histogram = self._histograms[stage] = LatencyHistogram()
+                histogram.add(seconds)
+
+            if self.export_path:
+                self._write_export(spans)
+
+    def summary(self):
+        """
+        段階ごとの百分位数を取得
+
+        Returns:
+            OrderedDict: 段階名 -> LatencyHistogram.percentiles() の結果
+        """
+        with self._lock:
+            return OrderedDict(
+                (stage, histogram.percentiles()) for stage, histogram in self._histograms.items()
+            )
+
+    def format_summary(self):
+        """
+        段階ごとの百分位数を表形式の文字列に変換
+
+        Returns:
+            str: 1行1段階（ミリ秒）
+        """
+        lines = [f"{'段階':<12}{'件数':>6}{'p50':>8}{'p95':>8}{'p99':>8}"]
+        for stage, values in self.summary().items():
+            if not values['count']:
+                continue
+            lines.append(
+                f"{stage:<12}{values['count']:>6}"
+                f"{values['p50'] * 1000:>8.0f}{values['p95'] * 1000:>8.0f}{values['p99'] * 1000:>8.0f}"
+            )
+        return "\n".join(lines)
+
+    def close(self):
+        """書き出し先のファイルを閉じる"""
+        with self._lock:
+            self._close_export()
+
+    def _write_export(self, spans):
+        """1発話分の計測結果をJSONLに追記（ロック取得済みで呼ぶ）"""
+        try:
+            if self._export_file is None:
+                directory = os.path.dirname(self.export_path)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                self._export_file = open(self.export_path, 'a', encoding='utf-8')
+
+            record = {'time': time.time()}
+            record.update((stage, round(seconds * 1000, 3)) for stage, seconds in spans.items())
+            self._export_file.write(json.dumps(record) + "\n")
+            self._export_file.flush()
+        except OSError as e:
+            print(f"遅延計測の書き出しエラー: {e}", file=sys.stderr)
+            self.export_path = None
+            self._close_export()
+
+    def _close_export(self):
+        """書き出し先のファイルを閉じる（ロック取得済みで呼ぶ）"""
+        if self._export_file is not None:
+            self._export_file.close()
+            self._export_file = None
+
+
+# アプリケーション全体で共有するトレーサー
+tracer = LatencyTracer()
@@ -0,0 +1,387 @@
+# -*- coding: utf-8 -*-
+"""
+認識結果を蓄積・検索するモジュール
+
+確定した発話区間を1行ずつ SQLite に保存し、FTS5 の全文検索インデックスで検索する。
+日本語は単語の区切りがないため、部分一致で引ける trigram トークナイザーを使う
+（SQLite 3.34 未満では unicode61、FTS5 がなければ LIKE による検索になる）。
+保存は呼び出し元を待たせないよう、まとめて書き込むスレッドで行う。
+"""
+
+import glob
+import os
+import re
+import sqlite3
+import sys
+import threading
+import time
+from datetime import datetime, timedelta
+
+from .config import Config
+
+# id は認識時刻（マイクロ秒）。新しい順の検索を全文検索インデックスの rowid 順だけで行える
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS segments (
+    id           INTEGER PRIMARY KEY,
+    recorded_at  REAL NOT NULL,
+    session      TEXT,
+    source       TEXT,
+    language     TEXT,
+    confidence   REAL,
+    text         TEXT NOT NULL,
+    audio_offset INTEGER,
+    sample_rate  INTEGER,
+    origin       TEXT
+);
+CREATE INDEX IF NOT EXISTS segments_origin ON segments (origin);
+CREATE TABLE IF NOT EXISTS imported_files (
+    path  TEXT PRIMARY KEY,
+    mtime REAL NOT NULL,
+    size  INTEGER NOT NULL
+);
+"""
+
+# 全文検索インデックスは segments の外部コンテンツとし、トリガーで同期する
+_FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS segments_fts USING fts5(
+    text, content='segments', content_rowid='id', tokenize='{tokenizer}'
+);
+CREATE TRIGGER IF NOT EXISTS segments_ai AFTER INSERT ON segments BEGIN
+    INSERT INTO segments_fts (rowid, text) VALUES (new.id, new.text);
+END;
+CREATE TRIGGER IF NOT EXISTS segments_ad AFTER DELETE ON segments BEGIN
+    INSERT INTO segments_fts (segments_fts, rowid, text) VALUES ('delete', old.id, old.text);
+END;
+"""
+
+_COLUMNS = ('id', 'recorded_at', 'session', 'source', 'language', 'confidence',
+            'text', 'audio_offset', 'sample_rate', 'origin')
+
+_INSERT = ("INSERT INTO segments (id, recorded_at, session, source, language, confidence, "
+           "text, audio_offset, sample_rate, origin) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)")
+
+# 保存済みテキストの行（[時刻] [入力元] テキスト / [時刻] テキスト）
+_LINE_PATTERN = re.compile(r"^\[(\d{1,2}):(\d{2}):(\d{2})\]\s*(?:\[([^\]]*)\]\s*)?(.*)$")
+# ファイル名の日時（音声認識結果_20240101_120000.txt など）
+_FILENAME_PATTERN = re.compile(r"(\d{8})_(\d{6})")
+
+_TRIGRAM_LENGTH = 3  # trigram インデックスで引ける最短の語の長さ
+
+
+def _time_key(timestamp):
+    """UNIX時刻を区間の id（マイクロ秒）に変換"""
+    return int(timestamp * 1000000)
+
+
+class TranscriptStore:
+    """
+    認識結果の蓄積と全文検索を行うクラス
+
+    add() は区間を書き込み待ちに積むだけで、書き込みスレッドが batch_size 件または
+    flush_interval 秒ごとに1トランザクションでまとめて保存する。
+    """
+
+    def __init__(self, path=None, batch_size=None, flush_interval=None):
+        """
+        Args:
+            path: データベースファイルのパス（省略時は Config.TRANSCRIPT_DB_FILE）
+            batch_size: まとめて書き込む件数（省略時は Config.TRANSCRIPT_DB_BATCH_SIZE）
+            flush_interval: 書き込みの最大待ち時間（秒、省略時は Config.TRANSCRIPT_DB_FLUSH_INTERVAL）
+        """
+        self.path = path or Config.TRANSCRIPT_DB_FILE
+        self.batch_size = batch_size or Config.TRANSCRIPT_DB_BATCH_SIZE
+        self.flush_interval = Config.TRANSCRIPT_DB_FLUSH_INTERVAL if flush_interval is None else flush_interval
+        self.session = datetime.now().strftime("%Y%m%d_%H%M%S")  # 音声の位置の基準となる録音セッション
+        self.tokenizer = None  # 全文検索のトークナイザー（FTS5 が使えない場合はNone）
+
+        self._lock = threading.Lock()           # 接続の排他
+        self._condition = threading.Condition()  # 書き込み待ちの排他と書き込みスレッドの起床
+        self._pending = []
+        self._closed = False
+        self.written_count = 0
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._connection = sqlite3.connect(self.path, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.executescript(_SCHEMA)
+        self._create_fts()
+
+        self._writer = threading.Thread(target=self._write_loop, name="TranscriptWriter")
+        self._writer.daemon = True
+        self._writer.start()
+
+    def _create_fts(self):
+        """全文検索インデックスを作成（使えるトークナイザーを順に試す）"""
+        for tokenizer in ('trigram', 'unicode61'):
+            try:
+                self._connection.executescript(_FTS_SCHEMA.format(tokenizer=tokenizer))
+            except sqlite3.OperationalError:
+                continue
+            row = self._connection.execute(
+                "SELECT sql FROM sqlite_master WHERE name = 'segments_fts'"
+            ).fetchone()
+            # 既存のデータベースは作成時のトークナイザーのまま使う
+            self.tokenizer = 'trigram' if row and 'trigram' in row[0] else tokenizer
+            return
+
+    def add(self, text, recorded_at=None, source=None, language=None, confidence=None,
+            audio_offset=None, sample_rate=None):
+        """
+        確定した発話区間を書き込み待ちに追加
+
+        Args:
+            text: 認識結果
+            recorded_at: 認識した時刻（UNIX時刻、省略時は現在時刻）
+            source: 入力元の名前（デバイス・チャンネル）
+            language: 認識言語
+            confidence: 認識の信頼度（バックエンドが返さない場合はNone）
+            audio_offset: 録音セッション内の区間の開始位置（サンプル数）
+            sample_rate: audio_offset のサンプリングレート
+        """
+        if not text or not text.strip():
+            return
+        row = (recorded_at or time.time(), self.session, source, language, confidence,
+               text.strip(), audio_offset, sample_rate, None)
+        with self._condition:
+            if self._closed:
+                return
+            self._pending.append(row)
+            if len(self._pending) >= self.batch_size:
+                self._condition.notify()
+
+    def flush(self):
+        """書き込み待ちの区間をすぐに保存"""
+        with self._condition:
+            rows, self._pending = self._pending, []
+        self._write(rows)
+
+    def _write_loop(self):
+        """書き込み待ちを一定件数・一定間隔ごとにまとめて保存するスレッド"""
+        while True:
+            with self._condition:
+                if not self._closed and len(self._pending) < self.batch_size:
+                    self._condition.wait(self.flush_interval)
+                if self._closed:
+                    return
+                rows, self._pending = self._pending, []
+            self._write(rows)
+
+    def _write(self, rows):
+        """区間を1トランザクションで保存"""
+        if not rows:
+            return
+        try:
+            with self._lock, self._connection:
+                self._insert(rows)
+            self.written_count += len(rows)
+        except sqlite3.Error as e:
+            print(f"認識結果の保存エラー: {e}", file=sys.stderr)
+
+    def _insert(self, rows):
+        """区間を挿入（トランザクション内で呼ぶ。同じ時刻の区間は id を1つずつずらす）"""
+        for row in rows:
+            key = _time_key(row[0])
+            while True:
+                try:
+                    self._connection.execute(_INSERT, (key,) + row)
+                    break
+                except sqlite3.IntegrityError:
+                    key += 1
+
+    def search(self, query, limit=50, source=None, since=None, until=None):
+        """
+        認識結果を全文検索
+
+        空白で区切った語をすべて含む区間を新しい順に返す。trigram では3文字以上の語を
+        インデックスで引き、それより短い語は絞り込んだ結果に部分一致で適用する
+        （短い語だけの検索は全件を走査する）。
+
+        Args:
+            query: 検索語
+            limit: 最大件数
+            source: 入力元の名前で絞り込む
+            since: この時刻（UNIX時刻）以降に絞り込む
+            until: この時刻より前に絞り込む
+
+        Returns:
+            list: 区間の辞書のリスト（id, recorded_at, session, source, language,
+                confidence, text, audio_offset, sample_rate, origin）
+        """
+        terms = query.split()
+        if self.tokenizer == 'trigram':
+            indexed = [term for term in terms if len(term) >= _TRIGRAM_LENGTH]
+        elif self.tokenizer:
+            indexed = terms
+        else:
+            indexed = []
+        scanned = [term for term in terms if term not in indexed]
+
+        # id は認識時刻のため、期間の絞り込みと並べ替えは id（全文検索では rowid）で行う
+        columns = ", ".join(f"s.{column}" for column in _COLUMNS)
+        conditions = []
+        params = []
+        if indexed:
+            sql = f"SELECT {columns} FROM segments_fts JOIN segments s ON s.id = segments_fts.rowid"
+            key = "segments_fts.rowid"
+            conditions.append("segments_fts MATCH ?")
+            params.append(" AND ".join('"' + term.replace('"', '""') + '"' for term in indexed))
+        else:
+            sql = f"SELECT {columns} FROM segments s"
+            key = "s.id"
+        for term in scanned:
+            conditions.append("s.text LIKE ? ESCAPE '\\'")
+            params.append("%" + re.sub(r"([\\%_])", r"\\\1", term) + "%")
+        if source is not None:
+            conditions.append("s.source = ?")
+            params.append(source)
+        if since is not None:
+            conditions.append(f"{key} >= ?")
+            params.append(_time_key(since))
+        if until is not None:
+            conditions.append(f"{key} < ?")
+            params.append(_time_key(until))
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        sql += f" ORDER BY {key} DESC LIMIT ?"
+        params.append(limit)
+
+        with self._lock:
+            rows = self._connection.execute(sql, params).fetchall()
+        return [dict(zip(_COLUMNS, row)) for row in rows]
+
+    def recent(self, limit=50):
+        """
+        新しい順に区間を取得
+
+        Args:
+            limit: 最大件数
+
+        Returns:
+            list: 区間の辞書のリスト
+        """
+        return self.search("", limit=limit)
+
+    def count(self):
+        """保存済みの区間数を取得"""
+        with self._lock:
+            return self._connection.execute("SELECT COUNT(*) FROM segments").fetchone()[0]
+
+    def import_text_files(self, paths=None):
+        """
+        保存済みのテキストファイルを取り込む
+
+        各行（[時刻] [入力元] テキスト）を1区間として保存する。日付はファイル名の
+        日時（なければ更新日時）から補う。取り込み済みで変更のないファイルは飛ばし、
+        変更されたファイルは前回の取り込み分を置き換える。
+
+        Args:
+            paths: テキストファイルのパスのリスト（省略時は Config.OUTPUT_DIR の *.txt）
+
+        Returns:
+            int: 取り込んだ区間数
+        """
+        if paths is None:
+            paths = glob.glob(os.path.join(Config.OUTPUT_DIR, '*.txt'))
+
+        imported = 0
+        for path in paths:
+            path = os.path.abspath(path)
+            try:
+                stat = os.stat(path)
+                with self._lock:
+                    known = self._connection.execute(
+                        "SELECT mtime, size FROM imported_files WHERE path = ?", (path,)
+                    ).fetchone()
+                if known == (stat.st_mtime, stat.st_size):
+                    continue
+                with open(path, 'r', encoding='utf-8') as file:
+                    rows = self._parse_text_file(file, path, stat.st_mtime)
+                with self._lock, self._connection:
+                    self._connection.execute("DELETE FROM segments WHERE origin = ?", (path,))
+                    self._insert(rows)
+                    self._connection.execute(
+                        "INSERT OR REPLACE INTO imported_files (path, mtime, size) VALUES (?, ?, ?)",
+                        (path, stat.st_mtime, stat.st_size)
+                    )
+                imported += len(rows)
+            except (OSError, UnicodeDecodeError, sqlite3.Error) as e:
+                print(f"テキストファイルの取り込みエラー: {path}: {e}", file=sys.stderr)
+        return imported
+
+    @staticmethod
+    def _parse_text_file(lines, path, mtime):
+        """
+        保存済みテキストの行を区間の行に変換
+
+        Args:
+            lines: テキストの行のイテラブル
+            path: ファイルのパス（origin として記録）
+            mtime: ファイルの更新日時（ファイル名に日時がない場合の日付）
+
+        Returns:
+            list: segments テーブルに挿入する行のリスト
+        """
+        match = _FILENAME_PATTERN.search(os.path.basename(path))
+        try:
+            base = datetime.strptime("".join(match.groups()), "%Y%m%d%H%M%S") if match else None
+        except ValueError:
+            base = None
+        base = base or datetime.fromtimestamp(mtime)
+
+        rows = []
+        day = base.replace(hour=0, minute=0, second=0, microsecond=0)
+        previous = None
+        for line in lines:
+            line = line.strip()
+            if not line:
+                continue
+            match = _LINE_PATTERN.match(line)
+            source = None
+            if match:
+                hour, minute, second, source, text = match.groups()
+                recorded = day + timedelta(hours=int(hour), minutes=int(minute), seconds=int(second))
+                if previous is not None and recorded < previous:
+                    # 日付をまたいだ
+                    day += timedelta(days=1)
+                    recorded += timedelta(days=1)
+            else:
+                # 時刻のない行（手入力など）は直前の行の時刻とする
+                text = line
+                recorded = previous or base
+            if not text.strip():
+                continue
+            previous = recorded
+            rows.append((recorded.timestamp(), None, source, None, None, text.strip(), None, None, path))
+        return rows
+
+    def close(self):
+        """書き込み待ちを保存して閉じる"""
+        with self._condition:
+            if self._closed:
+                return
+            self._closed = True
+            rows, self._pending = self._pending, []
+            self._condition.notify()
+        self._writer.join(2.0)
+        self._write(rows)
+        with self._lock:
+            self._connection.close()
+
+
+def open_transcript_store():
+    """
+    設定に従って認識結果データベースを開く
+
+    Returns:
+        TranscriptStore: 開いたデータベース（無効化されている・開けない場合はNone）
+    """
+    if not Config.TRANSCRIPT_DB_ENABLED:
+        return None
+    try:
+        return TranscriptStore()
+    except (OSError, sqlite3.Error) as e:
+        print(f"認識結果データベースを開けません: {e}", file=sys.stderr)
+        return None
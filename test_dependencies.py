@@ -40,6 +40,14 @@ def test_dependencies():
     except ImportError as e:
         tests.append(("pyaudio", "❌ エラー", str(e)))
     
+    # numpy テスト
+    try:
+        import numpy
+        version = getattr(numpy, '__version__', 'バージョン不明')
+        tests.append(("numpy", "✅ OK", f"バージョン: {version}"))
+    except ImportError as e:
+        tests.append(("numpy", "❌ エラー", str(e)))
+    
     # datetime テスト（標準ライブラリ）
     try:
         import datetime
@@ -99,6 +107,10 @@ def test_dependencies():
                 elif lib_name == "speech_recognition":
                     print(f"\n{lib_name}:")
                     print("  pip install SpeechRecognition")
+                
+                elif lib_name == "numpy":
+                    print(f"\n{lib_name}:")
+                    print("  pip install numpy")
     
     print("=" * 50)
     